@@ -0,0 +1,150 @@
+"""
+Benchmark suite for process_awr_reports
+
+Runs the report analysis (process_awr_reports.parse_batch) on synthetic report corpora (see generate_reports)
+or on a report folder and measures for each benchmark case:
+- throughput: reports/s and MB/s
+- peak RSS of the analysis process (and its worker processes) in MB
+- wall time of the analysis stages (see process_awr_reports profile_add)
+Each case runs in a new process, so peak RSS values of the cases are independent.
+
+Results are compared with stored baselines (a regression is a throughput or peak RSS change beyond the tolerance)
+and can be stored as new baselines (--save-baseline).
+
+Usage: python3 benchmark.py [--case <name> ..] [--corpus <folder>] [--parser <parser>] [--workers <n>]
+                            [--repeat <n>] [--baseline <file>] [--save-baseline] [--tolerance <fraction>]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import generate_reports
+
+BASE = Path(__file__).resolve().parent
+BASELINE_FILE = BASE / "benchmarks" / "baseline.json"
+
+# Benchmark cases: report corpus parameters of generate_reports.generate_corpus
+CASES = {
+    'si-19': {'si': 20, 'releases': ['19']},
+    'si-releases': {'si': 24},
+    'rac-4': {'rac': 8, 'instances': 4},
+    'rac-16': {'rac': 2, 'instances': 16},
+    'statspack': {'statspack': 40, 'sqlRows': 50},
+    'large-si': {'si': 2, 'releases': ['19'], 'sqlRows': 500, 'sections': 300, 'sectionRows': 100},
+}
+
+
+def peak_rss_mb():
+    """Peak RSS in MB of this process and of its terminated child processes (worker processes)"""
+    scale = 1 if sys.platform == 'darwin' else 1024    # ru_maxrss: bytes on macOS, KB on Linux
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return usage * scale / 1048576
+
+
+def run_case(paths, parser, workers):
+    """Run the report analysis of <paths> in this process and return the measurements (runs in a new process)"""
+    import contextlib
+    import io
+    import process_awr_reports
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        process_awr_reports.parse_batch(paths, parser=parser, workers=workers, cacheFile=False, profile=True)
+    seconds = time.perf_counter() - start
+    profile = process_awr_reports.batchProfile
+    reports = len(profile['reports'])
+    megabytes = sum(os.path.getsize(path) for path in paths) / 1048576
+    return {
+        'reports': reports,
+        'mb': round(megabytes, 3),
+        'seconds': round(seconds, 4),
+        'reports_per_s': round(reports / seconds, 3),
+        'mb_per_s': round(megabytes / seconds, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stages': {stage: round(entry[1], 4) for stage, entry in sorted(profile['stages'].items(), key=lambda s: -s[1][1])},
+    }
+
+
+def measure(paths, parser, workers, repeat):
+    """Run a benchmark case <repeat> times, each in a new process, and return the fastest run"""
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            runs.append(executor.submit(run_case, paths, parser, workers).result())
+    return min(runs, key=lambda run: run['seconds'])
+
+
+def compare(name, result, baseline, tolerance):
+    """Return the regressions of <result> against <baseline> (throughput decrease or peak RSS increase > tolerance)"""
+    regressions = []
+    for key in ['reports_per_s', 'mb_per_s']:
+        if baseline.get(key) and result[key] < baseline[key] * (1 - tolerance):
+            regressions.append(f"{name}: {key} {result[key]} < baseline {baseline[key]}")
+    if baseline.get('peak_rss_mb') and result['peak_rss_mb'] > baseline['peak_rss_mb'] * (1 + tolerance):
+        regressions.append(f"{name}: peak_rss_mb {result['peak_rss_mb']} > baseline {baseline['peak_rss_mb']}")
+    return regressions
+
+
+def print_result(name, result, baseline):
+    ref = f"  (baseline {baseline['reports_per_s']} reports/s, {baseline['peak_rss_mb']} MB)" if baseline else ''
+    print(f"{name:<14} {result['reports']:>4} reports {result['mb']:>8.2f} MB {result['seconds']:>8.3f}s "
+          f"{result['reports_per_s']:>8.2f} reports/s {result['mb_per_s']:>7.2f} MB/s {result['peak_rss_mb']:>7.1f} MB peak RSS{ref}")
+    print(' ' * 15 + ', '.join(f"{stage} {seconds:.3f}s" for stage, seconds in result['stages'].items()))
+
+
+def main(argv=None):
+    argParser = argparse.ArgumentParser(description='Benchmark the AWR/Statspack report analysis')
+    argParser.add_argument('--case', action='append', choices=list(CASES), help='benchmark case, can be repeated (default: all)')
+    argParser.add_argument('--corpus', help='report folder to benchmark instead of the synthetic cases (case name: folder name)')
+    argParser.add_argument('--parser', default='html.parser', help='AWR html parser backend (default: %(default)s)')
+    argParser.add_argument('--workers', type=int, default=1, help='parallel report analysis processes (default: %(default)s)')
+    argParser.add_argument('--repeat', type=int, default=3, help='runs of each case, the fastest run counts (default: %(default)s)')
+    argParser.add_argument('--baseline', default=str(BASELINE_FILE), help='baseline file (default: %(default)s)')
+    argParser.add_argument('--save-baseline', action='store_true', help='store the results as baselines')
+    argParser.add_argument('--tolerance', type=float, default=0.2, help='allowed throughput/peak RSS change (default: %(default)s)')
+    args = argParser.parse_args(argv)
+
+    # Baselines by benchmark key "<case>/<parser>/<workers>"
+    baselineFile = Path(args.baseline)
+    baselines = json.loads(baselineFile.read_text()) if baselineFile.exists() else {}
+
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory(prefix='awr_benchmark_') as tmp:
+        if args.corpus:
+            corpus = {Path(args.corpus).name: sorted(str(p) for p in Path(args.corpus).iterdir() if p.suffix.lower() in ('.html', '.lst'))}
+        else:
+            corpus = {name: generate_reports.generate_corpus(os.path.join(tmp, name), **CASES[name]) for name in (args.case or CASES)}
+        for name, paths in corpus.items():
+            key = f"{name}/{args.parser}/{args.workers}"
+            result = measure(paths, args.parser, args.workers, args.repeat)
+            baseline = baselines.get(key)
+            print_result(name, result, baseline)
+            if baseline:
+                regressions += compare(name, result, baseline, args.tolerance)
+            results[key] = result
+
+    if args.save_baseline:
+        for result in results.values():
+            result['python'] = platform.python_version()
+            result['machine'] = platform.node()
+        baselines.update(results)
+        baselineFile.parent.mkdir(parents=True, exist_ok=True)
+        baselineFile.write_text(json.dumps(baselines, indent=2, sort_keys=True))
+        print(f"Baselines stored in {baselineFile}")
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
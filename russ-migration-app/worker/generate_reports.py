@@ -0,0 +1,490 @@
+"""
+Synthetic AWR (*.html) and Statspack (*.lst) report generator
+
+Generates structurally faithful reports for tests and benchmarks of process_awr_reports:
+- AWR single instance and RAC reports (N instances) with release specific header variants
+  (10.2: no table summary attributes, 11.2/12.1: "Avg wait (ms)" columns, 12.1+: CDB column, 18+: RAC "#CPUs"/"MB")
+- configurable number of SQL rows in the "SQL ordered by" sections (sampled from a pool of 2 x <sql-rows> statements
+  per report, so SQL Ids repeat across sections) and of additional report sections
+- Statspack reports (9.2 and 10.2+ header variants)
+All values are random but reproducible by <seed>.
+
+Usage: python3 generate_reports.py <outFolder> [--si <n>] [--rac <n>] [--instances <n>] [--statspack <n>]
+                                   [--releases <release> ..] [--sql-rows <n>] [--sections <n>] [--seed <n>]
+"""
+import argparse
+import os
+import random
+from html import escape
+
+# Release keys and full release strings of the generated reports
+RELEASES = {
+    '10.2': '10.2.0.5.0',
+    '11.2': '11.2.0.4.0',
+    '12.1': '12.1.0.2.0',
+    '12.2': '12.2.0.1.0',
+    '18': '18.0.0.0.0',
+    '19': '19.0.0.0.0',
+}
+
+# SQL texts of the "SQL ordered by" sections (matching some SQL patterns, hints and features of ConfigSqlArrays)
+SQL_TEXTS = [
+    'select * from dual',
+    'select count(*) from orders where rownum < 10',
+    'begin dbms_output.put_line(1); end;',
+    'SELECT /*+ USE_HASH(a) INDEX(b) */ nvl(max(a.x),0) from a, b where a.id = b.id',
+    'select distinct decode(status,1,2) from orders order by 1',
+    'select xmlagg(xmlelement(e, x)) from t',
+    'update orders set changed = sysdate where id = :1',
+    'select to_number(value) from v$parameter where name = :1',
+    'SELECT /*+ LEADING(o) ORDERED */ o.id, c.name from orders o, customers c where o.cid = c.id',
+    'begin dbms_stats.gather_table_stats(user, :1); end;',
+]
+
+SQL_SECTIONS = ['Elapsed Time', 'CPU Time', 'User I/O Wait Time', 'Gets', 'Reads', 'Executions', 'Parse Calls']
+
+# Additional report sections [heading, summary, header] (repeated to the requested number of sections)
+EXTRA_SECTIONS = [
+    ['Latch Activity', 'This table displays latch statistics. Get requests, % get miss, wait time',
+     ['Latch Name', 'Get Requests', 'Pct Get Miss', 'Avg Slps /Miss', 'Wait Time (s)', 'NoWait Requests', 'Pct NoWait Miss']],
+    ['Tablespace IO Stats', 'This table displays IO Statistics for different tablespaces',
+     ['Tablespace', 'Reads', 'Av Rds/s', 'Av Rd(ms)', 'Av Blks/Rd', 'Writes', 'Av Writes/s']],
+    ['Enqueue Activity', 'This table displays enqueue activity statistics',
+     ['Enqueue Type (Request Reason)', 'Requests', 'Succ Gets', 'Failed Gets', 'Waits', 'Wt Time (s)', 'Av Wt Time(ms)']],
+    ['Segments by Logical Reads', 'This table displays top segments by logical reads',
+     ['Owner', 'Tablespace Name', 'Object Name', 'Obj. Type', 'Logical Reads', '%Total', 'Obj#']],
+    ['Library Cache Activity', 'This table displays library cache statistics',
+     ['Namespace', 'Get Requests', 'Pct Miss', 'Pin Requests', 'Pct Miss', 'Reloads', 'Invali- dations']],
+]
+
+# Instance activity statistics (used by process_awr_reports queries and filler statistics)
+ACTIVITY_STATS = [
+    'physical read total IO requests', 'physical read total bytes', 'physical write total IO requests',
+    'physical write total bytes', 'redo size', 'table scans (direct read)', 'user calls', 'user commits',
+    'consistent gets', 'db block changes', 'execute count', 'parse count (total)', 'session logical reads',
+]
+
+
+def release_key(release):
+    """Release key (see RELEASES) of release string or key <release>"""
+    for key, value in RELEASES.items():
+        if release in (key, value):
+            return key
+    raise ValueError(f"Unknown release {release} (use one of {', '.join(RELEASES)})")
+
+
+def release_version(release):
+    """(major, minor) version of release key <release>"""
+    return tuple(int(v) for v in (release.split('.') + ['0'])[:2])
+
+
+def number(rnd, low, high, decimals=2):
+    """Random number formatted like AWR values (thousand separators)"""
+    return f'{rnd.uniform(low, high):,.{decimals}f}'
+
+
+class HtmlReport:
+    """AWR html report writer (html layout of AWR reports generated by Oracle awrrpt.sql)"""
+
+    def __init__(self, title, summaries=True):
+        self.parts = [
+            '<meta http-equiv="content-type" content="text/html; charset=UTF-8">'
+            f'<html lang="en"><head><title>{escape(title)}</title></head><body class="awr">\n'
+        ]
+        self.summaries = summaries
+        self.anchor = 400
+
+    def add(self, html):
+        self.parts.append(html)
+
+    def heading(self, text, name=None):
+        anchor = f'<a class="awr" name="{name}"></a>\n' if name else ''
+        self.add(f'{anchor}<h3 class="awr">{escape(text)}</h3>\n')
+
+    def table(self, summary, header, rows, headerRows=None):
+        """Add a table; <header> th names (empty name: row label column), <headerRows> optional multi row header html"""
+        summaryAttr = f' summary="{escape(summary)}"' if self.summaries and summary else ''
+        html = [f'<table border="0" class="tdiff"{summaryAttr}>\n']
+        if headerRows:
+            html.append(headerRows)
+        else:
+            html.append('<tr>' + ''.join(
+                f'<th class="awrbg" scope="col">{escape(str(name))}</th>' if name else '<th class="awrnobg" scope="col"></th>'
+                for name in header) + '</tr>\n')
+        for count, row in enumerate(rows):
+            cls = 'awrc' if count % 2 else 'awrnc'
+            cells = []
+            for pos, value in enumerate(row):
+                value = escape(str(value)) if value != '' else '&#160;'
+                scope = ' scope="row"' if pos == 0 else ''
+                cells.append(f"<td{scope} class='{cls}'>{value}</td>")
+            html.append('<tr>' + ''.join(cells) + '</tr>\n')
+        html.append('</table><p />\n')
+        self.add(''.join(html))
+
+    def sql_sections(self, rnd, sqlRows, sections, suffix=''):
+        """Add the "SQL Statistics" link list and the "SQL ordered by" sections (found by href anchors)"""
+        anchors = [self.anchor + 10 * count for count in range(len(sections))]
+        self.add('<h2 class="awr">\nSQL Statistics\n</h2>\n<ul>\n' + ''.join(
+            f'<li class="awr"><a class="awr" href="#{anchors[count]}">SQL ordered by {section}{suffix}</a></li>\n'
+            for count, section in enumerate(sections)) + '</ul>\n')
+        # [SQL Id, SQL Module, SQL Text] of the top SQL: the same statements show up in several sections
+        statements = [[f'{rnd.getrandbits(52):013x}', rnd.choice(['', 'JDBC Thin Client', 'SQL*Plus']), rnd.choice(SQL_TEXTS)]
+                      for _ in range(2 * sqlRows)]
+        for count, section in enumerate(sections):
+            self.heading(f'SQL ordered by {section}{suffix}', anchors[count])
+            rows = [[number(rnd, 0.01, 999), rnd.randint(1, 99999), number(rnd, 0, 99), number(rnd, 0, 100)] + statement
+                    for statement in rnd.sample(statements, sqlRows)]
+            self.table(f'This table displays top SQL by {section.lower()}',
+                       [f'{section.split()[0]} (s)', 'Executions', 'per Exec (s)', '%Total', 'SQL Id', 'SQL Module', 'SQL Text'], rows)
+        self.anchor += 10 * len(sections)
+
+    def extra_sections(self, rnd, sections, rows):
+        """Add <sections> additional report sections with <rows> rows each"""
+        for count in range(sections):
+            heading, summary, header = EXTRA_SECTIONS[count % len(EXTRA_SECTIONS)]
+            self.heading(heading)
+            self.table(summary, header,
+                       [[f'{header[0].split()[0].lower()} {count}.{row}'] +
+                        [number(rnd, 0, 10 ** rnd.randint(1, 7), rnd.choice([0, 1, 2])) for _ in header[1:]]
+                        for row in range(rows)])
+
+    def text(self):
+        return ''.join(self.parts) + '</body></html>\n'
+
+
+def report_random(kind, seed):
+    """Random generator of a report of <kind> (reports of different kinds with the same seed get different databases)"""
+    return random.Random(f'{kind}-{seed}')
+
+
+def awr_si_report(seed=1, release='19', sqlRows=10, sections=20, sectionRows=20):
+    """AWR single instance report (html text) of release key <release>"""
+    rnd = report_random('awr_si', seed)
+    release = release_key(release)
+    version = release_version(release)
+    dbName = f'DB{seed % 1000:03d}'
+    cpus = rnd.choice([4, 8, 16, 32, 48, 64])
+    elapsed = rnd.uniform(15, 120)
+    dbTime = rnd.uniform(1, elapsed * cpus / 2)
+    dbCpu = rnd.uniform(0.05, 0.9) * dbTime * 60
+    hostMemory = cpus * rnd.choice([4096, 8192])
+    sga = hostMemory * rnd.uniform(0.2, 0.5)
+    avgWaitHeader = 'Avg wait (ms)' if version < (12, 2) else 'Avg wait'
+    avgWait = (lambda ms: f'{ms:.2f}') if version < (12, 2) else (lambda ms: f'{ms:.2f}ms' if ms >= 1 else f'{ms * 1000:.2f}us')
+
+    report = HtmlReport(f'AWR Report for DB: {dbName}, Inst: {dbName.lower()}1, Snaps: 100-101', summaries=version > (10, 2))
+    report.add('<h1 class="awr">\nWORKLOAD REPOSITORY report for\n \n</h1>\n<p />\n')
+
+    # Report header: database, instance, host and snapshot tables
+    header = ['DB Name', 'DB Id']
+    values = [dbName, str(rnd.randint(10 ** 9, 4 * 10 ** 9))]
+    if version >= (11, 2):
+        header += ['Unique Name', 'Role']
+        values += [dbName.lower(), 'PRIMARY']
+    header += ['Edition', 'Release', 'RAC'] + (['CDB'] if version >= (12, 1) else [])
+    values += ['EE', RELEASES[release], 'NO'] + (['NO'] if version >= (12, 1) else [])
+    report.table('This table displays database instance information', header, [values])
+    report.table('This table displays database instance information', ['Instance', 'Inst Num', 'Startup Time'],
+                 [[f'{dbName.lower()}1', 1, '01-Oct-25 06:00']])
+    report.table('This table displays host information', ['Host Name', 'Platform', 'CPUs', 'Cores', 'Sockets', 'Memory (GB)'],
+                 [[f'host{seed}.example.com', rnd.choice(['Linux x86 64-bit', 'AIX-Based Systems (64-bit)']),
+                   cpus, cpus // 2, 2, f'{hostMemory / 1024:.2f}']])
+    report.table('This table displays snapshot information', ['', 'Snap Id', 'Snap Time', 'Sessions', 'Cursors/Session'], [
+        ['Begin Snap:', 100, '16-Oct-25 10:00:22', 118, '.9'],
+        ['End Snap:', 101, '16-Oct-25 11:00:34', 120, '.9'],
+        ['Elapsed:', '', f'{elapsed:.2f} (mins)', '', ''],
+        ['DB Time:', '', f'{dbTime:.2f} (mins)', '', ''],
+    ])
+
+    # Report summary
+    report.heading('Report Summary')
+    report.add('<p />Load Profile<p />\n')
+    report.table('This table displays load profile', ['', 'Per Second', 'Per Transaction', 'Per Exec', 'Per Call'], [
+        ['DB Time(s):', number(rnd, 0, 9, 1), number(rnd, 0, 9, 1), '0.01', '0.04'],
+        ['DB CPU(s):', number(rnd, 0, 9, 1), number(rnd, 0, 9, 1), '0.00', '0.01'],
+        ['Redo size (bytes):', number(rnd, 1000, 9999999, 1), number(rnd, 100, 99999, 1), '', ''],
+        ['Logical read (blocks):', number(rnd, 10, 99999, 1), number(rnd, 10, 9999, 1), '', ''],
+        ['User calls:', number(rnd, 0, 9999, 1), number(rnd, 0, 99, 1), '', ''],
+    ])
+    report.table('This table displays top 10 wait events by total wait time',
+                 ['Event', 'Waits', 'Total Wait Time (sec)', 'Avg Wait', '% DB time', 'Wait Class'],
+                 [['DB CPU', '', number(rnd, 1, 9999, 1), '', number(rnd, 1, 90, 1), ''],
+                  ['log file sync', f'{rnd.randint(1, 10 ** 6):,}', number(rnd, 1, 999, 1), avgWait(rnd.uniform(0.1, 9)), number(rnd, 0, 9, 1), 'Commit']])
+
+    # Memory statistics, time model and OS statistics
+    report.table('This table displays memory statistics', [' ', 'Begin', 'End'], [
+        ['Host Mem (MB):', f'{hostMemory:,.1f}', f'{hostMemory:,.1f}'],
+        ['SGA use (MB):', f'{sga:,.1f}', f'{sga:,.1f}'],
+        ['PGA use (MB):', number(rnd, 100, sga / 2, 1), number(rnd, 100, sga / 2, 1)],
+    ])
+    report.heading('Time Model Statistics')
+    report.table('This table displays different time model statistics. For each statistic, time and % of DB time are displayed',
+                 ['Statistic Name', 'Time (s)', '% of  DB Time', '% of Total CPU Time'], [
+                     ['sql execute elapsed time', f'{dbTime * 60 * 0.8:,.2f}', '80.00', ''],
+                     ['DB CPU', f'{dbCpu:,.2f}', f'{dbCpu / dbTime / 0.6:.2f}', number(rnd, 10, 90)],
+                     ['parse time elapsed', number(rnd, 0, 99), number(rnd, 0, 9), ''],
+                     ['background cpu time', number(rnd, 1, 999), '', number(rnd, 1, 30)],
+                     ['DB time', f'{dbTime * 60:,.2f}', '', ''],
+                 ])
+    report.heading('Operating System Statistics')
+    busy = rnd.randint(10 ** 4, 10 ** 7)
+    report.table('This table displays operating systems statistics. For each statistic, value and end value are displayed',
+                 ['Statistic', 'Value', 'End Value'], [
+                     ['BUSY_TIME', f'{busy:,}', ''],
+                     ['IDLE_TIME', f'{max(int(elapsed * 60 * cpus * 100) - busy, 0):,}', ''],
+                     ['IOWAIT_TIME', f'{rnd.randint(0, 10 ** 5):,}', ''],
+                     ['NUM_CPUS', cpus, ''],
+                     ['PHYSICAL_MEMORY_BYTES', f'{hostMemory * 1048576:,}', ''],
+                 ])
+
+    # Wait events
+    report.heading('Foreground Wait Events')
+    report.table('This table displays Foreground Wait Events and their wait statistics',
+                 ['Event', 'Waits', '%Time -outs', 'Total Wait Time (s)', avgWaitHeader, 'Waits /txn', '% DB time'], [
+                     ['log file sync', f'{rnd.randint(1, 10 ** 6):,}', '0', number(rnd, 1, 999), avgWait(rnd.uniform(0.1, 9)), '1.00', number(rnd, 0, 9)],
+                     ['db file sequential read', f'{rnd.randint(1, 10 ** 7):,}', '0', number(rnd, 1, 9999), avgWait(rnd.uniform(0.1, 9)), number(rnd, 1, 99), number(rnd, 0, 50)],
+                     ['SQL*Net message to client', f'{rnd.randint(1, 10 ** 7):,}', '0', number(rnd, 0, 9), avgWait(rnd.uniform(0.001, 0.01)), number(rnd, 1, 99), '0.00'],
+                 ])
+    report.heading('Background Wait Events')
+    report.table('This table displays background wait events statistics',
+                 ['Event', 'Waits', '%Time -outs', 'Total Wait Time (s)', avgWaitHeader, 'Waits /txn', '% bg time'], [
+                     ['log file parallel write', f'{rnd.randint(1, 10 ** 6):,}', '0', number(rnd, 1, 999), avgWait(rnd.uniform(0.1, 5)), '1.00', number(rnd, 0, 50)],
+                     ['db file parallel write', f'{rnd.randint(1, 10 ** 6):,}', '0', number(rnd, 1, 999), avgWait(rnd.uniform(0.1, 5)), '1.00', number(rnd, 0, 50)],
+                 ])
+
+    # SQL statistics
+    report.sql_sections(rnd, sqlRows, SQL_SECTIONS)
+
+    # Instance activity statistics
+    seconds = elapsed * 60
+    stats = []
+    for stat in ACTIVITY_STATS:
+        total = rnd.randint(1, 10 ** 9)
+        stats.append([stat, f'{total:,}', f'{total / seconds:,.2f}', f'{total / seconds / rnd.uniform(1, 50):,.2f}'])
+    if version >= (12, 1):
+        report.heading('Key Instance Activity Stats')
+        report.table('This table displays Key Instance activity statistics. For each instance, activity total, activity per second, and activity per transaction are displayed',
+                     ['Statistic', 'Total', 'per Second', 'per Trans'], [row for row in stats if row[0] in ('user calls', 'user commits', 'execute count')])
+    report.heading('Instance Activity Stats')
+    report.table('This table displays Instance activity statistics. For each instance, activity total, activity per second, and activity per transaction are displayed',
+                 ['Statistic', 'Total', 'per Second', 'per Trans'], sorted(stats))
+
+    # Additional sections
+    report.extra_sections(rnd, sections, sectionRows)
+
+    # Top databases by IO requests (12.2+)
+    if version >= (12, 2):
+        report.add('<p />Top Databases by IO Requests<p />\n')
+        report.table('This table displays top databases by IO requests',
+                     ['DB Name', 'Inst Num', 'DB Id', 'Con Id', 'IO Requests per sec', 'Reads per sec', 'Writes per sec', 'Avg Active Sessions', 'Throughput MB per sec'],
+                     [[f'*{dbName}', 1, rnd.randint(10 ** 9, 4 * 10 ** 9), 0, number(rnd, 1, 99999), number(rnd, 1, 9999), number(rnd, 1, 9999), number(rnd, 0, 9), number(rnd, 1, 999)]])
+
+    # Initialization parameters
+    report.heading('init.ora Parameters')
+    report.table('This table displays name and value of the modified initialization parameters',
+                 ['Parameter Name', 'Begin value', 'End value (if different)'], [
+                     ['compatible', RELEASES[release][:6], ''],
+                     ['cpu_count', cpus, ''],
+                     ['db_block_size', 8192, ''],
+                     ['db_unique_name', dbName.lower(), ''],
+                     ['optimizer_features_enable', RELEASES[release][:8], ''],
+                     ['pga_aggregate_target', int(sga / 4) * 1048576, ''],
+                     ['sga_target', int(sga) * 1048576, ''],
+                 ])
+    return report.text()
+
+
+def awr_rac_report(seed=1, release='19', instances=2, sqlRows=10, sections=20, sectionRows=20):
+    """AWR RAC report (html text) with <instances> instances of release key <release>"""
+    rnd = report_random('awr_rac', seed)
+    release = release_key(release)
+    version = release_version(release)
+    dbName = f'RAC{seed % 1000:03d}'
+    cpus = rnd.choice([8, 16, 32, 64])
+    elapsed = rnd.uniform(15, 120)
+    memory = cpus * rnd.choice([4096, 8192])
+
+    report = HtmlReport(f'AWR RAC Report for DB: {dbName}, Snaps: 100-101', summaries=version > (10, 2))
+    report.add('<h1 class="awr">WORKLOAD REPOSITORY REPORT (RAC)</h1>\n')
+
+    # Database summary and instances
+    header = ['Id', 'Name', 'Unique Name', 'Role', 'Edition', 'RAC'] + (['CDB'] if version >= (12, 1) else [])
+    headerRows = ('<tr>' + f'<th class="awrbg" colspan="{len(header)}">Database</th>'
+                  '<th class="awrbg" colspan="2">Number of Instances</th><th class="awrbg" colspan="2">Report Total (minutes)</th></tr>\n'
+                  '<tr>' + ''.join(f'<th class="awrbg" scope="col">{name}</th>'
+                                   for name in header + ['Total', 'In Report', 'Elapsed time', 'DB time']) + '</tr>\n')
+    instanceDbTimes = [rnd.uniform(1, elapsed * cpus / 4) for _ in range(instances)]
+    report.table('This table displays database summary', None,
+                 [[rnd.randint(10 ** 9, 4 * 10 ** 9), dbName, dbName.lower(), 'PRIMARY', 'EE', 'YES'] + (['NO'] if version >= (12, 1) else [])
+                  + [instances, instances, f'{elapsed:.2f}', f'{sum(instanceDbTimes):,.2f}']], headerRows)
+    report.table('This table displays database instances included in report',
+                 ['I#', 'Instance', 'Host', 'Startup', 'Begin Snap Time', 'End Snap Time', 'Release', 'Elapsed Time(min)',
+                  'DB time(min)', 'Up Time(hrs)', 'Avg Active Sessions', 'Platform'],
+                 [[i, f'{dbName.lower()}{i}', f'host{seed}-{i}.example.com', '01-Oct-25 06:00', '16-Oct-25 10:00', '16-Oct-25 11:00',
+                   RELEASES[release], f'{elapsed:.2f}', f'{instanceDbTimes[i - 1]:.2f}', '100.00', f'{instanceDbTimes[i - 1] / elapsed:.2f}',
+                   'Linux x86 64-bit'] for i in range(1, instances + 1)])
+
+    # OS statistics, time model and system statistics by instance
+    cpuHeader, memoryHeader = ('#CPUs', 'MB') if version >= (18, 0) else ('Num CPUs', 'Memory (M)')
+    report.table('This table displays OS statistics by instance',
+                 ['I#', cpuHeader, 'CPU Cores', 'Load Begin', '% Busy', '% Idl', 'Busy', 'Idle', memoryHeader],
+                 [[i, cpus, cpus // 2, number(rnd, 0, 9), number(rnd, 0, 90, 1), number(rnd, 10, 99, 1),
+                   number(rnd, 1000, 90000), number(rnd, 10 ** 5, 10 ** 6), f'{memory:,}'] for i in range(1, instances + 1)])
+    report.table('This table displays time model statistics',
+                 ['I#', 'DB time (s)', 'DB CPU (s)', 'bg CPU (s)'],
+                 [[i, f'{instanceDbTimes[i - 1] * 60:,.2f}', f'{instanceDbTimes[i - 1] * 60 * rnd.uniform(0.1, 0.9):,.2f}', number(rnd, 1, 90)]
+                  for i in range(1, instances + 1)])
+    report.table('This table displays time model % of DB time',
+                 ['I#', 'DB CPU', 'SQL exec'], [[i, number(rnd, 1, 90), '50.00'] for i in range(1, instances + 1)])
+    report.table('This table displays system statistics per second',
+                 ['I#', 'Logical Reads/s', 'Physical Reads/s', 'Redo Size (k)/s'],
+                 [[i, number(rnd, 10, 99999, 1), number(rnd, 0, 9999, 1), number(rnd, 1, 900)] for i in range(1, instances + 1)])
+    seconds = elapsed * 60
+    stats = []
+    for stat in ACTIVITY_STATS:
+        total = rnd.randint(1, 10 ** 9)
+        stats.append([stat, f'{total:,}', f'{total / seconds:,.2f}', f'{total / seconds / rnd.uniform(1, 50):,.2f}'])
+    report.table('This table displays system statistics global', ['Statistic', 'Total', 'per Second', 'per Trans'], sorted(stats))
+    report.table('This table displays foreground wait events global', ['Wait Class', 'Event', 'Waits', 'Avg Wait'],
+                 [['Commit', 'log file sync', f'{rnd.randint(1, 10 ** 6):,}', f'{rnd.uniform(0.1, 9):.2f}ms'],
+                  ['System I/O', 'log file parallel write', f'{rnd.randint(1, 10 ** 6):,}', f'{rnd.uniform(10, 999):.2f}us']])
+
+    # SQL statistics and additional sections
+    report.sql_sections(rnd, sqlRows, SQL_SECTIONS, ' (Global)')
+    report.extra_sections(rnd, sections, sectionRows)
+
+    # init.ora parameters (global "*" and instance specific values)
+    rows = [['compatible', '*', RELEASES[release][:6], ''], ['cpu_count', '*', cpus, ''],
+            ['optimizer_features_enable', '*', RELEASES[release][:8], ''], ['pga_aggregate_target', '*', memory // 8 * 1048576, '']]
+    rows += [['sga_target', i, memory // 4 * 1048576, ''] for i in range(1, instances + 1)]
+    report.table('This table displays init.ora parameters', ['Parameter Name', 'I#', 'Begin value', 'End value'], rows)
+    return report.text()
+
+
+def statspack_report(seed=1, release='10.2', sqlRows=10):
+    """Statspack report (text) of release key <release> ('9.2' or a key of RELEASES)"""
+    rnd = report_random('statspack', seed)
+    old = release == '9.2'
+    fullRelease = '9.2.0.8.0' if old else RELEASES[release_key(release)]
+    dbName = f'SP{seed % 1000:03d}'
+    cpus = rnd.choice([2, 4, 8, 16])
+    lines = ['STATSPACK report for', '']
+    if old:
+        lines += ['DB Name         DB Id    Instance     Inst Num Release     Cluster Host',
+                  '------------ ----------- ------------ -------- ----------- ------- ------------',
+                  f'{dbName:<13}{rnd.randint(10 ** 9, 2 * 10 ** 9):>11} {dbName.lower():<12}        1 {fullRelease:<11} NO      dbhost{seed}']
+    else:
+        lines += ['Database    DB Id    Instance     Inst Num  Startup Time   Release     RAC',
+                  '~~~~~~~~ ----------- ------------ -------- --------------- ----------- ---',
+                  f'          {rnd.randint(10 ** 9, 2 * 10 ** 9)} {dbName.lower():<12}        1 01-Oct-25 06:00 {fullRelease:<11} NO']
+    lines += ['',
+              f'Host  Name:   dbhost{seed}.example.com Num CPUs:    {cpus}    Phys Memory (MB):   {cpus * 4096:,}',
+              '~~~~', '',
+              'Snapshot       Snap Id     Snap Time      Sessions Curs/Sess Comment',
+              '~~~~~~~~    ---------- ------------------ -------- --------- -------------------',
+              'Begin Snap:        100 16-Oct-25 10:00:00       50       3.0',
+              '  End Snap:        101 16-Oct-25 11:00:00       52       3.1',
+              f'   Elapsed:               {rnd.uniform(10, 120):.2f} (mins)',
+              f'   DB time:               {rnd.uniform(10, 500):.2f} (mins)  DB CPU:     {rnd.uniform(1, 100):.2f} (mins)',
+              '',
+              'Load Profile                            Per Second       Per Transaction',
+              '~~~~~~~~~~~~                       ---------------       ---------------',
+              f'                  Redo size:            {number(rnd, 1000, 9999999)}              2,345.67',
+              f'              Physical reads:              {number(rnd, 1, 99999)}                 12.34',
+              f'             Physical writes:                {number(rnd, 1, 9999)}                  2.34',
+              f'                 User calls:              {number(rnd, 1, 9999)}                10.00',
+              '',
+              'Top 5 Timed Events                                                    Avg %Total',
+              'Event                                            Waits    Time (s)   (ms)   Time',
+              f'log file sync                                {rnd.randint(1, 99999):,}          0         12   {rnd.uniform(0, 20):.1f}    0.5',
+              f'log file parallel write                      {rnd.randint(1, 99999):,}          0          8    {rnd.uniform(0, 20):.1f}   {rnd.uniform(0, 20):.1f}',
+              '',
+              'Time Model System Stats',
+              'Statistic                                       Time (s) % of DB time',
+              f'DB CPU                                         {number(rnd, 1, 9999, 1)}        {rnd.uniform(1, 99):.1f}',
+              f'background cpu time                            {rnd.uniform(1, 999):.1f}',
+              f'DB time                                        {number(rnd, 1, 99999, 1)}',
+              '',
+              f'SQL ordered by CPU  DB/Inst: {dbName}/{dbName.lower()}  Snaps: 100-101']
+    for row in range(sqlRows):
+        lines.append(f'      {row}.5      {row * 3}    {rnd.uniform(0, 99):.1f}  {rnd.choice(SQL_TEXTS)}')
+    lines += ['',
+              f'Instance Activity Stats  DB/Inst: {dbName}/{dbName.lower()}  Snaps: 100-101',
+              'Statistic                                      Total     per Second     per Trans']
+    for stat in ['physical read total IO requests', 'physical write total IO requests', 'user commits', 'table scans (direct read)']:
+        lines.append(f'{stat:<40} {rnd.randint(1, 10 ** 7):>12,} {rnd.uniform(0, 999):12.1f} {rnd.uniform(0, 99):10.1f}')
+    lines += ['',
+              'OS Statistics',
+              f'BUSY_TIME                                  {rnd.randint(1, 10 ** 7):,}',
+              f'IDLE_TIME                                  {rnd.randint(1, 10 ** 8):,}',
+              '',
+              'Memory Statistics',
+              '                                       Begin          End',
+              f'   Host Mem (MB):       {cpus * 4096:,.1f}     {cpus * 4096:,.1f}',
+              f'    SGA use (MB):        {number(rnd, 100, 99999, 1)}      8,192.0',
+              f'    PGA use (MB):        {number(rnd, 10, 9999, 1)}      1,300.1',
+              '',
+              'init.ora Parameters',
+              'Parameter Name                Begin value                       (if different)',
+              f'compatible                    {fullRelease}',
+              f'cpu_count                     {cpus}',
+              'db_block_size                 8192',
+              f'db_name                       {dbName}',
+              f'optimizer_features_enable     {fullRelease[:8]}',
+              '',
+              'End of Report']
+    return '\n'.join(lines) + '\n'
+
+
+def generate_corpus(outFolder, si=0, rac=0, instances=2, statspack=0, releases=None, sqlRows=10, sections=20, sectionRows=20, seed=1):
+    """
+    Write a report corpus into <outFolder>: <si> AWR single instance, <rac> AWR RAC (<instances> instances)
+    and <statspack> Statspack reports; the AWR releases rotate over <releases> (default: all RELEASES)
+    Returns the list of written report files
+    """
+    releases = releases or list(RELEASES)
+    os.makedirs(outFolder, exist_ok=True)
+    files = []
+
+    def write(name, text):
+        path = os.path.join(outFolder, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        files.append(path)
+
+    for count in range(si):
+        release = release_key(releases[count % len(releases)])
+        write(f'awr_si_{release}_{seed + count}.html', awr_si_report(seed + count, release, sqlRows, sections, sectionRows))
+    for count in range(rac):
+        release = release_key(releases[count % len(releases)])
+        write(f'awr_rac{instances}_{release}_{seed + count}.html',
+              awr_rac_report(seed + count, release, instances, sqlRows, sections, sectionRows))
+    for count in range(statspack):
+        release = '9.2' if count % 2 else '10.2'
+        write(f'statspack_{release}_{seed + count}.lst', statspack_report(seed + count, release, sqlRows))
+    return files
+
+
+def main(argv=None):
+    argParser = argparse.ArgumentParser(description='Generate synthetic AWR and Statspack reports')
+    argParser.add_argument('outFolder', help='output folder for the generated reports')
+    argParser.add_argument('--si', type=int, default=1, help='AWR single instance reports (default: %(default)s)')
+    argParser.add_argument('--rac', type=int, default=0, help='AWR RAC reports (default: %(default)s)')
+    argParser.add_argument('--instances', type=int, default=2, help='instances of the AWR RAC reports (default: %(default)s)')
+    argParser.add_argument('--statspack', type=int, default=0, help='Statspack reports (default: %(default)s)')
+    argParser.add_argument('--releases', nargs='+', default=list(RELEASES), choices=list(RELEASES),
+                           help='AWR report releases (rotated over the reports, default: all)')
+    argParser.add_argument('--sql-rows', type=int, default=10, help='rows of each "SQL ordered by" section (default: %(default)s)')
+    argParser.add_argument('--sections', type=int, default=20, help='additional report sections (default: %(default)s)')
+    argParser.add_argument('--section-rows', type=int, default=20, help='rows of each additional report section (default: %(default)s)')
+    argParser.add_argument('--seed', type=int, default=1, help='random seed of the first report (default: %(default)s)')
+    args = argParser.parse_args(argv)
+    files = generate_corpus(args.outFolder, args.si, args.rac, args.instances, args.statspack, args.releases,
+                            args.sql_rows, args.sections, args.section_rows, args.seed)
+    print(f"Generated {len(files)} reports in {args.outFolder}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
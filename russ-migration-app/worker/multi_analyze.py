@@ -1,4 +1,3 @@
-import subprocess
 import json
 import pandas as pd
 from pathlib import Path
@@ -6,21 +5,137 @@ from pptx import Presentation
 from pptx.util import Inches
 from openpyxl import load_workbook
 from vm_recommender import recommend_vm_shape  # ✅ import recommender
+import run_pipeline  # ✅ single report pipeline (runs in-process)
+import process_awr_reports
+from quantile_sketch import QuantileSketch
 
 # ---------------------------------------------------------------------
 BASE = Path(__file__).resolve().parent
 UPLOADS = BASE.parent / "uploads"
 OUTPUTS = Path(__file__).resolve().parent.parent / "outputs"
-RUN_PIPELINE = BASE / "run_pipeline.py"
 TEMPLATE_PPT = BASE.parent / "analysis_templates" / "template.pptx"
 
 OUTPUTS.mkdir(exist_ok=True)
 
 # ---------------------------------------------------------------------
-def analyze_all(cloud="azure"):
+# Snapshot series mode: metrics streamed into quantile sketches per database (see analyze_series)
+SERIES_METRICS = {
+    "AAS": lambda r: r["db_time_min"] / r["elapsed_time_min"],
+    "vCPUs": lambda r: r["db_time_min"] / r["elapsed_time_min"] * 1.1,     # same estimate as the single report sizing
+    "CPU %": lambda r: r["db_cpu_usage_pct"],
+    "Memory (GB)": lambda r: (r["db_sga_usage_mb"] + r["db_pga_usage_mb"]) / 1024,
+    "Total IOPS": lambda r: r["db_physical_read_total_io_ps"] + r["db_physical_write_total_io_ps"],
+    "Throughput (MB/s)": lambda r: r["db_physical_read_total_mbps"] + r["db_physical_write_total_mbps"],
+    "Redo (MB/s)": lambda r: r["db_redo_mbps"],
+}
+SERIES_QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99, "max": 1.0}
+SERIES_SIZING_QUANTILE = "p95"      # quantile of the series used for the VM recommendation (peak VM: max)
+
+
+def series_values(record):
+    """Series metric values of one report record (metrics with missing or non numeric inputs are skipped)."""
+    values = {}
+    for metric, value in SERIES_METRICS.items():
+        try:
+            values[metric] = float(value(record))
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            pass
+    return values
+
+
+def series_records(awr_files, hist_files=(), sizing_only=False):
+    """Records (name, record) of the snapshot reports and of the database snapshots of the DBA_HIST extracts, one by one."""
+    for awr in awr_files:
+        print(f"⚙️ Processing snapshot report: {awr.name}")
+        try:
+            if sizing_only:
+                yield awr.name, process_awr_reports.parse_sizing(str(awr))
+            else:
+                yield awr.name, process_awr_reports.parse_report(str(awr))
+        except Exception as ex:
+            print(f"⚠️ Unexpected error on {awr.name}: {ex}")
+    if hist_files:
+        print(f"⚙️ Processing DBA_HIST extracts: {', '.join(path.name for path in hist_files)}")
+        try:
+            for record in process_awr_reports.run_HIST([str(path) for path in hist_files]):
+                yield record["filename"], record
+        except Exception as ex:
+            print(f"⚠️ Unexpected error on DBA_HIST extracts: {ex}")
+
+
+def analyze_series(awr_files, cloud, sizing_only=False, hist_files=()):
+    """
+    Size each database over all its snapshot reports: reports are grouped by DB ID (DB name if not available)
+    and each metric is streamed into a quantile sketch, so memory stays constant whatever the number of reports.
+    The VM recommendation uses the SERIES_SIZING_QUANTILE of vCPUs and memory, the peak VM their maximum.
+    sizing_only: read only the sizing metrics by regex (see process_awr_reports.parse_sizing, no CPU %/redo).
+    hist_files: DBA_HIST extract files, each database snapshot is used like a snapshot report (see process_awr_reports.run_HIST).
+    """
+    series = {}     # group key -> {"db_name", "db_id", "reports", "sketches": {metric: QuantileSketch}}
+    for name, record in series_records(awr_files, hist_files, sizing_only):
+        if not str(record.get("status", "")).startswith("PASSED"):
+            print(f"⚠️ Skipping {name}: status {record.get('status')}")
+            continue
+
+        db_id = str(record.get("db_id") or "")
+        db_name = str(record.get("db_name") or "UNKNOWN")
+        group = series.setdefault(db_id or db_name, {"db_name": db_name, "db_id": db_id, "reports": 0, "sketches": {}})
+        group["reports"] += 1
+        for metric, value in series_values(record).items():
+            group["sketches"].setdefault(metric, QuantileSketch()).add(value)
+
+    results = []
+    for group in series.values():
+        def quantile(metric, name):
+            sketch = group["sketches"].get(metric)
+            return round(sketch.quantile(SERIES_QUANTILES[name]), 2) if sketch else "N/A"
+
+        def recommend(name):
+            # no recommendation without vCPU and memory values (e.g. DBA_HIST extracts without DBA_HIST_SGA)
+            vcpus, memory = quantile("vCPUs", name), quantile("Memory (GB)", name)
+            return recommend_vm_shape(cloud, vcpus, memory) if "N/A" not in (vcpus, memory) else {}
+
+        vm = recommend(SERIES_SIZING_QUANTILE)
+        peak_vm = recommend("max")
+        result = {
+            "Source": "AWR Series",
+            "Cloud": cloud.upper(),
+            "DB Name": group["db_name"],
+            "DB ID": group["db_id"],
+            "Snapshots": group["reports"],
+            "Sizing Quantile": SERIES_SIZING_QUANTILE,
+            "Memory (GB)": quantile("Memory (GB)", SERIES_SIZING_QUANTILE),
+            "Total IOPS": quantile("Total IOPS", SERIES_SIZING_QUANTILE),
+            "Throughput (MB/s)": quantile("Throughput (MB/s)", SERIES_SIZING_QUANTILE),
+            "Estimated vCPUs": quantile("vCPUs", SERIES_SIZING_QUANTILE),
+            "Recommended VM": vm.get("name", "N/A"),
+            "VM vCPUs": vm.get("vcpus", "N/A"),
+            "VM Memory (GB)": vm.get("memory", "N/A"),
+            "Category": vm.get("category", "N/A"),
+            "Hourly Price (USD)": vm.get("price_per_hour", "N/A"),
+            "Monthly Cost (USD)": vm.get("monthly_cost", "N/A"),
+            "Peak VM (max)": peak_vm.get("name", "N/A"),
+        }
+        # p50/p95/p99/max of each metric
+        for metric in SERIES_METRICS:
+            for name in SERIES_QUANTILES:
+                result[f"{metric} {name}"] = quantile(metric, name)
+
+        results.append(result)
+        print(f"✅ {group['db_name']} ({group['reports']} snapshots) → {result['Recommended VM']} @ ${result['Hourly Price (USD)']}/hr"
+              f", peak {result['Peak VM (max)']}")
+    return results
+
+
+# ---------------------------------------------------------------------
+def analyze_all(cloud="azure", sizing_only=False, series=False):
     """
     Run pipeline on all uploaded AWR HTML reports and/or manual data.
     Produces summary with metrics + VM recommendations (AWS or Azure).
+    sizing_only: read only the sizing metrics by regex (full report analysis only for metrics not found).
+    series: size each database over all its snapshot reports (p50/p95/p99/max, see analyze_series)
+             instead of one summary row per report.
+    DBA_HIST extract uploads (csv/parquet, see process_awr_reports.hist_view) are always sized as snapshot series.
     """
     print("===============================================================")
     print(f"🧩 Starting Multi-Analysis for all uploads [{cloud.upper()}]")
@@ -28,6 +143,8 @@ def analyze_all(cloud="azure"):
 
     results = []
     awr_files = sorted(list(UPLOADS.glob("*.html")) + list(UPLOADS.glob("*.htm")))
+    hist_files = sorted(path for path in list(UPLOADS.glob("*.csv")) + list(UPLOADS.glob("*.parquet"))
+                        if process_awr_reports.hist_view(path.name))
 
     # ---------------------------------------------------------------------
     # 📥 Check for manual_inputs.json (added for Phase 1A)
@@ -44,25 +161,22 @@ def analyze_all(cloud="azure"):
     # ---------------------------------------------------------------------
     # 📊 Handle AWR HTML Files
     # ---------------------------------------------------------------------
-    if awr_files:
+    if hist_files or (awr_files and series):
+        results.extend(analyze_series(awr_files if series else [], cloud, sizing_only, hist_files))
+
+    if awr_files and not series:
         for awr in awr_files:
             print("---------------------------------------------------------------")
             print(f"⚙️ Processing file: {awr.name}")
 
             try:
-                # 🧠 Run the single report pipeline
-                subprocess.run(
-                    ["python3", str(RUN_PIPELINE), "--awr-file", str(awr)],
-                    check=True
-                )
-
-                # Find the latest generated Excel file
-                generated_files = list(OUTPUTS.glob("final_analysis_*.xlsx"))
-                if not generated_files:
-                    print("⚠️ No generated Excel files found.")
-                    continue
-
-                latest_file = max(generated_files, key=lambda f: f.stat().st_mtime)
+                # 🧠 Run the single report pipeline (sizing only: regex fast path, see run_pipeline.regex_fallback_parser)
+                metrics = None
+                if sizing_only:
+                    metrics = run_pipeline.regex_fallback_parser(awr)
+                    latest_file = run_pipeline.write_to_template_from_output(metrics)
+                else:
+                    latest_file = run_pipeline.run(awr)
                 wb = load_workbook(latest_file, data_only=True)
 
                 if "AWRData" not in wb.sheetnames:
@@ -106,16 +220,17 @@ def analyze_all(cloud="azure"):
                     "Hourly Price (USD)": vm.get("price_per_hour", "N/A"),
                     "Monthly Cost (USD)": vm.get("monthly_cost", "N/A")
                 }
+                if metrics:
+                    # Which path (regex or parser) produced each sizing metric
+                    result["Metric Sources"] = ", ".join(f"{k}={v}" for k, v in metrics["SOURCES"].items())
 
                 results.append(result)
                 print(f"✅ {db_name} → {result['Recommended VM']} @ ${result['Hourly Price (USD)']}/hr")
 
-            except subprocess.CalledProcessError as e:
-                print(f"❌ Error processing {awr.name}: {e}")
             except Exception as ex:
                 print(f"⚠️ Unexpected error on {awr.name}: {ex}")
 
-    else:
+    elif not awr_files and not hist_files:
         print("⚠️ No AWR HTML files found. Skipping file-based analysis.")
 
     # ---------------------------------------------------------------------
@@ -202,5 +317,6 @@ def analyze_all(cloud="azure"):
 # ---------------------------------------------------------------------
 if __name__ == "__main__":
     import sys
-    cloud = sys.argv[1] if len(sys.argv) > 1 else "azure"  # Default Azure
-    analyze_all(cloud)
+    args = [arg for arg in sys.argv[1:] if arg not in ("--sizing-only", "--series")]
+    cloud = args[0] if args else "azure"  # Default Azure
+    analyze_all(cloud, sizing_only="--sizing-only" in sys.argv[1:], series="--series" in sys.argv[1:])
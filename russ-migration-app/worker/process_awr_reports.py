@@ -11,21 +11,34 @@ debug = False
 
 # Some initializations
 sqlSource = 'sqlOrdered'    # get SQLs from AWR section 'SQL Statistics - Top N SQL ordered by *'
+sqlCountMode = 'occurrence' # SQL pattern/hint counts: 'occurrence' = each sql row, 'distinct' = each SQL Id once
 outFileBase = 'output_1'
-
-inFolder = sys.argv[1]
-outFolder = sys.argv[2]
-# output = os.path.join(local_out_path,output)
-fileNames = os.listdir(inFolder)
-files = []
-for f in fileNames:
-    files.append(os.path.join(inFolder, f))
-fileTexts = []
-# read the files content
-for fileName in files:
-    if fileName.endswith('.html') or fileName.endswith('.lst'):
-        with open(fileName, 'r', encoding="utf8", errors='ignore') as f:
-            fileTexts.append(f.read())
+htmlParser = 'html.parser'  # AWR html parser backend: 'html.parser' | 'lxml' | 'lxml.html' | 'stream' (see htmlParsers)
+batchWorkers = 1            # parallel report analysis processes (1 = serial, 0 = number of cpus)
+parseCacheFile = os.path.join(os.path.expanduser('~'), '.cache', 'russ_analyser', 'parse_cache.sqlite')  # report analysis cache ('' = disabled)
+parseCacheSize = 256 * 1024 * 1024  # max. size of all report analysis cache entries in bytes
+reportSniffSize = 16 * 1024 # report head size in bytes used to check the report kind before parsing (see sniff_report_kind)
+batchMemoryLimit = 0        # memory ceiling for the report analysis of a batch in MB (0 = no limit, see report_memory_estimate)
+profileStages = False       # record wall time and calls of the analysis stages and AWR queries (see profile_add)
+reportTimeLimit = 0         # wall time limit of the analysis of one report in seconds (0 = no limit, see run_watchdog)
+reportRssLimit = 0          # RSS limit of the process analyzing one report in MB (0 = no limit, see run_watchdog)
+sectionWorkers = 0          # parallel section parsing processes of one large AWR report (0|1 = disabled, see get_parallel_document)
+sectionMinSize = 16 * 1024 * 1024  # min. AWR report size in bytes for parallel section parsing
+outputFormats = ['xlsx']    # output files: 'xlsx' | 'parquet' | 'arrow' (see write_output)
+outputDataset = ''          # parquet dataset folder the results of each batch are appended to ('' = disabled, see append_output_dataset)
+
+# Usage (see main):
+# - command line: python3 process_awr_reports.py <inFolder> <outFolder> [--parser <parser>] [--workers <n>]
+#                 [--parse-cache <file> | --no-parse-cache] [--memory-limit <mb>] [--time-limit <s>] [--rss-limit <mb>]
+#                 [--section-workers <n>]
+#                 [--format <format> ..] [--dataset <dir>]
+#                 [--profile [<n>]] [--query-stats]
+#                 [--compare] [--compare-parsers <parser>[,<parser> ..]] [--compare-reference <parser>] [--compare-tolerance <tolerance>]
+# - library:      parse_report(<report path or content>) -> dict
+#                 parse_batch([<report and csv paths>]) -> pandas.DataFrame
+#                 parse_sizing(<AWR report path>) -> dict (sizing metrics only, regex fast path)
+#                 run_HIST([<DBA_HIST extract paths>]) -> list of dicts (one record per database snapshot)
+#                 write_output(<dataframe>, <outFolder>) / read_output_dataset(<dataset folder>) -> pandas.DataFrame
 
 
 
@@ -74,6 +87,48 @@ dbSizeCols = [
     ['INDEX_GB', 'db_indexes_gb'],
 ]
 
+# DBA_HIST extract files: csv or parquet exports of AWR repository views (see run_HIST)
+# The file name has to contain the view name, e.g. PROD_DBA_HIST_SYSSTAT.csv or dba_hist_osstat.parquet
+# { <view>: [<key columns>, <name column>, <value column>] } (DBA_HIST_DATABASE_INSTANCE only used for database names)
+histViews = {
+    'DBA_HIST_SYSMETRIC_SUMMARY': [['DBID', 'INSTANCE_NUMBER', 'SNAP_ID', 'BEGIN_TIME', 'END_TIME', 'INTSIZE'], 'METRIC_NAME', 'AVERAGE'],
+    'DBA_HIST_OSSTAT':            [['DBID', 'INSTANCE_NUMBER', 'SNAP_ID'], 'STAT_NAME', 'VALUE'],
+    'DBA_HIST_SYSSTAT':           [['DBID', 'INSTANCE_NUMBER', 'SNAP_ID'], 'STAT_NAME', 'VALUE'],
+    'DBA_HIST_SGA':               [['DBID', 'INSTANCE_NUMBER', 'SNAP_ID'], 'NAME', 'VALUE'],      # optional: SGA size
+    'DBA_HIST_DATABASE_INSTANCE': [['DBID', 'INSTANCE_NUMBER', 'STARTUP_TIME', 'DB_NAME', 'INSTANCE_NAME', 'HOST_NAME', 'VERSION', 'PLATFORM_NAME'], '', ''],
+}
+
+# Extract view statistics [view, statistic name, internal used column name, divisor, kind]
+# kind: 'value' = snapshot value, 'delta' = cumulative value (difference to the previous snapshot of the instance),
+#       'delta_ps' = cumulative value per second of the snapshot interval, 'rate' = per second average of the snapshot interval,
+#       'time' = per second average summed over the snapshot interval
+# Instance values are summarized per snapshot (RAC global values), rates of SYSSTAT deltas are used before SYSMETRIC averages.
+histStatCols = [
+    ['DBA_HIST_OSSTAT', 'NUM_CPUS', 'host_cpu_num', 1, 'value'],
+    ['DBA_HIST_OSSTAT', 'PHYSICAL_MEMORY_BYTES', 'host_memory_mb', 1048576, 'value'],
+    ['DBA_HIST_OSSTAT', 'BUSY_TIME', 'host_cpu_busy_time_s', 100, 'delta'],
+    ['DBA_HIST_OSSTAT', 'IDLE_TIME', 'host_cpu_idle_time_s', 100, 'delta'],
+    ['DBA_HIST_SYSSTAT', 'physical read total IO requests', 'db_physical_read_total_io_ps', 1, 'delta_ps'],
+    ['DBA_HIST_SYSSTAT', 'physical write total IO requests', 'db_physical_write_total_io_ps', 1, 'delta_ps'],
+    ['DBA_HIST_SYSSTAT', 'physical read total bytes', 'db_physical_read_total_mbps', 1048576, 'delta_ps'],
+    ['DBA_HIST_SYSSTAT', 'physical write total bytes', 'db_physical_write_total_mbps', 1048576, 'delta_ps'],
+    ['DBA_HIST_SYSSTAT', 'redo size', 'db_redo_mbps', 1048576, 'delta_ps'],
+    ['DBA_HIST_SYSSTAT', 'user calls', 'db_user_calls_ps', 1, 'delta_ps'],
+    ['DBA_HIST_SYSSTAT', 'user commits', 'db_user_commits_ps', 1, 'delta_ps'],
+    ['DBA_HIST_SYSSTAT', 'user rollbacks', 'db_user_rollbacks_ps', 1, 'delta_ps'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'Database Time Per Sec', 'db_time_min', 6000, 'time'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'CPU Usage Per Sec', 'db_cpu_fg_time_s', 100, 'time'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'Background CPU Usage Per Sec', 'db_cpu_bg_time_s', 100, 'time'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'Physical Read Total IO Requests Per Sec', 'db_physical_read_total_io_ps', 1, 'rate'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'Physical Write Total IO Requests Per Sec', 'db_physical_write_total_io_ps', 1, 'rate'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'Physical Read Total Bytes Per Sec', 'db_physical_read_total_mbps', 1048576, 'rate'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'Physical Write Total Bytes Per Sec', 'db_physical_write_total_mbps', 1048576, 'rate'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'Redo Generated Per Sec', 'db_redo_mbps', 1048576, 'rate'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'User Calls Per Sec', 'db_user_calls_ps', 1, 'rate'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'User Commits Per Sec', 'db_user_commits_ps', 1, 'rate'],
+    ['DBA_HIST_SYSMETRIC_SUMMARY', 'Total PGA Allocated', 'db_pga_usage_mb', 1048576, 'value'],
+]
+
 ########## Objects used for output files ###########
 
 # CSV and XLS output file column definition { <csv column position>, <csv column name>, <xls column position>, <xls column name> }
@@ -180,6 +235,23 @@ output_columns = [
     {'ccol': 69, 'cname': 'iops_per_sec_from_top_10_section', 'xcol': 69, 'xname': 'IOPS per sec from Top 10 section'},
     {'ccol': 70, 'cname': 'throughput_mb_per_sec_from_top_10_section', 'xcol': 70, 'xname': 'Throughput per sec from Top 10 section'},
 ]
+
+# Numeric csv columns (<cname> values) written as float64 columns into columnar output files (see get_arrow_table)
+# All other columns are written as string columns; empty values are written as null values.
+# -> Please do not change the type of a column (parquet datasets of several batches need a stable schema).
+outputNumericCols = [
+    'id', 'db_inst_num', 'db_inst_id',
+    'host_cpu_num', 'db_cpu_count', 'db_cpu_num', 'db_cpu_usage_pct',
+    'host_memory_mb', 'db_sga_usage_mb', 'db_pga_usage_mb', 'db_memory_mb', 'db_memory_usage_pct',
+    'db_physical_read_total_io_ps', 'db_physical_write_total_io_ps', 'db_iops',
+    'db_physical_read_total_mbps', 'db_physical_write_total_mbps', 'db_physical_read_pct', 'db_io_throughput_mbps',
+    'db_size_gb', 'db_tables_gb', 'db_indexes_gb',
+    'db_user_calls_ps', 'db_user_commits_ps', 'db_user_calls_pt', 'db_user_commits_pt', 'db_overfitting',
+    'elapsed_time_min', 'db_time_min', 'db_avg_active_sessions', 'db_cpu_pct_db_time', 'db_redo_mbps',
+    'db_net_bandwidth_mbitps', 'db_log_file_sync_avg_wait_ms', 'db_log_file_pwrite_avg_wait_ms', 'db_table_scans_dread_total',
+    'esx_cpu_speed', 'esx_cpu_num', 'esx_cores_per_cpu', 'esx_cores', 'esx_cpu_usage_pct', 'esx_memory_mb', 'esx_memory_usage_pct',
+    'iops_per_sec_from_top_10_section', 'throughput_mb_per_sec_from_top_10_section',
+]
 """
 End of ConfigCsvArrays.py script
 """
@@ -411,6 +483,17 @@ instance_column_calculations = [
     ['RV Memory','sum', 0],
     ['RV Memory usage %','avg', 0],
 ]
+
+# AWR report sections available as typed tables (see get_section_frame)
+# [section name, table summary regex (case insensitive), header column regexes for reports without table summary]
+# 'Top Databases by IO Requests' is read from the top IO text table of the report (awrDoc['top_io'])
+awrSections = [
+    ['Instance Activity Stats', 'displays instance activity statistics', ['Statistic', 'Total', 'per Second', 'per Trans']],
+    ['Time Model Statistics', 'time model statistics', ['Statistic Name', r'Time \(s\)', '% of +DB Time']],
+    ['Operating System Statistics', 'displays operating systems? statistics', ['Statistic', 'Value', 'End Value']],
+    ['Foreground Wait Events', 'Foreground Wait Events', ['Event', 'Waits', '%Time -outs', r'Total Wait Time \(s\)', 'Avg wait']],
+    ['Top Databases by IO Requests', None, None],
+]
 """
 End of ConfigQueryArrays.py script
 """
@@ -507,6 +590,7 @@ End of ConfigSQLArrays.py script
 Begin of HelperFuncitons.py script for functions regarding beautiful soup (parsing)
 """
 from math import ceil
+import time
 
 ############### Helper Functions ###############
 
@@ -552,6 +636,39 @@ def first_line_for_phrase(text, phrase):
         if phrase in line:
             return i
     return -1
+
+############### Profiling Functions ###############
+
+# Profile of the report analysis running in this process (None = profiling disabled, see profile_start)
+# {'stages': {<stage>: [calls, seconds]}, 'queries': {(<kind>, <release>, <row>, <column>, <key>): [calls, seconds]}}
+reportProfile = None
+
+def profile_start(enabled):
+    ''' Start the profile of a new report analysis if <enabled> (see profileStages) '''
+    global reportProfile
+    reportProfile = {'stages': {}, 'queries': {}} if enabled else None
+
+def profile_end():
+    ''' End the profile of the report analysis and return it (None if profiling is disabled) '''
+    global reportProfile
+    profile, reportProfile = reportProfile, None
+    return profile
+
+def profile_add(section, name, start):
+    ''' Add one call and the wall time since <start> (time.perf_counter) to entry <name> of profile <section> '''
+    if reportProfile is not None:
+        entry = reportProfile[section].setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += time.perf_counter() - start
+
+def profile_merge(total, profile):
+    ''' Add the calls and times of report profile <profile> to profile <total> '''
+    for section in ['stages', 'queries']:
+        for name, (calls, seconds) in profile[section].items():
+            entry = total[section].setdefault(name, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+    return total
 """
 End of HelperFunctions.py script
 """
@@ -562,117 +679,280 @@ import re
 # for BeautifulSoup see
 # - https://beautiful-soup-4.readthedocs.io/en/latest/
 # - https://www.crummy.com/software/BeautifulSoup/bs4/doc/
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
 
 #from HelperFunctions import *
 #from LocalExecParams import *
 
 ##### Functions regarding html report parsing ####
 
-def find_table(tables, row_name="", col_name=""):
+def soup_table_record(table):
+    '''
+    Walk a BeautifulSoup html table only once and return its content for the table index:
+    - 'summary':     table attribute 'summary' (None if not available, e.g. AWR 10.2.0.3.0)
+    - 'header':      [<th string>, <th has colspan>] for all th cells (used for column index lookup)
+    - 'rows':        [<td string>, ...] for all tr rows (cell coordinates are [row][column])
+    - 'row_headers': [<th text>, ...] for all tr rows
+    - 'strings':     all distinct text nodes (replaces table.find_all(string=re.compile(...)))
+    '''
+    header = []; rows = []; row_headers = []; row_tags = []; strings = set(); nested = False
+
+    for elem in table.descendants:
+        if isinstance(elem, NavigableString):
+            strings.add(str(elem))
+        elif elem.name == 'tr':
+            rows.append([]); row_headers.append([]); row_tags.append(elem)
+        elif elem.name in ('td', 'th'):
+            # cell belongs to the current row only if it's a descendant of that row
+            in_row = False
+            if row_tags:
+                parent = elem.parent
+                while parent is not None and parent is not table and parent.name != 'tr':
+                    parent = parent.parent
+                in_row = parent is row_tags[-1]
+            if elem.name == 'th':
+                header.append([None if elem.string is None else str(elem.string), 'colspan' in elem.attrs])
+                if in_row: row_headers[-1].append(elem.text)
+            elif in_row:
+                rows[-1].append(None if elem.string is None else str(elem.string))
+        elif elem.name == 'table':
+            nested = True
+
+    # Nested tables (not seen in AWR reports so far): cells belong to all rows around them
+    if nested:
+        rows = []; row_headers = []
+        for row in table.find_all('tr'):
+            rows.append([None if td.string is None else str(td.string) for td in row.find_all('td')])
+            row_headers.append([th.text for th in row.find_all('th')])
+
+    return {
+        'summary': table.attrs['summary'] if table.has_attr('summary') else None,
+        'header': header,
+        'rows': rows,
+        'row_headers': row_headers,
+        'strings': strings,
+    }
+
+def soup_text_table(table):
+    '''
+    Return th texts and td texts of all rows containing td cells from a BeautifulSoup html table
+    Used for SQL text analysis and "Top Databases by IO Requests" section
+    '''
+    if table is None:
+        return {'th': [], 'rows': []}
+    rows = []
+    for row in table.find_all('tr'):
+        tds = row.find_all('td')
+        if len(row) != 0 and len(tds) != 0:
+            rows.append([td.text for td in tds])
+    return {'th': [th.text for th in table.find_all('th')], 'rows': rows}
+
+def build_table_index(tables):
+    '''
+    Build a lookup index for all html tables of one AWR report (built once per report)
+    <tables> are table records of the parser backend (see soup_table_record or lxml_table_record)
+    The index keeps the table records and for the whole report:
+    - 'headers': th text -> table positions (th cells found in table rows)
+    - 'labels':  row label (td string of first 3 columns) -> {table position: first row position}
+    Regex lookups against this dictionaries are cached, so each query runs only once per report.
+    '''
+    table_index = {'tables': [], 'headers': {}, 'labels': {}, 'cache': {}}
+
+    for pos, table in enumerate(tables):
+        for r, cells in enumerate(table['rows']):
+            for text in table['row_headers'][r]:
+                table_index['headers'].setdefault(text, set()).add(pos)
+            # looking for row labels in first 3 columns (see get_value)
+            for label in cells[:3]:
+                if label:
+                    table_index['labels'].setdefault(label, {}).setdefault(pos, r)
+        table['pos'] = pos
+        table_index['tables'].append(table)
+    return table_index
+
+# Compiled lookup regexes by pattern (see get_regex)
+compiledRegexes = {}
+
+def get_regex(pattern):
+    ''' Return the compiled regex of a lookup pattern (compiled once per process) '''
+    regex = compiledRegexes.get(pattern)
+    if regex is None:
+        regex = compiledRegexes[pattern] = re.compile(pattern)
+    return regex
+
+def regex_literal(pattern):
+    '''
+    Return the plain text of a regex pattern without any regex operators
+    (escaped special characters like '\\(' are allowed) or None otherwise
+    '''
+    literal = re.sub(r'\\([^0-9A-Za-z])', '', pattern)
+    if '\\' in literal or any(c in literal for c in '.^$*+?{}[]|()'):
+        return None
+    return re.sub(r'\\([^0-9A-Za-z])', r'\1', pattern)
+
+def index_lookup(table_index, kind, pattern, pos=None):
+    '''
+    Cached regex lookup against the table index
+    kind 'strings' -> True if a text node of table <pos> matches re.search(pattern)
+    kind 'headers' -> table positions with a th cell matching re.match(pattern)
+    kind 'labels'  -> {table position: first row position} with a row label matching re.match(pattern)
+    '''
+    key = (kind, pattern, pos)
+    if key in table_index['cache']:
+        return table_index['cache'][key]
+
+    # plain text patterns (e.g. 'Time \\(s\\)') don't need the regex engine
+    literal = regex_literal(pattern)
+    if literal is None:
+        regex = get_regex(pattern)
+        search = regex.search
+        match = regex.match
+    else:
+        search = lambda string: literal in string
+        match = lambda string: string.startswith(literal)
+
+    if kind == 'strings':
+        result = any(search(string) for string in table_index['tables'][pos]['strings'])
+    elif kind == 'headers':
+        result = set()
+        for string, positions in table_index['headers'].items():
+            if not positions <= result and match(string):
+                result |= positions
+    else:
+        result = {}
+        for string, positions in table_index['labels'].items():
+            if match(string):
+                for pos, r in positions.items():
+                    if pos not in result or r < result[pos]:
+                        result[pos] = r
+    table_index['cache'][key] = result
+    return result
+
+def find_table(table_index, row_name="", col_name="", table_pos=None):
     """ Find the table that contains the row that we are looking for """
 
     # print("row_name=" + row_name + "; col_name=" + col_name)  # for debugging
-    for table in tables:
-        if row_name == "" or table.find_all(string=re.compile(row_name)):
-            # some awr seem to have broken html --> "bug fix" - skip this SQLs section globaly (should be debuged and skiped for special oracle releases only)!
-            # AWR 10.2.0.3.0 reports doesn't have table attributes 'summary'!
-            if table.has_attr('summary') and table.attrs['summary'].startswith('SQL ordered by Offload Eligible Bytes'):
-                continue
-            # Gives all tables contain column name
-            if table.find_all(string=re.compile(col_name)) or col_name == "":
-                # check correct column is there
-                rows = table.find_all('tr')
-                for row in rows:
-                    data = row.find_all('th')
-                    is_found = [True for elem in data if re.match(col_name, elem.text)]
-                    # is_found = [True for elem in data if col_name.replace('\\', '') == elem.text]
-                    if any(is_found):
-                        return table
+    # Gives all tables contain column name as th cell (check correct column is there)
+    positions = index_lookup(table_index, 'headers', col_name)
+    if table_pos is not None:
+        positions = positions & {table_pos}
+
+    for pos in sorted(positions):
+        table = table_index['tables'][pos]
+        if row_name != "" and not index_lookup(table_index, 'strings', row_name, pos):
+            continue
+        if col_name != "" and not index_lookup(table_index, 'strings', col_name, pos):
+            continue
+        # some awr seem to have broken html --> "bug fix" - skip this SQLs section globaly (should be debuged and skiped for special oracle releases only)!
+        # AWR 10.2.0.3.0 reports doesn't have table attributes 'summary'!
+        if table['summary'] is not None and table['summary'].startswith('SQL ordered by Offload Eligible Bytes'):
+            continue
+        return table
     return
 
-def get_value(table, row_name='', col_name='', instid=0):
-    """ Parse the table and get the value of column <col_name> and row <row_name> """
-
-    # print('row_name:', row_name, 'col_name:', col_name) # for debugging
-    # if row_name == 'log file parallel write':           # for debugging
-    #     print(row_name)
-    # if col_name == 'DB time\\(min\\)':                  # for debugging
-    #     print(col_name)
+def get_column_index(table, col_name):
+    """ Get the td cell index of column <col_name> in a table record (-1 if not found, see get_value) """
 
-    header = table.findChildren(['th'])
-    rows = table.findChildren(['tr'])
+    header = table['header']
     col_idx = -1
 
     # get the column index for lookup column
+    col_match = get_regex(col_name).match
     for c, col in enumerate(header):
-        # if col.string and re.search(col_name, col.string) and 'colspan' not in col.attrs: # ignore top level column names - only nested
-        # if col.string and col.string == col_name.replace("\\","") and 'colspan' not in col.attrs: # ignore top level column names - only nested
-        if col.string and re.match(col_name, col.string) and 'colspan' not in col.attrs: # ignore top level column names - only nested
+        if col[0] and col_match(col[0]) and not col[1]: # ignore top level column names - only nested
             col_idx = c
             break
 
     # Fixing indexing for RAC files (substract top level columns)
-    for i in enumerate(header):
-        if 'colspan' in i[1].attrs:
+    for col in header:
+        if col[1]:
             col_idx -= 1
+    return col_idx
+
+def get_value_position(table_index, table, row_name='', col_name='', instid=0):
+    """ Get the cell position [row position, column index] of column <col_name> and row <row_name> (None if not found) """
+
+    rows = table['rows']
+    col_idx = get_column_index(table, col_name)
 
     # Exit if column lookup failed
     if col_idx == -1:
-        return ""
+        return None
 
     # Special handling for initialization/init.ora parameter table for rac databases
     # rac parameter can be defined for all "*" or specified "<InstID>" instances
     #
     # AWR 10.2.0.3.0 reports doesn't have table attributes 'summary' -> have to be fixed soon!
     # look for first column name (first th.string) = 'Parameter Name' insteed of table attribute 'summary'!
-    if instid > 0 and table.has_attr('summary') and re.search('.*init.* parameters.*', table.attrs['summary']):
-        for row in rows:
-            cells = row.findChildren('td')
-            # if cells and cells[0].string == row_name.replace("\\","") and ( cells[1].string == '*' or cells[1].string == str(instid)):
-            if cells and re.match(row_name, cells[0].string) and ( cells[1].string == '*' or cells[1].string == str(instid)):
-                    return cells[col_idx].string
-        return ""
+    if instid > 0 and table['summary'] is not None and re.search('.*init.* parameters.*', table['summary']):
+        for r, cells in enumerate(rows):
+            if cells and re.match(row_name, cells[0]) and ( cells[1] == '*' or cells[1] == str(instid)):
+                    return [r, col_idx]
+        return None
 
     # All other table lookups
-    for row in rows:
-        # Check if the row we are looking for (name or empty) exists
-        # looking for row value in first 3 columns and return col_idx column value
-        cells = row.findChildren('td')
-        if cells and (
-          row_name == ''
-          or (cells[0].string and re.match(row_name, cells[0].string))
-          or (len(cells) > 1 and cells[1].string and re.match(row_name, cells[1].string))
-          or (len(cells) > 2 and cells[2].string and re.match(row_name, cells[2].string))
-        ):
-            return cells[col_idx].string
-    return ""
+    # looking for row value in first 3 columns and return col_idx column value
+    if row_name == '':
+        for r, cells in enumerate(rows):
+            if cells:
+                return [r, col_idx]
+        return None
+    labels = index_lookup(table_index, 'labels', row_name)
+    if table['pos'] in labels:
+        return [labels[table['pos']], col_idx]
+    return None
+
+def get_value(table_index, table, row_name='', col_name='', instid=0):
+    """ Parse the table and get the value of column <col_name> and row <row_name> """
 
-def get_info(tables, row_name, col_name, instid=0):
-    """ get desired entry based on col/row name """
+    # print('row_name:', row_name, 'col_name:', col_name) # for debugging
 
-    if len(tables) > 0:
+    position = get_value_position(table_index, table, row_name=row_name, col_name=col_name, instid=instid)
+    if position is None:
+        return ""
+    return table['rows'][position[0]][position[1]]
+
+def get_info_position(table_index, row_name, col_name, instid=0, table_pos=None):
+    """ get the table and the cell position of the desired entry based on col/row name: [table, position] (see get_value_position) """
+
+    if len(table_index['tables']) > 0:
         # Find the table that contains the row that we are looking for
-        table = find_table(tables, row_name, col_name)
+        table = find_table(table_index, row_name, col_name, table_pos)
     else:
         print("Did not find ANY tables!")
         return
 
     if table:
-        # Parse the table and get the value of column <col_name> and row <row_name>
-        resultval = get_value(table, row_name=row_name, col_name=col_name, instid=instid)
-        if resultval != None:
-            return resultval
-        else:
-            return ""
+        # Parse the table and get the position of column <col_name> and row <row_name>
+        return [table, get_value_position(table_index, table, row_name=row_name, col_name=col_name, instid=instid)]
     else:
         print("Did not find a table with col_name \"%s\" and row_name \"%s\"!" % (col_name, row_name))
     return
 
-def get_soup(fileText):
-    """ load file and create parseable data structure """
+def get_info(table_index, row_name, col_name, instid=0, table_pos=None):
+    """ get desired entry based on col/row name """
+
+    located = get_info_position(table_index, row_name, col_name, instid, table_pos)
+    return located_value(located)
+
+def located_value(located):
+    """ value of a located entry [table, position] (see get_info_position) """
+
+    if located is None:
+        return
+    table, position = located
+    if position is None:
+        return ""
+    resultval = table['rows'][position[0]][position[1]]
+    if resultval != None:
+        return resultval
+    else:
+        return ""
+
+def get_soup(fileText, parser='html.parser'):
+    """ load file and create parseable data structure (parser: BeautifulSoup tree builder 'html.parser' or 'lxml') """
 
-    soup = BeautifulSoup(fileText, features="html.parser")
+    soup = BeautifulSoup(fileText, features=parser)
     # https://beautiful-soup-4.readthedocs.io/en/latest/index.html?highlight=BeautifulSoup#encodings
     # https://beautiful-soup-4.readthedocs.io/en/latest/index.html?highlight=BeautifulSoup#inconsistent-encodings
     # soup = BeautifulSoup(fileText, features="html.parser", from_encoding="iso-8859-8", exclude_encodings=["iso-8859-7"])
@@ -694,6 +974,11 @@ def get_tables(soup, type = 'all'):
         h1 = soup.find('h1', string=re.compile("WORKLOAD REPOSITORY .*REPORT", re.IGNORECASE))
         h1Sourceline = h1.sourceline
         h1Sourcepos = h1.sourcepos
+        # lxml tree builder doesn't support source positions -> use document order
+        if h1Sourceline is None:
+            if type == 'report':
+                return h1.find_all_next('table')
+            return list(reversed(h1.find_all_previous('table')))
     def awrTables(tag):
         # see this https://scrapeops.io/python-web-scraping-playbook/python-beautifulsoup-findall/
         # and this https://beautiful-soup-4.readthedocs.io/en/latest/index.html?highlight=find_all#a-function
@@ -706,24 +991,898 @@ def get_tables(soup, type = 'all'):
     tables = soup.find_all(awrTables)   # get all awr report related html tables
     return tables
 
-def get_inst_list(inst_soup_table):
-    """ fetch all rac instance ids from database instances table """
+def get_soup_document(soup, sqlSectionSearch):
+    '''
+    Get the AWR report content used by run_AWR from a BeautifulSoup html soup (see get_awr_document)
+    '''
+    awrDoc = {}
+    awrDoc['title'] = soup.head.title.text
+    # report type checks are done in the first 150 characters of the report text
+    awrDoc['text'] = soup.text[:150]
+
+    # Get html tables from awr report
+    # allTables = get_tables(soup)                 # not used actually
+    # warningTables = get_tables(soup, 'warning')  # not used actually
+    awrDoc['tables'] = build_table_index([soup_table_record(table) for table in get_tables(soup, 'report')])
+
+    '''
+    AWR 10.2.0.3.0 reports doesn't have a table attribute 'summary'!
+    So we switched SQL table identification
+    from an all table search and table filter on summary attribute
+        tables = soup.findChildren('table')
+        re.search(sqlSectionSearch, table.attrs['summary'], re.IGNORECASE)
+    to an indirect table search using arefs in 'SQL Statistics' list
+        arefs = soup.find_all('a', string=re.compile(sqlSectionSearch))
+    '''
+    # Get all arefs from 'SQL Statistics' link list for specified search string
+    # Walk through search result, jump to defined href and get next table for 'SQL Text' column analysis
+    awrDoc['sql_tables'] = []
+    for aref in soup.find_all('a', string=re.compile(sqlSectionSearch)):
+        h = aref.attrs["href"].rpartition("#")[2]
+        table = aref.find_next("a", attrs={"name": h}).find_next("table")
+        awrDoc['sql_tables'].append(soup_text_table(table))
+
+    # "Top Databases by IO Requests" section (None if not available)
+    awrDoc['top_io'] = None
+    target_element = soup.find(string="Top Databases by IO Requests")
+    if target_element:
+        awrDoc['top_io'] = soup_text_table(target_element.find_next('table'))
+    return awrDoc
+
+def get_inst_list(inst_table):
+    """ fetch all rac instance ids from database instances table (table index entry) """
 
-    inst_rows = inst_soup_table.findChildren(['tr'])
     inst_arr = []
-    for inst_row in inst_rows:
-        inst_cells = inst_row.findChildren('td')
+    for inst_cells in inst_table['rows']:
         if inst_cells:
-            inst_arr.append(int(inst_cells[0].string))
+            inst_arr.append(int(inst_cells[0]))
     # print(inst_arr)
     return inst_arr
 """
 End of SoapParsingFunctions.py script
 """
 """
+Begin of StreamParsingFunctions.py script for functions regarding streaming AWR html report parsing
+"""
+import re
+from html.parser import HTMLParser
+
+#from SoapParsingFunctions import *
+
+############ Streaming html report parsing ##############
+
+# html void elements closed immediately (same as BeautifulSoup html.parser tree builder)
+htmlVoidTags = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem', 'meta',
+    'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex',
+    'nextid', 'spacer',
+}
+
+# read buffer size for streaming report files
+streamChunkSize = 1024 * 1024
+
+def get_query_lookups(isRacReport=None):
+    '''
+    Return the [row, column] lookups of the awr queries of the active query plan (see get_query_plan):
+    AWR RAC report queries (isRacReport True), single instance report queries (False) or all queries (None)
+    Row None are the instance id rows of RAC instance queries (see get_instance_column)
+    Only the report tables found by one of these lookups are kept by the streaming parser
+    (run_AWR lookups with table_pos use the first two report tables, which are always kept)
+    '''
+    lookups = []
+    if isRacReport is not False:
+        lookups += [[query[0], query[1]] for query in queries_RAC]
+        lookups += [[query[0] or None, query[1]] for query in queries_RAC_Instance]
+    if not isRacReport:
+        lookups += [[query[0], query[1]] for query in queries_STD]
+    return [list(lookup) for lookup in {tuple(lookup) for lookup in lookups}]
+
+# raw html table tags (see html_parse_failed)
+tableTagRegex = re.compile(r'<table[\s>]', re.IGNORECASE)
+
+class AwrStreamParser(HTMLParser):
+    '''
+    Event driven AWR html report parser (see get_stream_document)
+    The html report is fed in chunks and no document tree is built. Open elements are tracked
+    on a stack with just enough information to emulate BeautifulSoup .string and .text:
+    [tag, number of children, string of first child, text parts (or None if text is not needed)]
+    Only the table records needed by the queries, the SQL section tables and the
+    "Top Databases by IO Requests" table are kept, so memory doesn't grow with the report size.
+    '''
+
+    def __init__(self, sqlSectionSearch, queryLookups=None):
+        super().__init__(convert_charrefs=True)
+        self.sqlRegex = re.compile(sqlSectionSearch)
+        self.h1Regex = re.compile("WORKLOAD REPOSITORY .*REPORT", re.IGNORECASE)
+        # lookups not found in a previous table: [row, column, instance ids] (see table_needed)
+        self.lookups = None if queryLookups is None else [[row, col, None] for row, col in queryLookups]
+
+        self.data = []              # text of the current text node (see flush)
+        self.stack = []             # open elements
+        self.collecting = []        # open elements collecting text (see handle_data)
+        self.title = None
+        self.textParts = []; self.textLen = 0  # first 150 characters of report text
+        self.h1Pos = None           # source position of the 'WORKLOAD REPOSITORY REPORT' heading
+        self.h1Start = None         # source position of the current h1
+        self.tableNum = 0
+        self.tables = []            # report table records
+        self.records = []           # open report table records
+        self.textTables = []        # open text tables (SQL sections, Top IO)
+        self.sqlLinks = []          # [anchor name, text table or None] for all SQL section links
+        self.sqlPending = []        # SQL section links waiting for the next table
+        self.topIo = None
+        self.topIoPending = False
+
+    # --- element stack ---
+
+    def push(self, tag, collect=False):
+        frame = [tag, 0, None, [] if collect else None]
+        self.stack.append(frame)
+        if collect:
+            self.collecting.append(frame)
+        return frame
+
+    def pop(self):
+        frame = self.stack.pop()
+        if frame[3] is not None:
+            self.collecting.pop()
+        string = frame[2] if frame[1] == 1 else None
+        if self.stack:
+            self.add_child(string)
+        self.close_element(frame, string)
+
+    def add_child(self, string):
+        parent = self.stack[-1]
+        parent[1] += 1
+        if parent[1] == 1:
+            parent[2] = string
+
+    # --- tokenizer events ---
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        collect = tag in ('title', 'th', 'td')
+        if tag == 'h1':
+            self.h1Start = self.getpos()
+        elif tag == 'a':
+            attrs = dict(attrs)
+            if 'name' in attrs:
+                for link in self.sqlPending:
+                    if link[0] == attrs['name'] and link[1] is None:
+                        link[1] = False   # anchor found -> waiting for next table
+            self.push(tag).append(attrs.get('href'))
+            return
+        elif tag == 'table':
+            self.open_table(dict(attrs))
+        elif tag == 'tr':
+            for record in self.records:
+                record['rows'].append([]); record['row_headers'].append([])
+                record['trs'].append(len(self.stack))
+            for table in self.textTables:
+                table['rows'].append([])
+        frame = self.push(tag, collect)
+        if tag == 'th':
+            frame.append('colspan' in dict(attrs))
+        if tag in htmlVoidTags:
+            self.pop()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in htmlVoidTags:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self.flush()
+        # close all elements up to the most recent open element <tag> (ignore end tags without start tag)
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                while len(self.stack) > i:
+                    self.pop()
+                return
+
+    def handle_data(self, data):
+        # the tokenizer may split a text node (e.g. at a '<' character) -> join the parts like BeautifulSoup
+        self.data.append(data)
+
+    def flush(self):
+        if not self.data:
+            return
+        data = ''.join(self.data)
+        self.data = []
+        # BeautifulSoup replaces whitespace only text nodes by a single newline or space
+        if not data.strip(' \n\t\f\r') and not any(frame[0] in ('pre', 'textarea') for frame in self.stack):
+            data = '\n' if '\n' in data else ' '
+        self.add_string(data)
+        if self.stack and self.stack[-1][0] in ('style', 'script'):
+            return
+        for frame in self.collecting:
+            frame[3].append(data)
+        if self.textLen < 150:
+            self.textParts.append(data); self.textLen += len(data)
+        if data == "Top Databases by IO Requests" and self.topIo is None:
+            self.topIoPending = True
+
+    def handle_comment(self, data):
+        self.flush()
+        # comments are strings for BeautifulSoup .string but not part of .text
+        self.add_string(data)
+        if data == "Top Databases by IO Requests" and self.topIo is None:
+            self.topIoPending = True
+
+    def add_string(self, string):
+        for record in self.records:
+            record['strings'].add(string)
+        if self.stack:
+            self.add_child(string)
+
+    # --- tables ---
+
+    def open_table(self, attrs):
+        self.tableNum += 1
+        # report tables are all tables behind the 'WORKLOAD REPOSITORY REPORT' heading (see get_tables)
+        if self.h1Pos is not None:
+            line, pos = self.getpos()
+            if line >= self.h1Pos[0] and pos >= self.h1Pos[1]:
+                if self.records:
+                    self.records[-1]['nested'] = True
+                self.records.append({
+                    'summary': attrs.get('summary'), 'header': [], 'rows': [], 'row_headers': [],
+                    'strings': set(), 'trs': [], 'depth': len(self.stack), 'nested': False,
+                })
+        # SQL section and Top IO tables are the next table behind the section anchor
+        textTable = None
+        for link in self.sqlPending:
+            if link[1] is False:
+                textTable = textTable or {'th': [], 'rows': [], 'depth': len(self.stack)}
+                link[1] = textTable
+        self.sqlPending = [link for link in self.sqlPending if link[1] is None]
+        if self.topIoPending:
+            textTable = textTable or {'th': [], 'rows': [], 'depth': len(self.stack)}
+            self.topIo = textTable
+            self.topIoPending = False
+        if textTable:
+            self.textTables.append(textTable)
+
+    def close_element(self, frame, string):
+        tag = frame[0]
+        depth = len(self.stack)
+        if tag == 'title':
+            if self.title is None:
+                self.title = ''.join(frame[3])
+        elif tag == 'h1':
+            if self.h1Pos is None and string is not None and self.h1Regex.search(string):
+                self.h1Pos = self.h1Start
+        elif tag == 'a':
+            if string is not None and frame[4] is not None and self.sqlRegex.search(string):
+                link = [frame[4].rpartition("#")[2], None]
+                self.sqlLinks.append(link); self.sqlPending.append(link)
+        elif tag in ('th', 'td'):
+            text = ''.join(frame[3])
+            for record in self.records:
+                if tag == 'th':
+                    record['header'].append([string, frame[4]])
+                # cell belongs to the current row of the record
+                if record['trs'] and (record['nested'] or record['trs'][-1] == depth - 1 or self.in_row(record, depth)):
+                    if tag == 'th':
+                        record['row_headers'][-1].append(text)
+                    else:
+                        record['rows'][-1].append(string)
+            for table in self.textTables:
+                if tag == 'th':
+                    table['th'].append(text)
+                elif table['rows']:
+                    table['rows'][-1].append(text)
+        elif tag == 'tr':
+            for record in self.records:
+                if record['trs'] and record['trs'][-1] == depth:
+                    record['trs'].pop()
+            for table in self.textTables:
+                if table['rows'] and not table['rows'][-1]:
+                    table['rows'].pop()   # rows without td cells are skipped (see soup_text_table)
+        elif tag == 'table':
+            if self.records and self.records[-1]['depth'] == depth:
+                self.close_record(self.records.pop())
+            if self.textTables and self.textTables[-1]['depth'] == depth:
+                self.textTables.pop()
+
+    def in_row(self, record, depth):
+        # the cell belongs to the last open row if no other tr is open between row and cell
+        return all(frame[0] != 'tr' for frame in self.stack[record['trs'][-1] + 1:depth])
+
+    def close_record(self, record):
+        pos = len(self.tables)
+        keep = pos < 2 or self.lookups is None or self.table_needed(record)
+        del record['trs'], record['depth'], record['nested']
+        if not keep:
+            # drop tables which aren't found by any lookup, keep the table position and
+            # the th cells (same 'headers' index as the whole report, see build_table_index)
+            rowHeaders = [cells for cells in record['row_headers'] if cells]
+            record = {'summary': record['summary'], 'header': [], 'rows': [[] for cells in rowHeaders],
+                      'row_headers': rowHeaders, 'strings': set()}
+        self.tables.append(record)
+
+    def table_needed(self, record):
+        '''
+        Check if table <record> is the first table found by any pending lookup: a th cell matching the column,
+        text nodes matching the column and the row (see find_table) or an instance id (see get_instance_column)
+        '''
+        if record['summary'] is not None and record['summary'].startswith('SQL ordered by Offload Eligible Bytes'):
+            return False
+        headers = {text for cells in record['row_headers'] for text in cells}
+        strings = record['strings']
+        needed = False
+        for lookup in self.lookups:
+            row, col, instances = lookup
+            if not headers or not any(get_regex(col).match(text) for text in headers):
+                continue
+            search = get_regex(col).search
+            if not any(search(string) for string in strings):
+                continue
+            if row is None:
+                if instances is None:
+                    try:
+                        instances = lookup[2] = [str(instance) for instance in get_inst_list(self.tables[1])]
+                    except Exception:
+                        # no instance ids: keep all tables of the lookup column
+                        instances = lookup[2] = []
+                found = [instance for instance in instances if any(instance in string for string in strings)]
+                if found:
+                    lookup[2] = [instance for instance in instances if instance not in found]
+                    needed = True
+                    if not lookup[2]:
+                        lookup[1] = None
+                elif not instances:
+                    needed = True
+            elif row == '' or any(get_regex(row).search(string) for string in strings):
+                lookup[1] = None
+                needed = True
+        self.lookups = [lookup for lookup in self.lookups if lookup[1] is not None]
+        return needed
+
+def get_stream_document(source, sqlSectionSearch, queryLookups=None):
+    '''
+    Get the AWR report content used by run_AWR (see get_awr_document) without building a document tree
+    <source> is the report text or a text file object (read in chunks of streamChunkSize)
+    <queryLookups> [row, column] lookups of the active query plan (see get_query_lookups), None keeps all tables
+    The raw html table tags of the chunks are counted in 'table_tags' (see html_parse_failed)
+    '''
+    parser = AwrStreamParser(sqlSectionSearch, queryLookups)
+    if isinstance(source, str):
+        chunks = (source[pos:pos + streamChunkSize] for pos in range(0, len(source), streamChunkSize))
+    else:
+        chunks = iter(lambda: source.read(streamChunkSize), '')
+    tableTags = 0
+    tail = ''   # end of the previous chunk: shorter than a table tag match, so no tag is counted twice
+    for chunk in chunks:
+        tableTags += len(tableTagRegex.findall(tail + chunk))
+        tail = chunk[-6:]
+        parser.feed(chunk)
+    parser.close()
+    parser.flush()
+    while parser.stack:
+        parser.pop()
+
+    if parser.title is None or parser.h1Pos is None:
+        raise ValueError('no AWR report title or heading found')
+
+    awrDoc = {}
+    awrDoc['title'] = parser.title
+    awrDoc['text'] = ''.join(parser.textParts)[:150]
+    awrDoc['tables'] = build_table_index(parser.tables)
+    awrDoc['sql_tables'] = [link[1] or {'th': [], 'rows': []} for link in parser.sqlLinks]
+    awrDoc['top_io'] = parser.topIo
+    awrDoc['table_num'] = parser.tableNum
+    awrDoc['table_tags'] = tableTags
+    for table in awrDoc['sql_tables'] + ([awrDoc['top_io']] if awrDoc['top_io'] else []):
+        table.pop('depth', None)
+    return awrDoc
+"""
+End of StreamParsingFunctions.py script
+"""
+"""
+Begin of ParserBackends.py script for functions regarding html parser backend selection
+"""
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+# lxml is optional: without lxml all reports are parsed by html.parser
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+#from SoapParsingFunctions import *
+
+############ Html parser backends ##############
+
+# Supported html parser backends (see htmlParser)
+# - 'html.parser' = BeautifulSoup with python html.parser tree builder (reference implementation, slowest)
+# - 'lxml'        = BeautifulSoup with lxml tree builder
+# - 'lxml.html'   = raw lxml.html element tree without BeautifulSoup (fastest)
+# - 'stream'      = event driven python html.parser tokenizer without any document tree (lowest memory)
+htmlParsers = ['html.parser', 'lxml', 'lxml.html', 'stream']
+
+def lxml_string(elem):
+    ''' lxml.html equivalent of BeautifulSoup tag.string (text of an element with a single text child) '''
+    children = list(elem)
+    if not children:
+        return elem.text
+    if len(children) == 1 and not elem.text and not children[0].tail:
+        if not isinstance(children[0].tag, str):  # comment
+            return children[0].text
+        return lxml_string(children[0])
+    return None
+
+def lxml_itertext(elem):
+    ''' lxml.html equivalent of BeautifulSoup tag.text (without style, script and comment content) '''
+    if isinstance(elem.tag, str) and elem.tag not in ('style', 'script'):
+        if elem.text:
+            yield elem.text
+        for child in elem:
+            yield from lxml_itertext(child)
+            if child.tail:
+                yield child.tail
+
+def lxml_table_record(table):
+    ''' lxml.html equivalent of soup_table_record '''
+    header = []; rows = []; row_headers = []; strings = set(); nested = False
+
+    for elem in table.iter():
+        # all text nodes inside the table (comments included like BeautifulSoup does)
+        if elem.text:
+            strings.add(elem.text)
+        if elem is not table and elem.tail:
+            strings.add(elem.tail)
+        if elem.tag == 'th':
+            header.append([lxml_string(elem), 'colspan' in elem.attrib])
+        elif elem.tag == 'table' and elem is not table:
+            nested = True
+
+    for row in table.iter('tr'):
+        rows.append([]); row_headers.append([])
+        for elem in row.iter('td', 'th'):
+            # cell belongs to the current row only if it's not part of a nested table row
+            # (nested tables, not seen in AWR reports so far: cells belong to all rows around them)
+            if not nested and next(elem.iterancestors('tr')) is not row:
+                continue
+            if elem.tag == 'th':
+                row_headers[-1].append(''.join(lxml_itertext(elem)))
+            else:
+                rows[-1].append(lxml_string(elem))
+
+    return {
+        'summary': table.get('summary'),
+        'header': header,
+        'rows': rows,
+        'row_headers': row_headers,
+        'strings': strings,
+    }
+
+def lxml_text_table(table):
+    ''' lxml.html equivalent of soup_text_table '''
+    if table is None:
+        return {'th': [], 'rows': []}
+    rows = []
+    for row in table.iter('tr'):
+        tds = list(row.iter('td'))
+        if len(tds) != 0:
+            rows.append([''.join(lxml_itertext(td)) for td in tds])
+    return {'th': [''.join(lxml_itertext(th)) for th in table.iter('th')], 'rows': rows}
+
+def get_lxml_document(root, sqlSectionSearch):
+    ''' lxml.html equivalent of get_soup_document '''
+    awrDoc = {}
+    awrDoc['title'] = ''.join(lxml_itertext(root.find('.//head').find('.//title')))
+    text = ''
+    for string in lxml_itertext(root):
+        text += string
+        if len(text) >= 150:
+            break
+    awrDoc['text'] = text[:150]
+
+    # awr report tables are all tables behind the 'WORKLOAD REPOSITORY REPORT' heading
+    h1Regex = re.compile("WORKLOAD REPOSITORY .*REPORT", re.IGNORECASE)
+    h1 = [h for h in root.iter('h1') if lxml_string(h) is not None and h1Regex.search(lxml_string(h))][0]
+    awrDoc['tables'] = build_table_index([lxml_table_record(table) for table in h1.xpath('following::table')])
+
+    sqlRegex = re.compile(sqlSectionSearch)
+    awrDoc['sql_tables'] = []
+    for aref in root.iter('a'):
+        if lxml_string(aref) is not None and sqlRegex.search(lxml_string(aref)):
+            h = aref.attrib["href"].rpartition("#")[2]
+            anchor = aref.xpath('following::a[@name=$name][1]', name=h)[0]
+            table = anchor.xpath('(descendant::table | following::table)[1]')
+            awrDoc['sql_tables'].append(lxml_text_table(table[0] if table else None))
+
+    awrDoc['top_io'] = None
+    target_text = "Top Databases by IO Requests"
+    for elem in root.iter():
+        if elem.text == target_text:
+            table = elem.xpath('(descendant::table | following::table)[1]')
+        elif elem.tail == target_text:
+            table = elem.xpath('following::table[1]')
+        else:
+            continue
+        awrDoc['top_io'] = lxml_text_table(table[0] if table else None)
+        break
+    return awrDoc
+
+def html_parse_failed(fileText, awrDoc):
+    '''
+    Check a report parsed by a fast parser backend for broken html handling
+    The fast parsers (libxml2) repair broken html different than html.parser,
+    so each html table of the report must be found as a table by the parser
+    (raw html table tags: counted by the stream parser in 'table_tags', else counted in <fileText>)
+    '''
+    tableTags = awrDoc['table_tags'] if 'table_tags' in awrDoc else len(tableTagRegex.findall(fileText))
+    return len(awrDoc['tables']['tables']) > tableTags or awrDoc['table_num'] != tableTags
+
+############ Parallel section parsing ##############
+
+# Tree builders of the report parts by parser backend: the parts are parsed by BeautifulSoup (see get_section_part)
+sectionBuilders = {'html.parser': 'html.parser', 'lxml': 'lxml', 'lxml.html': 'lxml'}
+sectionSplitRegex = re.compile(r'<(/?)table[\s>]|<a\s[^>]*?\bname\s*=|<h[23][\s>]', re.IGNORECASE)
+sectionLinkRegex = re.compile(r'<a\s[^>]*?\bhref\s*=\s*["\']?[^"\'>]*#([^"\'>]*)["\']?[^>]*>([^<]*)</a>', re.IGNORECASE)
+
+def split_report_sections(fileText, parts):
+    '''
+    Split AWR report <fileText> into at most <parts> parts of similar size for parallel parsing (see get_parallel_document)
+    A part starts at the begin of a line with a section anchor (<a name=...>) or heading (<h2>, <h3>) outside of html tables
+    behind the report heading, so the first part holds the report head and the html.parser source positions of all tables
+    are kept (see get_tables)
+    '''
+    h1 = re.search(r'<h1[^>]*>[^<]*WORKLOAD REPOSITORY', fileText, re.IGNORECASE)
+    if h1 is None:
+        return [fileText]
+    size = len(fileText) / parts
+    splits = [0]
+    depth = 0
+    lastTable = 0
+    for match in sectionSplitRegex.finditer(fileText, h1.end()):
+        if match.group(0)[1] not in '/tT':
+            lineStart = fileText.rfind('\n', 0, match.start()) + 1
+            if depth == 0 and lastTable < lineStart and lineStart >= max(h1.end(), len(splits) * size):
+                splits.append(lineStart)
+                if len(splits) == parts:
+                    break
+        else:
+            depth = max(depth - 1, 0) if match.group(1) else depth + 1
+            lastTable = match.start()
+    return [fileText[start:end] for start, end in zip(splits, splits[1:] + [len(fileText)])]
+
+def get_section_part(partText, builder, sqlSectionSearch, anchorNames, h1Column):
+    '''
+    Parse one part of an AWR report (see split_report_sections) with BeautifulSoup tree builder <builder>
+    <h1Column> is None for the first part, else the html.parser source column of the report heading (see get_tables)
+    Returns the part content merged by get_parallel_document:
+    - 'title', 'text': html title and first 150 characters of report text (first part only)
+    - 'tables':      table records of the awr report tables (see soup_table_record)
+    - 'table_num':   number of html tables of the part
+    - 'links':       document order list of ('link', name) for SQL section links and ('anchor', name, table) for anchors in <anchorNames>
+                     (table: text table of the next table of the part, None if there is no table behind the anchor in the part)
+    - 'top_io':      "Top Databases by IO Requests" text table, False if there is no table behind it in the part, None if not found
+    - 'first_table': text table of the first html table of the part (None if the part has no table)
+    '''
+    soup = get_soup(partText, builder)
+    part = {}
+    if h1Column is None:
+        part['title'] = soup.head.title.text
+        part['text'] = soup.text[:150]
+        tables = get_tables(soup, 'report')
+    elif builder == 'html.parser':
+        tables = soup.find_all(lambda tag: tag.name == 'table' and tag.sourcepos >= h1Column)
+    else:
+        tables = soup.find_all('table')
+    part['tables'] = [soup_table_record(table) for table in tables]
+    part['table_num'] = len(soup.find_all('table'))
+
+    sqlRegex = re.compile(sqlSectionSearch)
+    part['links'] = []
+    for aref in soup.find_all('a'):
+        # the anchor of a tag itself is not found by the SQL section link of the tag (see get_soup_document)
+        if aref.attrs.get('name') in anchorNames:
+            table = aref.find_next('table')
+            part['links'].append(('anchor', aref.attrs['name'], None if table is None else soup_text_table(table)))
+        if aref.string is not None and sqlRegex.search(aref.string):
+            part['links'].append(('link', aref.attrs['href'].rpartition('#')[2]))
+
+    part['top_io'] = None
+    target_element = soup.find(string="Top Databases by IO Requests")
+    if target_element:
+        table = target_element.find_next('table')
+        part['top_io'] = False if table is None else soup_text_table(table)
+    first = soup.find('table')
+    part['first_table'] = None if first is None else soup_text_table(first)
+    soup.decompose()
+    return part
+
+def get_parallel_document(fileText, parser, sqlSectionSearch, workers):
+    '''
+    Parse a large AWR report in <workers> parallel processes: the report is split at section anchors
+    (see split_report_sections), each part is parsed by get_section_part and the part contents are merged
+    in document order into the same report content as get_awr_document, so run_AWR results don't change.
+    Returns None if the report can't be split. Raises ValueError if the parts don't resolve the SQL section anchors.
+    '''
+    builder = sectionBuilders[parser] if lxml is not None else 'html.parser'
+    texts = split_report_sections(fileText, workers)
+    if len(texts) < 2:
+        return None
+    h1 = re.search(r'<h1[^>]*>[^<]*WORKLOAD REPOSITORY', fileText, re.IGNORECASE)
+    h1Column = h1.start() - fileText.rfind('\n', 0, h1.start()) - 1
+    anchorNames = {name for name, text in sectionLinkRegex.findall(fileText) if re.search(sqlSectionSearch, unescape(text))}
+    args = [(text, builder, sqlSectionSearch, anchorNames, None if count == 0 else h1Column) for count, text in enumerate(texts)]
+    with ProcessPoolExecutor(max_workers=len(texts)) as executor:
+        parts = list(executor.map(get_section_part, *zip(*args)))
+
+    # Broken html check of each part parsed by lxml (see html_parse_failed): reparse the part by html.parser
+    if builder != 'html.parser':
+        for count, text in enumerate(texts):
+            tableTags = len(tableTagRegex.findall(text))
+            if len(parts[count]['tables']) > tableTags or parts[count]['table_num'] != tableTags:
+                parts[count] = get_section_part(*args[count][:1], 'html.parser', *args[count][2:])
+
+    def next_table(count):
+        ''' text table of the first table behind part <count> '''
+        for part in parts[count + 1:]:
+            if part['first_table'] is not None:
+                return part['first_table']
+        return soup_text_table(None)
+
+    awrDoc = {'parser': builder, 'title': parts[0]['title'], 'text': parts[0]['text']}
+    awrDoc['tables'] = build_table_index([table for part in parts for table in part['tables']])
+    awrDoc['table_num'] = sum(part['table_num'] for part in parts)
+
+    # SQL section tables: table behind the first anchor following each SQL section link
+    links = [(count, link) for count, part in enumerate(parts) for link in part['links']]
+    awrDoc['sql_tables'] = []
+    for pos, (count, link) in enumerate(links):
+        if link[0] != 'link':
+            continue
+        if link[1] not in anchorNames:
+            raise ValueError('SQL section link %s not found in report html' % link[1])
+        anchor = next((entry for entry in links[pos + 1:] if entry[1][0] == 'anchor' and entry[1][1] == link[1]), None)
+        if anchor is None:
+            raise ValueError('SQL section anchor %s not found' % link[1])
+        awrDoc['sql_tables'].append(anchor[1][2] if anchor[1][2] is not None else next_table(anchor[0]))
+
+    awrDoc['top_io'] = None
+    for count, part in enumerate(parts):
+        if part['top_io'] is not None:
+            awrDoc['top_io'] = part['top_io'] or next_table(count)
+            break
+    return awrDoc
+
+def get_awr_document(fileText, parser='html.parser', sqlSource='sqlOrdered'):
+    '''
+    Parse an AWR html report <fileText> using parser backend <parser> (see htmlParsers)
+    (report text or, for the 'stream' parser, a text file object read in chunks) and return the report content used by run_AWR:
+    - 'parser':     parser backend used
+    - 'title':      html title
+    - 'text':       first 150 characters of report text (used for report type checks)
+    - 'tables':     index of all awr report tables (see build_table_index)
+    - 'sql_tables': SQL section tables for SQL text analysis (see search_sql)
+    - 'top_io':     "Top Databases by IO Requests" table or None (see extract_top_10_io_requests_section)
+    Falls back to html.parser if lxml is not available or the report html is too broken for lxml
+    Reports of at least sectionMinSize bytes are parsed in sectionWorkers parallel processes (see get_parallel_document),
+    except for the 'stream' parser (low memory mode) and in daemon processes (see run_watchdog)
+    '''
+    if sqlSource == 'sqlOrdered':
+        # SQLs fetched from 'SQL Statistics - Top N SQL ordered by *' report tables
+        # Table summary is different defined:
+        # RAC example:    SQL ordered by Elapsed Time (Global)
+        # NonRAC example: This table displays top SQL by elapsed time
+        sqlSectionSearch = 'SQL ordered by'
+    else:
+        # SQLs fetched from 'SQL Statistics - Complete List of SQL Text' report table
+        sqlSectionSearch = 'Complete List of SQL Text'
+
+    if parser in ('lxml', 'lxml.html') and lxml is None:
+        print("lxml not available. Fallback to html.parser!")
+        parser = 'html.parser'
+
+    if sectionWorkers > 1 and parser != 'stream' and len(fileText) >= sectionMinSize and not multiprocessing.current_process().daemon:
+        try:
+            awrDoc = get_parallel_document(fileText, parser, sqlSectionSearch, sectionWorkers)
+            if awrDoc is not None:
+                return awrDoc
+        except Exception as e:
+            print("Parallel section parsing failed (%s). Fallback to serial parsing!" % e)
+
+    if parser != 'html.parser':
+        try:
+            if parser == 'stream':
+                # keep the tables of the query plan of the report kind (see sniff_report_kind) only
+                head = fileText[:reportSniffSize] if isinstance(fileText, str) else fileText.read(reportSniffSize)
+                kind = sniff_report_kind(head, 'report.html')[0]
+                isRacReport = kind == 'awr_rac' if kind in ('awr', 'awr_rac') and re.search(r'<title', head, re.IGNORECASE) else None
+                if not isinstance(fileText, str):
+                    fileText.seek(0)
+                awrDoc = get_stream_document(fileText, sqlSectionSearch, get_query_lookups(isRacReport))
+            elif parser == 'lxml.html':
+                root = lxml.html.document_fromstring(fileText)
+                awrDoc = get_lxml_document(root, sqlSectionSearch)
+                awrDoc['table_num'] = len(root.xpath('//table'))
+            else:
+                soup = get_soup(fileText, parser)
+                awrDoc = get_soup_document(soup, sqlSectionSearch)
+                awrDoc['table_num'] = len(soup.find_all('table'))
+                # the report content only keeps plain strings: free the html tree now
+                soup.decompose()
+            if not html_parse_failed(fileText, awrDoc):
+                awrDoc['parser'] = parser
+                return awrDoc
+            print("Broken html for parser %s. Fallback to html.parser!" % parser)
+        except Exception:
+            print("Parser %s failed. Fallback to html.parser!" % parser)
+        if not isinstance(fileText, str):
+            fileText.seek(0)
+            fileText = fileText.read()
+
+    soup = get_soup(fileText)
+    awrDoc = get_soup_document(soup, sqlSectionSearch)
+    awrDoc['parser'] = 'html.parser'
+    soup.decompose()
+    return awrDoc
+
+"""
+End of ParserBackends.py script
+"""
+"""
+Begin of AWRSectionFrames.py script for typed table extraction of AWR report sections
+"""
+import re
+import numpy
+import pandas
+#from ConfigQueryArrays import *
+#from SoapParsingFunctions import *
+
+### Typed pandas tables for AWR report sections (see awrSections) ###
+
+# string_to_float number format: [+-]digits with thousand separators, last '.' is the decimal point
+# (further '.' are removed from the integer part like in string_to_float)
+numberFormat = r'^(?P<ip>[+-]?[0-9,.]*)\.(?P<dp>[0-9]+)$|^(?P<int>[+-]?[0-9,]+)$'
+integerFormat = r'^[+-]?[0-9,]*[0-9][0-9,]*$'
+
+def strings_to_floats(values):
+    '''
+    Vectorized string_to_float for a pandas Series of table cell strings
+    Returns [float Series, numeric] with NaN for empty cells; numeric is False if any non empty cell
+    is not a number in string_to_float format (the float Series is not valid for the column then).
+    The floats are identical to string_to_float results (integer part + decimal part / 10**len(decimal part)).
+    '''
+    invalid = [pandas.Series(numpy.nan, index=values.index, dtype='float64'), False]
+    text = values.astype(object).where(values.notna(), '').astype(str).str.strip()
+    empty = text == ''
+    parts = text.str.extract(numberFormat)
+    isDecimal = parts['dp'].notna()
+    if not (isDecimal | parts['int'].notna() | empty).all():
+        return invalid
+
+    # integer part without '.': '' is 0 in string_to_float, everything else has to be an integer
+    ip = parts['ip'].where(isDecimal, parts['int']).fillna('').str.replace('.', '', regex=False)
+    if not (ip.str.match(integerFormat) | (ip == '')).all():
+        return invalid
+    ip = pandas.to_numeric(ip.str.replace(',', '', regex=False).where(ip != '', '0')).astype('float64')
+
+    # decimal part: float(dp) / 10 ** len(dp)
+    dp = parts['dp'].where(isDecimal, '0')
+    dp = pandas.to_numeric(dp).astype('float64') / numpy.power(10.0, dp.str.len().where(isDecimal, 0))
+
+    floats = ip + dp
+    floats[empty] = numpy.nan
+    return [floats, True]
+
+def typed_frame(rows):
+    '''
+    Build typed positional DataFrame (column n = cell n) from table <rows> (lists of cell strings):
+    Returns [frame, numeric]: numeric columns (all non empty cells are numbers) are float columns
+    '''
+    width = max([len(cells) for cells in rows] + [0])
+    raw = pandas.DataFrame([list(cells) + [None] * (width - len(cells)) for cells in rows], columns=range(width), dtype=object)
+    frame = {}
+    numeric = []
+    for col in range(width):
+        floats, isNumber = strings_to_floats(raw[col]) if col > 0 else [None, False]
+        frame[col] = floats if isNumber else raw[col]
+        numeric.append(isNumber)
+    return [pandas.DataFrame(frame, index=raw.index, columns=range(width)), numeric]
+
+def section_positions(table_index):
+    '''Table position for each AWR report section in awrSections: {table position: section name} (built once per report)'''
+
+    cache = table_index['cache']
+    if ('sections',) in cache:
+        return cache[('sections',)]
+    positions = {}
+    for name, summary, header in awrSections:
+        if summary is None:
+            continue
+        for table in table_index['tables']:
+            if table['summary'] is not None:
+                found = re.search(summary, table['summary'], re.IGNORECASE)
+            else:
+                # reports without table attribute 'summary' (AWR 10.2.0.3): compare leading column names
+                names = [str(th[0]).strip() for th in table['header']]
+                found = len(names) >= len(header) and all(re.match(col, names[n]) for n, col in enumerate(header))
+            if found and table['pos'] not in positions:
+                positions[table['pos']] = name
+                break
+    cache[('sections',)] = positions
+    return positions
+
+def section_table(table_index, pos):
+    '''Typed positional table of report section table at position <pos> (None if not a section table, see typed_frame)'''
+
+    if pos not in section_positions(table_index):
+        return None
+    cache = table_index['cache']
+    if ('section', pos) not in cache:
+        cache[('section', pos)] = typed_frame(table_index['tables'][pos]['rows'])
+    return cache[('section', pos)]
+
+def located_float(table_index, located):
+    '''
+    Typed float value of a located query result [table, position] (see get_info_position)
+    read from the section table (None if not a section table or not a numeric column)
+    '''
+    if located is None or located[1] is None:
+        return None
+    table, (row, col) = located
+    section = section_table(table_index, table['pos'])
+    if section is None or not 0 <= col < len(table['rows'][row]) or not section[1][col]:
+        return None
+    return float(section[0].iat[row, col])
+
+def label_frame(frame, names, labels):
+    '''Name the columns of typed positional <frame> and use first column values <labels> as index'''
+
+    frame = frame.copy()
+    frame.columns = [names[col] if col < len(names) else str(col) for col in frame.columns]
+    frame.index = pandas.Index([str(label).strip() if label is not None else '' for label in labels])
+    return frame.iloc[:, 1:]
+
+def get_section_frame(awrDoc, name):
+    '''
+    Return AWR report section <name> (see awrSections) as typed pandas DataFrame (None if not in the report)
+    First column values are the index, th names are the column names and numeric columns are
+    float columns (values identical to string_to_float). Use frame.to_numpy() for NumPy arrays.
+    '''
+    if name == 'Top Databases by IO Requests':
+        top_io = awrDoc['top_io']
+        if top_io is None or not top_io['rows']:
+            return None
+        frame, numeric = typed_frame(top_io['rows'])
+        names = [str(th).strip() for th in top_io['th']][-len(frame.columns):]
+        return label_frame(frame, names, frame[0])
+
+    table_index = awrDoc['tables']
+    for pos, section in section_positions(table_index).items():
+        if section == name:
+            table = table_index['tables'][pos]
+            frame, numeric = section_table(table_index, pos)
+            frame = frame[[bool(cells) for cells in table['rows']]]
+            names = [str(th[0]).strip() for th in table['header'] if not th[1]]
+            return label_frame(frame, names, frame[0])
+    return None
+
+def get_section_frames(awrDoc):
+    '''Return all AWR report sections of awrSections found in the report {section name: typed DataFrame}'''
+
+    frames = {}
+    for name, summary, header in awrSections:
+        frame = get_section_frame(awrDoc, name)
+        if frame is not None:
+            frames[name] = frame
+    return frames
+"""
+End of AWRSectionFrames.py script
+"""
+"""
 Begin of AWRParsingFunctions.py script for functions regarding AWR html report analysis
 """
 # from operator import concat
+import time
 #from SoapParsingFunctions import *
 #from ConfigQueryArrays import *
 #from ConfigSqlArrays import *
@@ -733,86 +1892,294 @@ Begin of AWRParsingFunctions.py script for functions regarding AWR html report a
 
 # Entry point for AWR report parsing
 # def run(awr_soup, queries, isRacReport):
-def run(soup_tables, queries, isRacReport):
-    '''Analyse beautified html content from one AWR report file'''
+# Compiled query plans by (report kind, release key) (see get_query_plan)
+queryPlans = {}
+
+def release_key(release):
+    '''
+    Return the query plan release key of an Oracle release string
+    major release for 18c and later (19.27.0.0.0 -> '19'), major.minor before (12.1.0.2.0 -> '12.1')
+    '''
+    nums = re.findall(r'\d+', release or '')
+    if not nums:
+        return 'unknown'
+    if int(nums[0]) >= 18:
+        return nums[0]
+    return '.'.join(nums[:2])
+
+def get_report_release(table_index, isRacReport):
+    '''
+    Get the Oracle release from the report header table without a full query run
+    (table "Database Summary" for SI reports, "Database Instances Included In Report" for RAC reports)
+    '''
+    table = find_table(table_index, '', 'Release', 1 if isRacReport else 0)
+    if table is None:
+        return ''
+    return str(get_value(table_index, table, '', 'Release')).strip()
+
+def compile_queries(queries):
+    '''
+    Compile awr queries (see queries_STD) into query plan entries
+    [<lookup row>, <lookup column>, <csv column name>, <datatype>, <decimal places>, <devisor>, <stats>]
+    <stats> counts the query lookups per plan: {'hits', 'misses', 'pruned', 'skipped'}
+    '''
+    compiled = []
+    for query in queries:
+        dtype = 'n' if len(query) > 3 and query[3] == 'n' else 's'
+        dplaces = query[4] if len(query) > 4 else 0
+        devisor = query[5] if len(query) > 5 else 1
+        # column lookup regexes are compiled once (see get_regex)
+        get_regex(query[1])
+        compiled.append([query[0], query[1], query[2], dtype, dplaces, devisor,
+                         {'hits': 0, 'misses': 0, 'pruned': 0, 'skipped': 0}])
+    return compiled
+
+def get_query_plan(isRacReport, release):
+    '''
+    Return the compiled query plan for an AWR (RAC) report of Oracle release <release> (see release_key)
+    Plans are compiled once per report kind and release key and count their lookups for tuning
+    (see get_query_plan_stats):
+    - 'queries':         global queries (queries_STD or queries_RAC)
+    - 'instanceQueries': RAC instance queries (queries_RAC_Instance, run for each instance)
+    - 'reports':         number of reports run with this plan
+    '''
+    key = ('RAC' if isRacReport else 'STD', release_key(release))
+    if key not in queryPlans:
+        queryPlans[key] = {
+            'kind': key[0],
+            'release': key[1],
+            'queries': compile_queries(queries_RAC if isRacReport else queries_STD),
+            'instanceQueries': compile_queries(queries_RAC_Instance) if isRacReport else [],
+            'reports': 0,
+        }
+    return queryPlans[key]
+
+# Query plan lookup counts of the last batch merged from all report records (see parse_batch and query_plan_counts)
+batchQueryStats = None
+
+def query_plan_counts():
+    '''
+    Return the lookup counts of all query plans used in this process
+    {(<report kind>, <release key>): {'reports': <reports>, 'queries': [[<lookup row>, <lookup column>, <csv column name>,
+                                                                        <hits>, <misses>, <pruned>, <skipped>], ..]}}
+    '''
+    counts = {}
+    for key, plan in queryPlans.items():
+        counts[key] = {'reports': plan['reports'],
+                       'queries': [query[:3] + [query[6][name] for name in ['hits', 'misses', 'pruned', 'skipped']]
+                                   for query in plan['queries'] + plan['instanceQueries']]}
+    return counts
+
+def query_plan_counts_merge(total, counts, sign=1):
+    ''' Add (sign -1: subtract) the query plan lookup counts <counts> to <total> (see query_plan_counts) and return <total> '''
+    for key, plan in counts.items():
+        entry = total.setdefault(key, {'reports': 0, 'queries': [query[:3] + [0, 0, 0, 0] for query in plan['queries']]})
+        entry['reports'] += sign * plan['reports']
+        for query, counted in zip(entry['queries'], plan['queries']):
+            for pos in range(3, 7):
+                query[pos] += sign * counted[pos]
+    return total
+
+def get_query_plan_stats(counts=None):
+    '''
+    Return the lookup statistics of the query plan lookup counts <counts> (default: batchQueryStats of the last batch,
+    counts of this process without a batch, see query_plan_counts) as list of
+    [<report kind>, <release key>, <reports>, <lookup row>, <lookup column>, <csv column name>, <hits>, <misses>, <pruned>, <skipped>]
+    - hits:    lookups with a result value
+    - misses:  lookups without a result value (table, row or value not found)
+    - pruned:  lookups not run: lookup column not in any report table or the same lookup already failed in the report
+    - skipped: queries not run: value already fetched by a previous query
+    '''
+    if counts is None:
+        counts = batchQueryStats if batchQueryStats is not None else query_plan_counts()
+    stats = []
+    for key in sorted(counts):
+        plan = counts[key]
+        for query in plan['queries']:
+            stats.append([key[0], key[1], plan['reports']] + query)
+    return stats
+
+def print_query_plan_stats(counts=None):
+    ''' Print the lookup statistics of all query plans (see get_query_plan_stats) '''
+    print('%-4s %-8s %7s %-36s %-24s %-32s %6s %6s %6s %6s' % ('kind', 'release', 'reports', 'row', 'column', 'key', 'hits', 'misses', 'pruned', 'skipped'))
+    for stat in get_query_plan_stats(counts):
+        print('%-4s %-8s %7d %-36.36s %-24.24s %-32.32s %6d %6d %6d %6d' % tuple(stat))
+
+def instance_table_rows(table, instances):
+    '''
+    Read a RAC per instance table once and return the first row position of each instance id in <instances> (strings)
+    An instance row has a label in the first 3 columns starting with the instance id (like index_lookup 'labels')
+    '''
+    rowPos = {}
+    for r, cells in enumerate(table['rows']):
+        for label in cells[:3]:
+            if label:
+                for instance in instances:
+                    if instance not in rowPos and label.startswith(instance):
+                        rowPos[instance] = r
+        if len(rowPos) == len(instances):
+            break
+    return rowPos
+
+def get_instance_column(table_index, col_name, inst_list, tableRows):
+    '''
+    Get column <col_name> of all RAC instances <inst_list> (one column of the instance x metric matrix)
+    Returns {<instance>: <value>} with the same values as get_info(table_index, str(<instance>), col_name, <instance>)
+    <tableRows> caches the instance row positions of each table (see instance_table_rows)
+    '''
+    instances = [str(instance) for instance in inst_list]
+    # tables with a th cell and a text node matching the lookup column (see find_table)
+    positions = []
+    for pos in sorted(index_lookup(table_index, 'headers', col_name)):
+        summary = table_index['tables'][pos]['summary']
+        if not index_lookup(table_index, 'strings', col_name, pos):
+            continue
+        if summary is not None and summary.startswith('SQL ordered by Offload Eligible Bytes'):
+            continue
+        positions.append(pos)
+
+    column = {}
+    for instance, row_name in zip(inst_list, instances):
+        # first table containing the instance id
+        pos = next((pos for pos in positions if index_lookup(table_index, 'strings', row_name, pos)), None)
+        if pos is None:
+            print("Did not find a table with col_name \"%s\" and row_name \"%s\"!" % (col_name, row_name))
+            column[instance] = None
+            continue
+        table = table_index['tables'][pos]
+        if table['summary'] is not None and re.search('.*init.* parameters.*', table['summary']):
+            # instance specific init.ora parameter lookup
+            value = get_value(table_index, table, row_name, col_name, instance)
+        else:
+            col_idx = get_column_index(table, col_name)
+            if col_idx == -1:
+                value = ""
+            else:
+                if pos not in tableRows:
+                    tableRows[pos] = instance_table_rows(table, instances)
+                value = table['rows'][tableRows[pos][row_name]][col_idx] if row_name in tableRows[pos] else ""
+        column[instance] = "" if value is None else value
+    return column
+
+def run(table_index, plan, isRacReport):
+    '''
+    Analyse beautified html content from one AWR report file (see build_table_index)
+    using the compiled query plan <plan> (see get_query_plan)
+    Each lookup [instance, row, column] runs only once per report; lookups for columns
+    not available in any report table are pruned.
+    RAC instance queries with an instance id row are read as instance x metric matrix:
+    each lookup column is read once for all instances (see get_instance_column).
+    Numeric values of AWR report section tables (see awrSections) are read from the typed section table.
+    '''
 
     inst_total = 1      # total number of instances
     # inst_report = 1     # number of instances in report
     inst_list = []
     result = []
-    result_cols = []
+    result_cols = set()
+    lookups = {}        # [instance, row, column] -> lookup result of this report
+    instMatrix = {}     # lookup column -> {instance: lookup result} for RAC instance id rows
+    tableRows = {}      # table position -> instance row positions (see instance_table_rows)
+    profiled = None     # [query, start time] of the running query if profiling is enabled (see profile_query)
+    plan['reports'] += 1
 
-    # Add instance id field to query list (>0 for rac instance queries; ==0 for non rac or rac global queries)
-    for i in range(len(queries)):
-        queries[i] = [0] + queries[i]
+    # Instance id field for each query (>0 for rac instance queries; ==0 for non rac or rac global queries)
+    queries = [[0, query[0], query] for query in plan['queries']]
 
     # Add queries for each instance in case of AWR RAC report
     # Look for instance number in AWR report section 'Database Instances Included In Report'
     if isRacReport:
-        # inst_report = int(get_info([soup_tables[0]], '', 'In Report')) # table "Database Summary" - "Number of Instances"."In Report"
-        inst_total = int(get_info([soup_tables[0]], '', 'Total')) # table "Database Summary" - "Number of Instances"."Total"
+        # inst_report = int(get_info(table_index, '', 'In Report', table_pos=0)) # table "Database Summary" - "Number of Instances"."In Report"
+        inst_total = int(get_info(table_index, '', 'Total', table_pos=0)) # table "Database Summary" - "Number of Instances"."Total"
 
         # Get RAC instance id list from "Database Instance Included InReport" table
-        inst_list = get_inst_list(soup_tables[1])
+        inst_list = get_inst_list(table_index['tables'][1])
 
         # for instance in range(1, instance_num + 1):
         for instance in inst_list:
-            for val in queries_RAC_Instance:
-                row = val[0]
-                if len(row) == 0:   # set row == instance number if row has an empty value
-                    row = str(instance)
-                queries.append([instance,row]+val[1:])
+            for query in plan['instanceQueries']:
+                # set row == instance number if row has an empty value
+                queries.append([instance, query[0] or str(instance), query])
+        instQueries = set(id(query) for query in plan['instanceQueries'] if not query[0])
 
     # Run queries on AWR report and beautified result output
-    for query in queries:
-        result_dtype = 's'        # string data type
-        result_dplaces = 0        # default value for float data type decimal places
-        result_devisor = 1        # default for numeric value devision
-        lookup_inst = query[0]    # lookup instance id esp. used for instance specific init.ora parameter lookup
-        lookup_row = query[1]     # lookup row ( == instance id for RAC instance specific information)
-        lookup_col = query[2]     # lookup column
-        result_col = query[3]     # result key name
-                   # query[4]     # result data type 's' for string and 'n' for numeric
-                   # query[5]     # result decimal places (<=0: integer; >0: float rounded up)
-                   # query[6]     # result divisor for unit conversion eg. from bytes to megabytes
-
-        # if result_col == 'host_memory_mb':  # for debugging
-        #     print(query)
+    for lookup_inst, lookup_row, query in queries:
+        # lookup_inst: lookup instance id esp. used for instance specific init.ora parameter lookup
+        # lookup_row:  lookup row ( == instance id for RAC instance specific information)
+        lookup_col = query[1]     # lookup column
+        result_col = query[2]     # result key name
+        count = query[6]          # query plan statistics
+        if reportProfile is not None:
+            profiled = profile_query(plan, profiled, query)
 
         # Run query only if data not fetched by a previous query!
-        if not str(lookup_inst) + "_" + result_col in result_cols:
+        if (lookup_inst, result_col) in result_cols:
+            count['skipped'] += 1
+            continue
+
+        lookup = (lookup_inst, lookup_row, lookup_col)
+        located = None
+        if lookup in lookups:
+            # same lookup already done in this report
+            info, located = lookups[lookup]
+            if not info:
+                count['pruned'] += 1
+                continue
+        elif len(table_index['tables']) > 0 and not index_lookup(table_index, 'headers', lookup_col):
+            # lookup column not available in any report table
+            lookups[lookup] = [None, None]
+            count['pruned'] += 1
+            continue
+        elif isRacReport and lookup_inst > 0 and id(query) in instQueries:
+            # Read instance id row values of all instances at once (instance x metric matrix)
+            if lookup_col not in instMatrix:
+                instMatrix[lookup_col] = get_instance_column(table_index, lookup_col, inst_list, tableRows)
+            info = instMatrix[lookup_col][lookup_inst]
+            lookups[lookup] = [info, None]
+        else:
             # Run query on awr report
-            info = get_info(soup_tables, lookup_row, lookup_col, lookup_inst)
-
-            # Run post processing on awr query results
-            info = fix_awr_values(lookup_row, lookup_col, info, result_col)
-
-            # If the query fetched a result value:
-            # -> Record result_col as already fetched (should not be queried again if multiple queries are defined for same result_col)
-            # -> Beautify result output (set data type and unit calculations)
-            if info:
-                result_cols.append(str(lookup_inst) + "_" + result_col)
-                if len(query) > 6:    # devisor is specified
-                    result_devisor = query[6]
-                if len(query) > 5:    # decimal places are specified
-                    result_dplaces = query[5]
-                if len(query) > 4:    # data type is specified
-                    if query[4] == 'n': result_dtype = 'n'  # numeric data type (float or int)
-
-                if result_dtype == 'n':
-                    try:
-                        info = round_up(string_to_float(info)/result_devisor,result_dplaces)
-                    except:
-                        print("Failed in string_to_float('%s') for %s. Fallback to string!" % (info, result_col))
-                        info = str(info).strip()
-                else:
+            located = get_info_position(table_index, lookup_row, lookup_col, lookup_inst)
+            info = located_value(located)
+            lookups[lookup] = [info, located]
+
+        # Run post processing on awr query results
+        raw = info
+        info = fix_awr_values(lookup_row, lookup_col, info, result_col)
+
+        # If the query fetched a result value:
+        # -> Record result_col as already fetched (should not be queried again if multiple queries are defined for same result_col)
+        # -> Beautify result output (set data type and unit calculations)
+        if info:
+            count['hits'] += 1
+            result_cols.add((lookup_inst, result_col))
+            if query[3] == 'n':
+                # Section table values are read from the typed section table (see section_table)
+                value = located_float(table_index, located) if info is raw else None
+                try:
+                    info = round_up((string_to_float(info) if value is None else value)/query[5],query[4])
+                except:
+                    print("Failed in string_to_float('%s') for %s. Fallback to string!" % (info, result_col))
                     info = str(info).strip()
+            else:
+                info = str(info).strip()
 
-                result.append([lookup_inst, lookup_row, lookup_col, info, result_col])
-                # print([lookup_inst, lookup_row, lookup_col, info, result_col])  # for debugging only
+            result.append([lookup_inst, lookup_row, lookup_col, info, result_col])
+            # print([lookup_inst, lookup_row, lookup_col, info, result_col])  # for debugging only
+        else:
+            count['misses'] += 1
 
+    profile_query(plan, profiled, None)
     return result, inst_total, inst_list
 
+def profile_query(plan, profiled, query):
+    '''
+    Add the wall time of the running query <profiled> ([query, start time] or None) of query plan <plan>
+    to the report profile (see profile_add) and return [<query>, start time] for the next query
+    '''
+    if profiled is not None:
+        profile_add('queries', (plan['kind'], plan['release'], profiled[0][0], profiled[0][1], profiled[0][2]), profiled[1])
+    return [query, time.perf_counter()] if query is not None else None
+
 def fix_awr_values(row, col, res, key):
     '''Run post processing and fixes on AWR query result string values'''
     if row and col and key and res:
@@ -826,24 +2193,14 @@ def fix_awr_values(row, col, res, key):
           res = str(round_up(string_to_float(res.replace("us", "")) / 1000, 2))
     return res
 
-def search_sql(soup, sqlSource = 'sqlOrdered'):
+def search_sql(sql_tables):
     '''
     SQL analysis lookup function
-    Can fetch SQL texts from sqlSource
-      sqlOrdered: fetch SQLs from 'SQL Statistics - Top N SQL ordered by *' tables
-      sqlList: fetch SQLs from 'Complete List of SQL Text' tables
+    Analyze SQL texts from SQL section tables of the report (see get_awr_document and sqlSource)
+      sqlOrdered: SQLs from 'SQL Statistics - Top N SQL ordered by *' tables
+      sqlList: SQLs from 'Complete List of SQL Text' tables
     '''
 
-    if sqlSource == 'sqlOrdered':
-        # SQLs fetched from 'SQL Statistics - Top N SQL ordered by *' report tables
-        # Table summary is different defined:
-        # RAC example:    SQL ordered by Elapsed Time (Global)
-        # NonRAC example: This table displays top SQL by elapsed time
-        sqlSectionSearch = 'SQL ordered by'
-    else:
-        # SQLs fetched from 'SQL Statistics - Complete List of SQL Text' report table
-        sqlSectionSearch = 'Complete List of SQL Text'
-
     # sqlTextHash = initSqlResults(sql_pattern_search_text)
     # sqlDbmsHash = initSqlResults(sql_pattern_search_dbms)
     # sqlModulesHash = initSqlResults(sql_pattern_search_modules)
@@ -854,47 +2211,50 @@ def search_sql(soup, sqlSource = 'sqlOrdered'):
     oraFeaturesHash = {}
     oraHintsHash = {}
 
-    '''
-    AWR 10.2.0.3.0 reports doesn't have a table attribute 'summary'!
-    So we switched SQL table identification
-    from an all table search and table filter on summary attribute
-        tables = soup.findChildren('table')
-        re.search(sqlSectionSearch, table.attrs['summary'], re.IGNORECASE)
-    to an indirect table search using arefs in 'SQL Statistics' list
-        arefs = soup.find_all('a', string=re.compile(sqlSectionSearch))
-    '''
-
-    # Get all arefs from 'SQL Statistics' link list for specified search string
-    arefs = soup.find_all('a', string=re.compile(sqlSectionSearch))
-    # Walk through search result, jump to defined href and get next table for 'SQL Text' column analysis
-    for aref in arefs:
-        h = aref.attrs["href"].rpartition("#")[2]
-        table = aref.find_next("a", attrs={"name": h}).find_next("table")
-
+    # The same SQL shows up in many "SQL ordered by" tables (Elapsed, CPU, Gets, Reads, Executions ..)
+    # Each distinct sql text is analyzed only once (see analyzeSqlStatement)
+    # sqlCountMode 'occurrence' counts each sql row, 'distinct' counts each SQL Id only once
+    startTime = time.perf_counter()
+    statements = {}
+    sqlIds = set()
+    sqlRows = 0
+    for table in sql_tables:
         # Parse "SQL Text"
-        rows = table.find_all('tr')
-        SecondLastColName = table.find_all('th')[-2].text
+        SecondLastColName = table['th'][-2]
         moduleColExists = re.match("SQL Module", SecondLastColName, re.IGNORECASE)
-        for row in rows:
-            if len(row) != 0:
-                # Search only in last td ("SQL Text")
-                tds = row.find_all('td')
-                if len(tds) != 0:
-                    # get sql from last td
-                    sql_data = tds[-1].text
-                    # Non RAC reports offer a "SQL Module" column in "SQL orderd by" report tables
-                    if moduleColExists:
-                        module_data = tds[-2].text
-                    else:
-                        module_data = sql_data
+        sqlIdCol = None
+        for c, th in enumerate(table['th']):
+            if re.match("SQL Id", th.strip(), re.IGNORECASE):
+                sqlIdCol = c
+        for tds in table['rows']:
+            sqlRows += 1
+            # get sql from last td ("SQL Text")
+            sql_data = tds[-1]
+            # Non RAC reports offer a "SQL Module" column in "SQL orderd by" report tables
+            if moduleColExists:
+                module_data = tds[-2]
+            else:
+                module_data = None
 
-                    analyzeSQL(sqlTextHash, sql_data, sql_pattern_search_text)
-                    analyzeSQL(sqlDbmsHash, sql_data, sql_pattern_search_dbms)
-                    analyzeSQL(sqlModulesHash, module_data, sql_pattern_search_modules)
-                    analyzeSQL(oraFeaturesHash, sql_data, sql_pattern_search_features)
-                    searchHints(oraHintsHash, sql_data)
+            # statements are identified by SQL Id (or sql text if SQL Id isn't available)
+            if sqlIdCol is not None and len(tds) == len(table['th']) and tds[sqlIdCol].strip():
+                sqlId = tds[sqlIdCol].strip()
+            else:
+                sqlId = (sql_data, module_data)
+            if sqlCountMode == 'distinct' and sqlId in sqlIds:
+                continue
+            sqlIds.add(sqlId)
 
-    # getSqlResults can return values without or with count for example: USE_HASH(7)
+            addSqlResults([sqlTextHash, sqlDbmsHash, sqlModulesHash, oraFeaturesHash, oraHintsHash],
+                          analyzeSqlStatement(statements, sql_data, module_data))
+
+    elapsed = time.perf_counter() - startTime
+    if sqlRows:
+        # analysis time of skipped duplicates estimated from average analysis time per sql row
+        print("SQL analysis: %d sql rows, %d distinct sql texts analyzed, %.3fs (about %.3fs saved by deduplication)"
+              % (sqlRows, len(statements), elapsed, elapsed / max(len(statements), 1) * (sqlRows - len(statements))))
+
+    # getSqlResults can return values without or with count for example: USE_HASH(7)
     # for count set'count' otherwise set 'key' for second parameter
     SQLtext = getSqlResults(sqlTextHash, 'count')
     SQLdbms = getSqlResults(sqlDbmsHash, 'count')
@@ -913,40 +2273,86 @@ Begin of RunAWR.py script for functions regarding AWR report analysis
 #from SoapParsingFunctions import *
 #from AWRParsingFunctions import *
 
-def extract_top_10_io_requests_section(awrSoup, globalResDict):
-    
+def extract_top_10_io_requests_section(top_io, globalResDict):
+    '''Get IO requests and throughput from "Top Databases by IO Requests" table (awrDoc['top_io'])'''
+
     target_text = "Top Databases by IO Requests"
-    target_element = awrSoup.find(string=target_text)
 
-    if target_element:
-        # Get the table tag following the target element
-        table = target_element.find_next('table')
+    if top_io is not None:
         io_requests = -1
         io_throughput_mb = -1
-        if table:
-            # Extract data from the table as needed
-            rows = table.find_all('tr')
-            for row in rows:
-                columns = row.find_all('td')
-                if len(columns) > 5 :
-                    db_name = columns[0].text.strip()
-                    if "*" in db_name:
-                        io_requests = float(columns[4].text.replace(',', '').strip())
-                        io_throughput_mb = float(columns[8].text.replace(',', '').strip())
-        
+        # Extract data from the table as needed
+        for columns in top_io['rows']:
+            if len(columns) > 5 :
+                db_name = columns[0].strip()
+                if "*" in db_name:
+                    io_requests = float(columns[4].replace(',', '').strip())
+                    io_throughput_mb = float(columns[8].replace(',', '').strip())
+
         if io_requests == -1:
             print(f"No DB details in {target_text} section")
         else:
             globalResDict['iops_per_sec_from_top_10_section'] = io_requests
-            globalResDict['throughput_mb_per_sec_from_top_10_section'] = io_throughput_mb   
+            globalResDict['throughput_mb_per_sec_from_top_10_section'] = io_throughput_mb
     else:
         print(f"Target text '{target_text}' not found in the HTML file.")
-    
+
+
+############### Report kind check ################
+
+# Status of unsupported report kinds (see sniff_report_kind)
+unsupportedReportKinds = {
+    'awr_pdb': 'UNSUPPORTED (pdb or root level report)',
+    'awr_diff': 'UNSUPPORTED (diff report)',
+    'unknown': 'UNSUPPORTED (unknown report format)',
+}
+
+def sniff_report_kind(head, fileName):
+    '''
+    Check the report kind using only the report head <head> (first reportSniffSize bytes as text)
+    Returns [<kind>, <head document>]:
+    - kind 'awr', 'awr_rac' (html title includes 'RAC'), 'awr_pdb' (pdb or root level report),
+      'awr_diff' (compare period report), 'statspack' or 'unknown' (neither AWR nor Statspack report)
+    - head document: content of the report head (see get_stream_document) or None if not available
+    The checks are the same as in run_AWR, so unsupported reports are skipped without parsing the whole report.
+    A report head without AWR heading is left to the full analysis ('awr' or 'awr_rac').
+    '''
+    if fileName.lower().endswith('.lst'):
+        return ['statspack' if 'STATSPACK' in head.upper() else 'unknown', None]
+
+    title = re.search(r'<title[^>]*>(.*?)</title', head, re.IGNORECASE | re.DOTALL)
+    if not 'WORKLOAD REPOSITORY' in head.upper() and not (title and title.group(1).strip().startswith('AWR')):
+        return ['unknown', None]
+    kind = 'awr_rac' if title and title.group(1).find('RAC', 0, 150) != -1 else 'awr'
+
+    try:
+        headDoc = get_stream_document(head, 'SQL ordered by', [])
+    except Exception:
+        return [kind, None]
+    if headDoc['text'].find('(PDB snapshots)', 0, 150) != -1 or headDoc['text'].find('(root snapshots)', 0, 150) != -1:
+        kind = 'awr_pdb'
+    elif headDoc['text'].find('COMPARE PERIOD REPORT', 0, 150) != -1:
+        kind = 'awr_diff'
+    return [kind, headDoc]
+
+def get_unsupported_record(kind, headDoc, fileName):
+    '''
+    Return the global report record of an unsupported report kind (see sniff_report_kind)
+    like run_report does (RAC information from the first report table, if available in the report head)
+    '''
+    record = {'filename': fileName.replace('\\', '/'), 'parent': 'none', 'status': unsupportedReportKinds[kind]}
+    if headDoc is not None and len(headDoc['tables']['tables']) > 0:
+        RAC = get_info(headDoc['tables'], '', 'RAC', table_pos=0)
+        if RAC is not None:
+            record['db_rac'] = 'YES' if RAC.strip().upper() == "YES" else 'NO'
+            record['db_type'] = 'RAC' if record['db_rac'] == 'YES' else 'SI'
+    record['instances'] = []
+    return record
 
 ############## AWR report analysis ###############
 
-def run_AWR(awrSoup, gobalResDict, sqlSource):
-    '''Run AWR report analysis'''
+def run_AWR(awrDoc, gobalResDict):
+    '''Run AWR report analysis on parsed report content (see get_awr_document)'''
 
     instTotalNum = 0
     resDict = []
@@ -954,28 +2360,24 @@ def run_AWR(awrSoup, gobalResDict, sqlSource):
     isRacDB = False       # Oracle RAC database (vs. single instance database)
     isRacReport = False   # AWR RAC report
 
-    awrHeadTitle = awrSoup.head.title.text
+    awrHeadTitle = awrDoc['title']
     print("Title: " + str(awrHeadTitle))
 
     # Identify a RAC Report
     # We should test this for "global" and "nonGlobal" RAC report !!!
 
     # # Looks for a string "(RAC)" in first 150 characters of html awr report
-    # isRacReport = int(awrSoup.text.find('(RAC)', 0, 150)) != -1
+    # isRacReport = int(awrDoc['text'].find('(RAC)', 0, 150)) != -1
 
     # Looks for a string "RAC" in html title tag
     # RAC reports include 'AWR RAC Report' in html title tag
     isRacReport = int(awrHeadTitle.find('RAC', 0, 150)) != -1
 
-    if isRacReport:
-        query = queries_RAC.copy()
-    else:
-        query = queries_STD.copy()
+    # Index of all awr report html tables (built once per report); every query below is a lookup against this index
+    tableIndex = awrDoc['tables']
 
-    # Get html tables from awr report
-    # allTables = get_tables(awrSoup)                 # not used actually
-    # warningTables = get_tables(awrSoup, 'warning')  # not used actually
-    reportTables = get_tables(awrSoup, 'report')
+    # Compiled query plan for the report kind and release (see get_query_plan)
+    queryPlan = get_query_plan(isRacReport, get_report_release(tableIndex, isRacReport))
 
     # Identify a RAC database
     # #RAC = get_info(get_tables(awrSoup), '', 'RAC')
@@ -984,7 +2386,7 @@ def run_AWR(awrSoup, gobalResDict, sqlSource):
     # It's nessessary to identify the table with database "summary information"
     # without using the table summary attribute or any table heading.
     # A table attribute "summary" or a table heading are sometimes not available in awr report.
-    RAC = get_info([reportTables[0]], '', 'RAC') # look for RAC only in first html table (Database Summary)
+    RAC = get_info(tableIndex, '', 'RAC', table_pos=0) # look for RAC only in first html table (Database Summary)
     if RAC.strip().upper() == "YES":
         isRacDB = True
 
@@ -1006,11 +2408,11 @@ def run_AWR(awrSoup, gobalResDict, sqlSource):
 
     # Check for unsupported PDB or root level AWR report
     isPDBlevelAWR = (
-        int(awrSoup.text.find('(PDB snapshots)', 0, 150)) != -1 or
-        int(awrSoup.text.find('(root snapshots)', 0, 150)) != -1
+        int(awrDoc['text'].find('(PDB snapshots)', 0, 150)) != -1 or
+        int(awrDoc['text'].find('(root snapshots)', 0, 150)) != -1
     )
     # Check for unsupported AWR diff report
-    isDiffAWR = int(awrSoup.text.find('COMPARE PERIOD REPORT', 0, 150)) != -1
+    isDiffAWR = int(awrDoc['text'].find('COMPARE PERIOD REPORT', 0, 150)) != -1
 
     if isPDBlevelAWR:
         gobalResDict['status'] = 'UNSUPPORTED (pdb or root level report)'
@@ -1021,18 +2423,24 @@ def run_AWR(awrSoup, gobalResDict, sqlSource):
     else:
         # Run report analysis
         # Rac awr report may report less than total available instances (check instList)
-        resDict, instTotalNum, instList = run(reportTables, query, isRacReport)
+        start = time.perf_counter()
+        resDict, instTotalNum, instList = run(tableIndex, queryPlan, isRacReport)
+        profile_add('stages', 'queries', start)
         gobalResDict['db_inst_num'] = instTotalNum
 
         # Search for special SQLs
-        SQLtext, SQLdbms, SQLmodule, oraFeature, oraHints = search_sql(awrSoup, sqlSource)
+        start = time.perf_counter()
+        SQLtext, SQLdbms, SQLmodule, oraFeature, oraHints = search_sql(awrDoc['sql_tables'])
+        profile_add('stages', 'search_sql', start)
         gobalResDict['db_sql'] = SQLtext
         gobalResDict['db_dbms'] = SQLdbms
         gobalResDict['db_modules'] = SQLmodule
         gobalResDict['db_features'] = oraFeature
         gobalResDict['db_hints'] = oraHints
     
-    extract_top_10_io_requests_section(awrSoup, globalResDict=gobalResDict)
+    start = time.perf_counter()
+    extract_top_10_io_requests_section(awrDoc['top_io'], globalResDict=gobalResDict)
+    profile_add('stages', 'top_io', start)
 
     return resDict, isRacDB, isRacReport, instTotalNum, instList
 """
@@ -1041,6 +2449,7 @@ End of RunAWR.py script
 """
 Begin of RunLST.py script for functions regarding Statspack report analysis
 """
+import io
 import re
 #from SoapParsingFunctions import *
 #from HelperFunctions import *
@@ -1050,59 +2459,405 @@ import re
 
 ########### Statspack report analysis ############
 
+def lst_lines(source, lookahead=4):
+    '''
+    Yield (line number, [line, next line, ...]) for all lines of a statspack report
+
+    <source> is the report text or a text file object, lines are read one by one
+    Each line comes with up to <lookahead> following lines (the table values below a table header),
+    lines[k] is the same as fileText.split('\\n')[i+k] and raises an IndexError past the end of the report
+    '''
+    if isinstance(source, str):
+        # split at '\n' only (same as str.split('\n'))
+        source = io.StringIO(source, newline='\n')
+    window = []
+    i = 0
+    lastLineEnd = True  # an empty report is one empty line
+    for line in source:
+        lastLineEnd = line.endswith('\n')
+        window.append(line[:-1] if lastLineEnd else line)
+        if len(window) > lookahead:
+            yield i, window[:]
+            del window[0]
+            i += 1
+    if lastLineEnd:
+        # text ends with a line break: last line is empty
+        window.append('')
+    while window:
+        yield i, window[:]
+        del window[0]
+        i += 1
+
+# -----------------------------------------------------------------
+# Statspack line handlers
+# -----------------------------------------------------------------
+# All handlers get the output dict, the parsing state dict and the current line with its next lines
+# (lines[0] is the current line, lines[2] the second line after the current line)
+
+def lst_db_name_db_id(output, state, lines):
+    # Statspack release < 10.0.0.0
+    # first table in report, column "Release"
+    val = re.split(r" {1,}", lines[2])
+    # column DB Id
+    output['db_name'] = val[0].strip()
+    # column DB Id
+    output['db_id'] = val[1].strip()
+    # column Instance
+    output['db_inst_name'] = val[2].strip()
+    # column "Inst Num"
+    output['db_inst_num'] = string_to_float(val[3])
+    # column "Release"
+    output['db_release'] = val[4].strip()
+    # column "RAC"
+    output['db_rac'] = val[5].strip()
+    output['host_name'] = val[6].strip()
+
+def lst_database_db_id(output, state, lines):
+    # Statspack release >= 10.0.0.0
+    # table "Database" (first table in report)
+    val = re.split(r" {1,}", lines[2])
+    # column DB Id
+    output['db_id'] = val[1].strip()
+    # column Instance
+    output['db_inst_name'] = val[2].strip()
+    # column "Inst Num"
+    output['db_inst_num'] = string_to_float(val[3])
+    # column "Release"
+    output['db_release'] = val[6].strip()
+    # column "RAC"
+    output['db_rac'] = val[7].strip()
+
+def lst_db_name(output, state, lines):
+    # DB name (second try)
+    if not 'db_name' in output or isNaN(output['db_name']) or output['db_name'] == state['notAvailable']:
+        val = re.split(r" {2,}", lines[0])
+        output['db_name'] = val[1].strip()
+
+# Statspack release < 10.0.0.0
+# does not support host platform, cpu and memory information
+
+# Statspack release 10.2.0.5
+# does not support host platform information
+def lst_host_name(output, state, lines):
+    val = re.split(r" {1,}", lines[0])
+    output['host_name'] = val[2].strip()
+
+def lst_num_cpus(output, state, lines):
+    val = re.split(r" {1,}", lines[0])
+    output['host_cpu_num'] = string_to_float(val[5])
+
+def lst_host_platform(output, state, lines):
+    val = re.split(r" {2,}", lines[2])
+    # table "Host", column "Name"
+    output['host_name'] = val[1].strip()
+    # table "Host", column "Platform"
+    output['platform'] = val[2].strip()
+    # table "Host", column "CPUs"
+    output['host_cpu_num'] = string_to_float(val[3])
+
+def lst_snap_time(output, state, lines):
+    # table "Snapshot", column "Snap Time"
+    val = re.split(r" {1,}", lines[2])
+    output['db_snap_begin_time'] = val[3].strip() + " " + val[4].strip()
+    val = re.split(r" {1,}", lines[3])
+    output['db_snap_end_time'] = val[4].strip() + " " + val[5].strip()
+
+def lst_cpu_count(output, state, lines):
+    # DB cpu count usage limit (Parameter cpu_count)
+    # table "init.ora Parameters", column "Begin value"
+    val = re.split(r" {2,}", lines[0])
+    output['db_cpu_count'] = string_to_float(val[1])
+
+# --- switched from table "Instance CPU" to "OS Statistics"     ---
+# --- "Instance CPU" is not filled at all in version 10.2.0.5.0 ---
+
+def lst_busy_time(output, state, lines):
+    # Host cpu busy time in seconds
+    # table "OS Statistics"
+    val = re.split(r" {2,}", lines[0])
+    output['host_cpu_busy_time_s'] = string_to_float(val[1]) / 100
+
+def lst_idle_time(output, state, lines):
+    # Host cpu idle time in seconds
+    # table "OS Statistics"
+    val = re.split(r" {2,}", lines[0])
+    output['host_cpu_idle_time_s'] = string_to_float(val[1]) / 100
+
+def lst_db_cpu(output, state, lines):
+    # DB foreground cpu time in seconds (used for db cpu usage calculation)
+    # table "Time Model System Stats", column "Time (s)"
+    state['found'] += 1
+    if state['found'] == 1:
+        val = re.split(r" {2,}", lines[0])
+        output['db_cpu_fg_time_s'] = string_to_float(val[1])
+        output['db_cpu_pct_db_time'] = string_to_float(val[2])
+
+def lst_background_cpu(output, state, lines):
+    # DB background cpu time in seconds (used for db cpu usage calculation)
+    # table "Time Model System Stats", column "Time (s)"
+    val = re.split(r" {2,}", lines[0])
+    output['db_cpu_bg_time_s'] = string_to_float(val[1])
+
+def lst_host_mem(output, state, lines):
+    # Host memory in mb
+    # table "Memory Statistics", column "Begin"
+    val = re.split(r" {1,}", lines[0])
+    output['host_memory_mb'] = string_to_float(val[4])
+
+def lst_sga_use(output, state, lines):
+    # SGA used in mb
+    # table "Memory Statistics", column "Begin"
+    val = re.split(r" {1,}", lines[0])
+    output['db_sga_usage_mb'] = string_to_float(val[4])
+
+def lst_pga_use(output, state, lines):
+    # PGA used in mb
+    # table "Memory Statistics", column "Begin"
+    val = re.split(r" {1,}", lines[0])
+    output['db_pga_usage_mb'] = string_to_float(val[4])
+
+def lst_read_io(output, state, lines):
+    # Physical read io per seconds
+    # table "Instance Activity Stats", column "Per Second"
+    val = re.split(r" {1,}", lines[0])
+    output['db_physical_read_total_io_ps'] = string_to_float(val[6])
+
+def lst_write_io(output, state, lines):
+    # Physical write io per seconds
+    # table "Instance Activity Stats", column "Per Second"
+    val = re.split(r" {1,}", lines[0])
+    output['db_physical_write_total_io_ps'] = string_to_float(val[6])
+
+def lst_physical_reads(output, state, lines):
+    # Physical read blocks per seconds (used for mb calculation)
+    # table "Load Profile", column "Per Second"
+    val = re.split(r" {2,}", lines[0])
+    state['db_physical_read_blocks'] = string_to_float(val[2])
+
+def lst_physical_writes(output, state, lines):
+    # Physical write blocks per seconds (used for mb calculation)
+    # table "Load Profile", column "Per Second"
+    val = re.split(r" {2,}", lines[0])
+    state['db_physical_write_blocks'] = string_to_float(val[2])
+
+def lst_db_block_size(output, state, lines):
+    # DB block size (used for read/write mb calculation)
+    # table "init.ora Parameters", calumn "Begin value"
+    val = re.split(r" {2,}", lines[0])
+    state['db_block_size'] = string_to_float(val[1])
+
+def lst_user_calls(output, state, lines):
+    # User calls per seconds/transaction
+    # table "Instance Activity Stats"
+    val = re.split(r" {1,}", lines[0])
+    output['db_user_calls_ps'] = string_to_float(val[3])    # column "per Second"
+    output['db_user_calls_pt'] = string_to_float(val[4])    # column "per Trans"
+
+def lst_user_commits(output, state, lines):
+    # User commits per seconds/transaction
+    # table "Instance Activity Stats"
+    val = re.split(r" {1,}", lines[0])
+    output['db_user_commits_ps'] = string_to_float(val[3])  # column "per Second"
+    output['db_user_commits_pt'] = string_to_float(val[4])  # column "per Trans"
+
+def lst_redo_size(output, state, lines):
+    # Redo size in mb
+    # table "Load Profile", column "Per Second"
+    val = re.split(r" {1,}", lines[0])
+    output['db_redo_mbps'] = string_to_float(val[3])/1048576
+
+def lst_log_file_sync(output, state, lines):
+    # Log file sync wait event
+    # [Foreground|Background|both] wait event - what's the right source?
+    # Actualy the first match wins.
+    # table "[Foreground|Background|both] Wait Events", column "Waits"
+    if state['foundLogFileSync'] == False:
+        val = re.split(r" {1,}", lines[0])
+        output['db_log_file_sync_avg_wait_ms'] = string_to_float(val[6])
+        state['foundLogFileSync'] = True
+
+def lst_log_file_pwrite(output, state, lines):
+    # Log file parallel write wait event
+    # [Foreground|Background|both] wait event - what's the right source?
+    # Actualy the first match wins.
+    # table "[Foreground|Background|both] Wait Events", column "Waits"
+    if state['foundLogFilePara'] == False:
+        val = re.split(r" {1,}", lines[0])
+        output['db_log_file_pwrite_avg_wait_ms'] = string_to_float(val[7])
+        state['foundLogFilePara'] = True
+
+def lst_table_scans_dread(output, state, lines):
+    # Table scans (direct read) count
+    # table "Instance Activity Stats", column "Total"
+    val = re.split(r" {1,}", lines[0])
+    output['db_table_scans_dread_total'] = string_to_float(val[4])
+
+def lst_elapsed(output, state, lines):
+    # Elapsed time
+    # table "Snapshot", column "Snap Time"
+    val = re.split(r" {2,}", lines[4])
+    # remove '(mins)' from value before string_to_float conversion
+    output['elapsed_time_min'] = string_to_float(val[val.index('Elapsed:') + 1].split(' ')[0])
+
+def lst_db_time_snap(output, state, lines):
+    # DB time (available since release 11.1)
+    # table "Snapshot", column "Snap Id"
+    val = re.split(r" {1,}", lines[0])
+    output['db_time_min'] = string_to_float(val[val.index('time:') + 1].replace('#',''))
+
+def lst_db_time(output, state, lines):
+    if not 'db_time_min' in output or isNaN(output['db_time_min']) or output['db_name'] == state['notAvailable']:
+        # table "Time Model System Stats", column "Time (s)"
+        val = re.split(r" {2,}", lines[0])
+        output['db_time_min'] = string_to_float(val[1])/60
+
+def lst_compatible(output, state, lines):
+    # init.ora Parameter: compatible
+    # table "init.ora Parameters", calumn "Begin value"
+    val = re.split(r" {1,}", lines[0])
+    output['db_compatible'] = val[1].strip()
+
+def lst_optimizer_features(output, state, lines):
+    # init.ora Parameter: optimizer_features_enable
+    # table "init.ora Parameters", calumn "Begin value"
+    val = re.split(r" {1,}", lines[0])
+    output['db_optimizer_features_enable'] = val[1].strip()
+
+# Dispatch table for statspack report lines: [<phrases>, <handler>]
+# A handler is called for a line containing all <phrases>, a phrase starting with '^' must start the line.
+# Handlers are called in this order (later handlers may overwrite values of earlier ones in the same line),
+# all handlers after lstReleaseHandlers are only called once the db release is known.
+lstReleaseHandlers = 2
+lstLineHandlers = [
+    # -----------------------------------------------------------------
+    # Basic database information
+    # -----------------------------------------------------------------
+    [['DB Name', 'DB Id'], lst_db_name_db_id],
+    [['Database', 'DB Id'], lst_database_db_id],
+    [['^db_name '], lst_db_name],
+    [['Host  Name'], lst_host_name],
+    [['Num CPUs'], lst_num_cpus],
+    [['Host', 'Name', 'Platform'], lst_host_platform],
+    [['Snap Id', 'Snap Time'], lst_snap_time],
+    # -----------------------------------------------------------------
+    # CPU capacity and usage
+    # -----------------------------------------------------------------
+    # Host cpu count (host_cpu_num) already captured from host table (see above)!
+    [['^cpu_count '], lst_cpu_count],
+    [['BUSY_TIME '], lst_busy_time],
+    [['IDLE_TIME '], lst_idle_time],
+    [['DB CPU '], lst_db_cpu],
+    [['background cpu time '], lst_background_cpu],
+    # -----------------------------------------------------------------
+    # Memory capacity and usage
+    # -----------------------------------------------------------------
+    [['Host Mem (MB):'], lst_host_mem],
+    [['SGA use (MB):'], lst_sga_use],
+    [['PGA use (MB):'], lst_pga_use],
+    # -----------------------------------------------------------------
+    # IO usage statistics
+    # -----------------------------------------------------------------
+    [['physical read total IO requests'], lst_read_io],
+    [['physical write total IO requests'], lst_write_io],
+    [['Physical reads:'], lst_physical_reads],
+    [['Physical writes:'], lst_physical_writes],
+    [['^db_block_size'], lst_db_block_size],
+    # -----------------------------------------------------------------
+    # Workload statistics
+    # -----------------------------------------------------------------
+    [['User calls:'], lst_user_calls],
+    [['user commits'], lst_user_commits],
+    [['Redo size:'], lst_redo_size],
+    [['log file sync'], lst_log_file_sync],
+    [['log file parallel write'], lst_log_file_pwrite],
+    [['table scans (direct read)'], lst_table_scans_dread],
+    # -----------------------------------------------------------------
+    # Time statistics
+    # -----------------------------------------------------------------
+    [['Snap Id', 'Snap Time'], lst_elapsed],
+    [['DB time:', 'DB CPU:'], lst_db_time_snap],
+    [['^DB time '], lst_db_time],
+    # -----------------------------------------------------------------
+    # Others
+    # -----------------------------------------------------------------
+    [['compatible'], lst_compatible],
+    [['optimizer_features_enable'], lst_optimizer_features],
+]
+
+def compileLstHandlers(handlers):
+    '''
+    Compile the statspack line dispatch table
+
+    Returns [<trigger regex>, <dispatch dict>, <handlers>]:
+    - the trigger regex finds any of the first phrases of all handlers (most report lines have none)
+    - the dispatch dict maps each first phrase to its handlers [<index>, <phrases>, <handler>]
+    '''
+    dispatch = {}
+    for index, (phrases, handler) in enumerate(handlers):
+        dispatch.setdefault(phrases[0].lstrip('^'), []).append([index, phrases, handler])
+    triggers = sorted(dispatch, key=len, reverse=True)
+    return [re.compile('|'.join(re.escape(trigger) for trigger in triggers)), dispatch, handlers]
+
+def lst_phrase_found(phrase, row):
+    '''Check a dispatch table phrase ('^' = line prefix) for a statspack report line'''
+    if phrase[0] == '^':
+        return row.startswith(phrase[1:])
+    return phrase in row
+
+def lst_line_handlers(lstDispatch, row):
+    '''Return the handlers for a statspack report line in dispatch table order'''
+    triggerRegex, dispatch, handlers = lstDispatch
+    if not triggerRegex.search(row):
+        return []
+    found = []
+    for trigger, entries in dispatch.items():
+        if trigger in row:
+            found += [entry for entry in entries if all(lst_phrase_found(phrase, row) for phrase in entry[1])]
+    if len(found) > 1:
+        found.sort(key=lambda entry: entry[0])
+    return found
+
+lstDispatch = compileLstHandlers(lstLineHandlers)
+
 def run_LST(fileText, filename):
-    '''Entry point for statspack parsing (statspack level 7 output supported only)'''
+    '''
+    Entry point for statspack parsing (statspack level 7 output supported only)
+
+    <fileText> is the report text or a text file object (the report is read line by line)
+    Each line is checked against the dispatch table lstLineHandlers (see lst_line_handlers)
+    '''
 
     # RAC reports are currently not supported!
 
     output = {}
     # output['filename'] = filename.replace('\\', '/')
-    fileText = fileText.split('\n')
-    foundLogFileSync = False
-    foundLogFilePara = False
     notAvailable = 'n.a.'
-    # db_time_ps = None
-    # db_cpu_time_ps = None
+    # parsing state of the line handlers
+    state = {'notAvailable': notAvailable, 'found': 0, 'foundLogFileSync': False, 'foundLogFilePara': False}
 
     # RAC currently not supported for statspack reports
     isRacDB = False; isRacReport = False; inst_num = 1; inst_list = []
     output['db_type'] = 'SI'
 
-    # Get first and last line number for SQL analysys lookups
-    # First line number > first 'SQL ordered by' line
-    # Last line number < 'Instance Activity Stats' line
-    sqlFirstLine = first_line_for_phrase(fileText, 'SQL ordered by')
-    sqlLastLine = first_line_for_phrase(fileText, 'Instance Activity Stats')
-
-    # sqlTextHash = initSqlResults(sql_pattern_search_text)
-    # sqlDbmsHash = initSqlResults(sql_pattern_search_dbms)
-    # sqlModulesHash = initSqlResults(sql_pattern_search_modules)
-    # oraFeaturesHash = initSqlResults(sql_pattern_search_features)
-    sqlTextHash = {}
-    sqlDbmsHash = {}
-    sqlModulesHash = {}
-    oraFeaturesHash = {}
-    oraHintsHash = {}
-
-    # sqlTextHash = initSqlResults(sql_pattern_search_text)
-    # sqlDbmsHash = initSqlResults(sql_pattern_search_dbms)
-    # sqlModulesHash = initSqlResults(sql_pattern_search_modules)
-    # oraFeaturesHash = initSqlResults(sql_pattern_search_features)
-    sqlTextHash = {}
-    sqlDbmsHash = {}
-    sqlModulesHash = {}
-    oraFeaturesHash = {}
-    oraHintsHash = {}
-
-    # sqlTextHash = initSqlResults(sql_pattern_search_text)
-    # sqlDbmsHash = initSqlResults(sql_pattern_search_dbms)
-    # sqlModulesHash = initSqlResults(sql_pattern_search_modules)
-    # oraFeaturesHash = initSqlResults(sql_pattern_search_features)
     sqlTextHash = {}
     sqlDbmsHash = {}
     sqlModulesHash = {}
     oraFeaturesHash = {}
     oraHintsHash = {}
+    sqlStatements = {}  # analyzed sql text lines (see analyzeSqlStatement)
+
+    # SQL analysis lookups are done
+    # for line numbers > first 'SQL ordered by' line
+    # and line numbers < first 'Instance Activity Stats' line
+    # Both line numbers are only known while reading the report, so the lines in question are kept
+    # until the range is confirmed:
+    # - sqlPending: sql results of lines after the 'SQL ordered by' line (added at 'Instance Activity Stats')
+    # - sqlPendingRows: lines before any 'SQL ordered by' line (only analyzed if there is no such line at all)
+    sqlFirstLine = -1
+    sqlLastLine = -1
+    sqlPending = []
+    sqlPendingRows = []
+    sqlResults = []
 
     # Information not available in statspack reports
     # Information not available in statspack report version < 10.0.0.0.0!
@@ -1121,325 +2876,49 @@ def run_LST(fileText, filename):
 
 
     # parse all lines from statspack report
-    found = 0
-    for i, row in enumerate(fileText):
+    for i, lines in lst_lines(fileText):
+        row = lines[0]
+        if sqlFirstLine < 0 and 'SQL ordered by' in row:
+            sqlFirstLine = i
+            sqlPendingRows = []
+        if sqlLastLine < 0 and 'Instance Activity Stats' in row:
+            sqlLastLine = i
+            if sqlFirstLine >= 0:
+                sqlResults += sqlPending
+            sqlPending = []
         if row == '':
             continue
         try:
-            # -----------------------------------------------------------------
-            # Basic database information
-            # -----------------------------------------------------------------
-
-            # Statspack release < 10.0.0.0 (begin)
-            if all(x in row for x in ['DB Name', 'DB Id']):
-                # first table in report, column "Release"
-                val = re.split(r" {1,}", fileText[i+2])
-                # column DB Id
-                output['db_name'] = val[0].strip()
-                # column DB Id
-                output['db_id'] = val[1].strip()
-                # column Instance
-                output['db_inst_name'] = val[2].strip()
-                # column "Inst Num"
-                output['db_inst_num'] = string_to_float(val[3])
-                # column "Release"
-                output['db_release'] = val[4].strip()
-                # column "RAC"
-                output['db_rac'] = val[5].strip()
-                output['host_name'] = val[6].strip()
-            # Statspack release < 10.0.0.0 (end)
-
-            # Statspack release >= 10.0.0.0 (begin)
-            if all(x in row for x in ['Database', 'DB Id']):
-                # table "Database" (first table in report)
-                val = re.split(r" {1,}", fileText[i+2])
-                # column DB Id
-                output['db_id'] = val[1].strip()
-                # column Instance
-                output['db_inst_name'] = val[2].strip()
-                # column "Inst Num"
-                output['db_inst_num'] = string_to_float(val[3])
-                # column "Release"
-                output['db_release'] = val[6].strip()
-                # column "RAC"
-                output['db_rac'] = val[7].strip()
-            # Statspack release >= 10.0.0.0 (end)
+            for index, phrases, handler in lst_line_handlers(lstDispatch, row):
+                if index >= lstReleaseHandlers and not 'db_release' in output:
+                    break
+                handler(output, state, lines)
 
             # https://docs.oracle.com/cd/E52734_01/core/ASADM/release.htm#ASADM445
             # https://docs.oracle.com/en/database/oracle/oracle-database/12.2/upgrd/about-oracle-database-release-numbers.html#GUID-1E2F3945-C0EE-4EB2-A933-8D1862D8ECE2
             # dbReleaseRec = [ Major, Maintnance, Minor, Patch Set, Patch Set Update]
             dbReleaseRec = output['db_release'].split('.')
 
-            # DB name (second try)
-            if ( re.search('^db_name ',row)
-            and (not 'db_name' in output or isNaN(output['db_name']) or output['db_name'] == notAvailable)):
-                val = re.split(r" {2,}", row)
-                output['db_name'] = val[1].strip()
-
-            # Statspack release < 10.0.0.0
-            # does not support host platform, cpu and memory information
-
-            # Statspack release 10.2.0.5 (begin)
-            # does not support host platform information
-            if all(x in row for x in ['Host  Name']):
-                val = re.split(r" {1,}", row)
-                output['host_name'] = val[2].strip()
-            if all(x in row for x in ['Num CPUs']):
-                val = re.split(r" {1,}", row)
-                output['host_cpu_num'] = string_to_float(val[5])
-            # Statspack release 10.2.0.5 (end)
-
-            if all(x in row for x in ['Host', 'Name', 'Platform']):
-                val = re.split(r" {2,}", fileText[i+2])
-                # table "Host", column "Name"
-                output['host_name'] = val[1].strip()
-                # table "Host", column "Platform"
-                output['platform'] = val[2].strip()
-                # table "Host", column "CPUs"
-                output['host_cpu_num'] = string_to_float(val[3])
-
-            if all(x in row for x in ['Snap Id', 'Snap Time']):
-                # table "Snapshot", column "Snap Time"
-                val = re.split(r" {1,}", fileText[i+2])
-                output['db_snap_begin_time'] = val[3].strip() + " " + val[4].strip()
-                val = re.split(r" {1,}", fileText[i+3])
-                output['db_snap_end_time'] = val[4].strip() + " " + val[5].strip()
-
-            # -----------------------------------------------------------------
-            # CPU capacity and usage
-            # -----------------------------------------------------------------
-
-            # Host cpu count (host_cpu_num)
-            # already captured from host table (see above)!
-
-            # DB cpu count usage limit (Parameter cpu_count)
-            if re.search('^cpu_count ',row):
-                # table "init.ora Parameters", column "Begin value"
-                val = re.split(r" {2,}", row)
-                output['db_cpu_count'] = string_to_float(val[1])
-
-            # --- switched from table "Instance CPU" to "OS Statistics"     ---
-            # --- "Instance CPU" is not filled at all in version 10.2.0.5.0 ---
-
-            # if all(x in row for x in ['Host: Busy CPU time (s):']):
-            #     # "host_cpu_busy_time_s" from table "Instance CPU"
-            #     val = re.split(r" {2,}", row)
-            #     host_cpu_busy_time_s = string_to_float(val[2])
-            #     output['host_cpu_busy_time_s'] = host_cpu_busy_time_s
-            # if all(x in row for x in ['Host: Total time (s):']):
-            #     # "host_cpu_total_time_s" from table "Instance CPU"
-            #     val = re.split(r" {2,}", row)
-            #     host_cpu_total_time_s = string_to_float(val[2])
-
-            # Host cpu busy time in seconds
-            if all(x in row for x in ['BUSY_TIME ']):
-                # table "OS Statistics"
-                val = re.split(r" {2,}", row)
-                host_cpu_busy_time_s = string_to_float(val[1]) / 100
-                output['host_cpu_busy_time_s'] = host_cpu_busy_time_s
-            # Host cpu idle time in seconds
-            if all(x in row for x in ['IDLE_TIME ']):
-                # table "OS Statistics"
-                val = re.split(r" {2,}", row)
-                host_cpu_idle_time_s = string_to_float(val[1]) / 100
-                output['host_cpu_idle_time_s'] = host_cpu_idle_time_s
-
-            # DB foreground cpu time in seconds (used for db cpu usage calculation)
-            if all(x in row for x in ['DB CPU ']):
-                # table "Time Model System Stats", column "Time (s)"
-                found += 1
-                if found == 1:
-                    val = re.split(r" {2,}", row)
-                    output['db_cpu_fg_time_s'] = string_to_float(val[1])
-                    output['db_cpu_pct_db_time'] = string_to_float(val[2])
-            # DB background cpu time in seconds (used for db cpu usage calculation)
-            if all(x in row for x in ['background cpu time ']):
-                # table "Time Model System Stats", column "Time (s)"
-                val = re.split(r" {2,}", row)
-                output['db_cpu_bg_time_s'] = string_to_float(val[1])
-
-            # -----------------------------------------------------------------
-            # Memory capacity and usage
-            # -----------------------------------------------------------------
-
-            # Host memory in mb
-            if all(x in row for x in ['Host Mem (MB):']):
-                # table "Memory Statistics", column "Begin"
-                val = re.split(r" {1,}", row)
-                output['host_memory_mb'] = string_to_float(val[4])
-            # SGA used in mb
-            if all(x in row for x in ['SGA use (MB):']):
-                # table "Memory Statistics", column "Begin"
-                val = re.split(r" {1,}", row)
-                output['db_sga_usage_mb'] = string_to_float(val[4])
-            # PGA used in mb
-            if all(x in row for x in ['PGA use (MB):']):
-                # table "Memory Statistics", column "Begin"
-                val = re.split(r" {1,}", row)
-                output['db_pga_usage_mb'] = string_to_float(val[4])
-
-            # -----------------------------------------------------------------
-            # IO usage statistics
-            # -----------------------------------------------------------------
-
-            # Physical read io per seconds
-            if all(x in row for x in ['physical read total IO requests']):
-                # table "Instance Activity Stats", column "Per Second"
-                val = re.split(r" {1,}", row)
-                output['db_physical_read_total_io_ps'] = string_to_float(val[6])
-            # Physical write io per seconds
-            if all(x in row for x in ['physical write total IO requests']):
-                # table "Instance Activity Stats", column "Per Second"
-                val = re.split(r" {1,}", row)
-                output['db_physical_write_total_io_ps'] = string_to_float(val[6])
-
-            # if all(x in row for x in ['physical read total bytes']):
-            #     # table "Instance Activity Stats", column "Per Second"
-            #     val = re.split(r" {2,}", row)
-            #     output['db_physical_read_total_mbps'] = \
-            #         string_to_float(val[1]) / 1048576
-            # if all(x in row for x in ['physical write total bytes']):
-            #     # table "Instance Activity Stats", column "Per Second"
-            #     val = re.split(r" {2,}", row)
-            #     output['db_physical_write_total_mbps'] = \
-            #         string_to_float(val[1]) / 1048576
-
-            # Physical read blocks per seconds (used for mb calculation)
-            if all(x in row for x in ['Physical reads:']):
-                # table "Load Profile", column "Per Second"
-                val = re.split(r" {2,}", row)
-                db_physical_read_blocks = string_to_float(val[2])
-            # Physical write blocks per seconds (used for mb calculation)
-            if all(x in row for x in ['Physical writes:']):
-                # table "Load Profile", column "Per Second"
-                val = re.split(r" {2,}", row)
-                db_physical_write_blocks = string_to_float(val[2])
-            # DB block size (used for read/write mb calculation)
-            if re.search('^db_block_size', row):
-                # table "init.ora Parameters", calumn "Begin value"
-                val = re.split(r" {2,}", row)
-                db_block_size = string_to_float(val[1])
-
-            # -----------------------------------------------------------------
-            # Workload statistics
-            # -----------------------------------------------------------------
-
-            # User calls per seconds/transaction
-            if all(x in row for x in ['User calls:']):
-            # if all(x in row for x in ['^user calls']):
-                # table "Instance Activity Stats"
-                val = re.split(r" {1,}", row)
-                output['db_user_calls_ps'] = string_to_float(val[3])    # column "per Second"
-                output['db_user_calls_pt'] = string_to_float(val[4])    # column "per Trans"
-
-            # User commits per seconds/transaction
-            if all(x in row for x in ['user commits']):
-                # table "Instance Activity Stats"
-                val = re.split(r" {1,}", row)
-                output['db_user_commits_ps'] = string_to_float(val[3])  # column "per Second"
-                output['db_user_commits_pt'] = string_to_float(val[4])  # column "per Trans"
-
-            # Redo size in mb
-            # if all(x in row for x in ['redo size']):
-            #     if "for direct writes" not in row:
-            #         val = re.split(r" {1,}", row)
-            #         output['Redo (bps)'] = string_to_float(val[2])
-            if all(x in row for x in ['Redo size:']):
-                # table "Load Profile", column "Per Second"
-                val = re.split(r" {1,}", row)
-                output['db_redo_mbps'] = string_to_float(val[3])/1048576
-
-            # Log file sync wait event
-            # [Foreground|Background|both] wait event - what's the right source?
-            # Actualy the first match wins.
-            if all(x in row for x in ['log file sync']):
-                # table "[Foreground|Background|both] Wait Events", column "Waits"
-                if foundLogFileSync == False:
-                    val = re.split(r" {1,}", row)
-                    output['db_log_file_sync_avg_wait_ms'] = string_to_float(val[6])
-                    foundLogFileSync = True
-
-            # Log file parallel write wait event
-            # [Foreground|Background|both] wait event - what's the right source?
-            # Actualy the first match wins.
-            if all(x in row for x in ['log file parallel write']):
-                # table "[Foreground|Background|both] Wait Events", column "Waits"
-                if foundLogFilePara == False:
-                    val = re.split(r" {1,}", row)
-                    output['db_log_file_pwrite_avg_wait_ms'] = string_to_float(val[7])
-                    foundLogFilePara = True
-
-            # Table scans (direct read) count
-            if all(x in row for x in ['table scans (direct read)']):
-                # table "Instance Activity Stats", column "Total"
-                val = re.split(r" {1,}", row)
-                output['db_table_scans_dread_total'] = string_to_float(val[4])
-
-            # -----------------------------------------------------------------
-            # Time statistics
-            # -----------------------------------------------------------------
-
-            # Elapsed time
-            # if all(x in row for x in ['Elapsed:', 'Av Act Sess:']):
-            #     val = re.split(r" {1,}", fileText[i])
-            #     # table "Snapshot", column "Snap Id"
-            #     output['elapsed_time_min'] = string_to_float(val[val.index('Elapsed:') + 1])
-            #     # AAS is calculated in run_globalCalculations!
-            #     # table "Snapshot", column "Sessions"
-            #     # output['db_avg_active_sessions'] = \
-            #     #     string_to_float(val[val.index('Sess:') + 1])
-            if all(x in row for x in ['Snap Id', 'Snap Time']):
-                # table "Snapshot", column "Snap Time"
-                val = re.split(r" {2,}", fileText[i+4])
-                # remove '(mins)' from value before string_to_float conversion
-                output['elapsed_time_min'] = string_to_float(val[val.index('Elapsed:') + 1].split(' ')[0])
-
-            # DB time (available since release 11.1)
-            if all(x in row for x in ['DB time:', 'DB CPU:']):
-                # table "Snapshot", column "Snap Id"
-                val = re.split(r" {1,}", fileText[i])
-                output['db_time_min'] = string_to_float(val[val.index('time:') + 1].replace('#',''))
-            if ( re.search('^DB time ', row)
-            and (not 'db_time_min' in output or isNaN(output['db_time_min']) or output['db_name'] == notAvailable)):
-                # table "Time Model System Stats", column "Time (s)"
-                val = re.split(r" {2,}", fileText[i])
-                output['db_time_min'] = string_to_float(val[1])/60
-
-            # if all(x in row for x in ['DB time(s):']):
-            #     # table "Load Profile", column "Per Seconds"
-            #     val = re.split(r" {2,}", row)
-            #     db_time_ps = string_to_float(val[2])
-            # if all(x in row for x in ['DB CPU(s):']):
-            #     # table "Load Profile", column "Per Seconds"
-            #     val = re.split(r" {2,}", row)
-            #     db_cpu_time_ps = string_to_float(val[2])
-
-            # -----------------------------------------------------------------
-            # Others
-            # -----------------------------------------------------------------
-
-            # init.ora Parameter: compatible
-            if all(x in row for x in ['compatible']):
-                # table "init.ora Parameters", calumn "Begin value"
-                val = re.split(r" {1,}", row)
-                output['db_compatible'] = val[1].strip()
-            # init.ora Parameter: optimizer_features_enable
-            if all(x in row for x in ['optimizer_features_enable']):
-                # table "init.ora Parameters", calumn "Begin value"
-                val = re.split(r" {1,}", row)
-                output['db_optimizer_features_enable'] = val[1].strip()
-
             # SQLs keyword lookups
             # Only between first 'SQL ordered by' line and 'Instance Activity Stats' line
-            if i > sqlFirstLine and i < sqlLastLine:
-                analyzeSQL(sqlTextHash, row, sql_pattern_search_text)
-                analyzeSQL(sqlDbmsHash, row, sql_pattern_search_dbms)
-                analyzeSQL(sqlModulesHash, row, sql_pattern_search_modules)
-                analyzeSQL(oraFeaturesHash, row, sql_pattern_search_features)
-                searchHints(oraHintsHash, row)
+            if sqlLastLine < 0:
+                if sqlFirstLine < 0:
+                    sqlPendingRows.append(row)
+                elif i > sqlFirstLine:
+                    sqlPending.append(analyzeSqlStatement(sqlStatements, row))
         except:
             continue
 
+    if sqlFirstLine < 0 and sqlLastLine >= 0:
+        # no 'SQL ordered by' line: all lines before the 'Instance Activity Stats' line
+        for row in sqlPendingRows:
+            try:
+                sqlResults.append(analyzeSqlStatement(sqlStatements, row))
+            except:
+                continue
+    for result in sqlResults:
+        addSqlResults([sqlTextHash, sqlDbmsHash, sqlModulesHash, oraFeaturesHash, oraHintsHash], result)
+
     output['db_sql'] = getSqlResults(sqlTextHash, 'count')
     output['db_dbms'] = getSqlResults(sqlDbmsHash, 'keys')
     output['db_modules'] = getSqlResults(sqlModulesHash, 'keys')
@@ -1447,16 +2926,15 @@ def run_LST(fileText, filename):
     output['db_hints'] = getSqlResults(oraHintsHash, 'keys')
 
     # Some calculations
-    lvars = locals()
-    # if all(var in lvars for var in ('host_cpu_total_time_s', 'host_cpu_busy_time_s')):
+    # if all(var in state for var in ('host_cpu_total_time_s', 'host_cpu_busy_time_s')):
     #     output['host_cpu_idle_time_s'] = \
     #         host_cpu_total_time_s - host_cpu_busy_time_s
-    if all(var in lvars for var in ('db_physical_read_blocks', 'db_block_size')):
+    if all(var in state for var in ('db_physical_read_blocks', 'db_block_size')):
         output['db_physical_read_total_mbps'] = \
-            db_physical_read_blocks * db_block_size / 1048576
-    if all(var in lvars for var in ('db_physical_write_blocks', 'db_block_size')):
+            state['db_physical_read_blocks'] * state['db_block_size'] / 1048576
+    if all(var in state for var in ('db_physical_write_blocks', 'db_block_size')):
         output['db_physical_write_total_mbps'] = \
-            db_physical_write_blocks * db_block_size / 1048576
+            state['db_physical_write_blocks'] * state['db_block_size'] / 1048576
     # if db_cpu_time_ps and db_time_ps
     #     output['db_cpu_pct_db_time'] = round_up(db_cpu_time_ps / db_time_ps * 100, 2)
 
@@ -1475,6 +2953,11 @@ End of RunLST.py script
 Begin of RunSQL.py script for functions regarding sql analysis
 """
 import re
+# pyahocorasick is optional: without it literal sql patterns are searched one by one (see buildAutomaton)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 ############## SQL text analysis ################
 
@@ -1531,6 +3014,139 @@ def analyzeSQL(result_hash = {}, sql_text = '', search_array = []):
             if pattern in sql:
                 updateHash(result_hash, item[0])
 
+def getSqlSearchItems(search_array = []):
+    '''Get [search name, search pattern, flags] for all items of a search array (see analyzeSQL)'''
+    items = []
+    for item in search_array:
+        pattern = item[1]
+        flag = ''
+        if len(item) > 2:
+            flag = item[2]
+        # set case insensitive search flag 'i' (default)
+        if not 's' in flag and not 'i' in flag:
+            flag = flag + 'i'
+        # set pattern to lower case for case insensitive search except for regexp patterns
+        if 'i' in flag and not 'r' in flag:
+            pattern = pattern.lower()
+        items.append([item[0], pattern, flag])
+    return items
+
+def buildAutomaton(patterns = []):
+    '''
+    Build a literal pattern matcher for patterns [[pattern, id], ..]
+    Aho-Corasick automaton if pyahocorasick is installed, a list of [pattern, ids] otherwise
+    (in CPython the builtin substring search is faster than an Aho-Corasick automaton written in python)
+    '''
+    ids = {}
+    for pattern, id in patterns:
+        ids.setdefault(pattern, []).append(id)
+    if ahocorasick is None:
+        return list(ids.items())
+    automaton = ahocorasick.Automaton()
+    for pattern in ids:
+        automaton.add_word(pattern, ids[pattern])
+    automaton.make_automaton()
+    return automaton
+
+def matchAutomaton(automaton, text, found):
+    '''Add the ids of all literal patterns found in text (see buildAutomaton)'''
+    if ahocorasick is None:
+        for pattern, ids in automaton:
+            if pattern in text:
+                found.update(ids)
+    else:
+        for end, ids in automaton.iter(text):
+            found.update(ids)
+
+def compileSqlSearch(search_arrays = []):
+    '''
+    Compile sql pattern search arrays (see sql_pattern_search_*) into one matcher for searchSQL
+    - literal patterns of all arrays are searched in one pass by an Aho-Corasick automaton (see buildAutomaton)
+      (on the lower case sql text for case insensitive patterns, the original sql text otherwise)
+    - regular expression patterns are prefiltered by one alternation regex
+      (the single regex are only run if the alternation regex matches)
+    '''
+    matcher = {'items': [], 'lower': [], 'exact': [], 'regex': {'i': [], 's': []}}
+    for a, search_array in enumerate(search_arrays):
+        for name, pattern, flag in getSqlSearchItems(search_array):
+            id = len(matcher['items'])
+            matcher['items'].append([a, name])
+            case = 'i' if 'i' in flag else 's'
+            if 'r' in flag:
+                matcher['regex'][case].append([re.compile(pattern, re.IGNORECASE if case == 'i' else 0), id])
+            elif case == 'i':
+                matcher['lower'].append([pattern, id])
+            else:
+                matcher['exact'].append([pattern, id])
+
+    for key in ['lower', 'exact']:
+        matcher[key] = buildAutomaton(matcher[key]) if matcher[key] else None
+    for case in ['i', 's']:
+        regexes = matcher['regex'][case]
+        matcher['regex'][case] = [None, regexes]
+        if regexes:
+            try:
+                matcher['regex'][case][0] = re.compile('|'.join('(?:' + regex.pattern + ')' for regex, id in regexes), re.IGNORECASE if case == 'i' else 0)
+            except re.error:
+                pass    # no prefilter
+    return matcher
+
+def searchSQL(matcher, result_hashes = [], sql_text = ''):
+    '''
+    Search all patterns of a compiled matcher (see compileSqlSearch) in sql text
+    Same counts as analyzeSQL for each search array: result_hashes[<search array index>]
+    '''
+    found = set()
+    sql = sql_text.lower()
+    for key, text in [['lower', sql], ['exact', sql_text]]:
+        if matcher[key] is not None:
+            matchAutomaton(matcher[key], text, found)
+    for case, text in [['i', sql], ['s', sql_text]]:
+        prefilter, regexes = matcher['regex'][case]
+        if regexes and (prefilter is None or prefilter.search(text)):
+            for regex, id in regexes:
+                if regex.search(text):
+                    found.add(id)
+
+    for id in found:
+        a, name = matcher['items'][id]
+        result_hashes[a][name] = result_hashes[a].get(name, 0) + 1
+
+sqlMatchers = {}    # compiled matchers (see getSqlMatcher)
+
+def getSqlMatcher(search_arrays = []):
+    '''Get the compiled matcher for search arrays (compiled only once)'''
+    key = tuple(id(search_array) for search_array in search_arrays)
+    if key not in sqlMatchers:
+        sqlMatchers[key] = compileSqlSearch(search_arrays)
+    return sqlMatchers[key]
+
+def analyzeSqlStatement(statements, sql_text = '', module_text = None):
+    '''
+    Pattern and hint analysis of one sql statement, analyzed only once for each distinct sql text
+    <statements> dict of already analyzed statements, <module_text> "SQL Module" column (None: use sql text)
+    Returns the result hashes [text, dbms, modules, features, hints] of the statement
+    '''
+    key = (sql_text, module_text)
+    if key not in statements:
+        sqlTextHash = {}; sqlDbmsHash = {}; sqlModulesHash = {}; oraFeaturesHash = {}; oraHintsHash = {}
+        if module_text is None:
+            searchSQL(getSqlMatcher([sql_pattern_search_text, sql_pattern_search_dbms, sql_pattern_search_modules, sql_pattern_search_features]),
+                      [sqlTextHash, sqlDbmsHash, sqlModulesHash, oraFeaturesHash], sql_text)
+        else:
+            searchSQL(getSqlMatcher([sql_pattern_search_text, sql_pattern_search_dbms, sql_pattern_search_features]),
+                      [sqlTextHash, sqlDbmsHash, oraFeaturesHash], sql_text)
+            searchSQL(getSqlMatcher([sql_pattern_search_modules]), [sqlModulesHash], module_text)
+        searchHints(oraHintsHash, sql_text)
+        statements[key] = [sqlTextHash, sqlDbmsHash, sqlModulesHash, oraFeaturesHash, oraHintsHash]
+    return statements[key]
+
+def addSqlResults(result_hashes = [], statement_hashes = []):
+    '''Add the result hashes of one sql statement (see analyzeSqlStatement) to the report result hashes'''
+    for result_hash, statement_hash in zip(result_hashes, statement_hashes):
+        for key in statement_hash:
+            result_hash[key] = result_hash.get(key, 0) + statement_hash[key]
+
 def getSqlResults(result_hash = {}, type = 'count'):
     '''
     type can be 'count' -> "<FoundPattern1>(<Count>) <FoundPattern2(<Count>).."
@@ -1557,6 +3173,10 @@ def searchHints(result_hash = {}, sql_text = ''):
     # See Oracle docu for more information to hints
     # https://docs.oracle.com/en/database/oracle/oracle-database/21/sqlrf/Comments.html#GUID-D316D545-89E2-4D54-977F-FC97815CD62E
 
+    # most sql texts doesn't contain any hint comment
+    if not '--+' in sql_text and not '/*+' in sql_text:
+        return
+
     # lookup for a hint comment (starts with "--+")
     match = re.split('--\+', sql_text)
     result = ''
@@ -1602,36 +3222,90 @@ Begin of RunRVT.py script for functions regarding RV Tools report analysis
 
 ############ RV Tools report analysis ############
 
-def run_RVT(dict, dnsname, vInfo_csv, vHost_csv):
-    '''Run RV Tools report mapping'''
-    print("Map RV tools records using dns name: ", dnsname)
+# RV tools column names of the VMware VM guest (tabvInfo) and ESX host (tabvHost) keys
+rvDnsCol = 'DNS Name'
+rvHostCol = 'Host'
+rvHostInCols = [col[0] for col in rvHostCols]
+
+def rvtools_export(fileName, tab):
+    '''
+    RV tools export name of a RV tools csv file "<export>RVTools_<tab>.csv" (None for other files)
+    Files of several RV tools exports (e.g. of different vCenters) are distinguished by a file name prefix
+    like "vc01-RVTools_tabvInfo.csv" and "vc01-RVTools_tabvHost.csv" (export name "vc01-")
+    '''
+    match = re.match(r'(.*)RVTools_' + tab + r'\.csv$', os.path.basename(fileName))
+    return match.group(1) if match else None
 
-    rvInCols = []; rvOutCols = [];
-    for i in rvHostCols:
-      rvInCols.append(i[0])
-      rvOutCols.append(i[1])
+def rv_dns_key(dnsname):
+    ''' Normalized DNS name of the RV tools mapping: case folded host name without domain '''
+    return dnsname.strip().casefold().split('.')[0]
+
+def build_rvtools_index(vInfo, vHost):
+    '''
+    Build the lookup index of all RV tools exports (built once per batch, see load_input_files)
+    <vInfo> and <vHost> are {<export name>: tabvInfo | tabvHost dataframe} (see rvtools_export)
+    The index keeps (first record of each key in export order):
+    - 'dns':   case folded DNS name -> [export name, ESX host] of the VM
+    - 'names': normalized DNS name (see rv_dns_key) -> [export name, ESX host] of the VM
+    - 'hosts': (export name, ESX host) and ESX host -> {<rvHostCols column>: value} of the ESX host
+    Returns None if VM guest or ESX host information is not available
+    '''
+    rvOutCols = [col[1] for col in rvHostCols]
+    index = {'dns': {}, 'names': {}, 'hosts': {}}
+
+    for export, frame in vHost.items():
+        missing = [col for col in [rvHostCol] + rvHostInCols if col not in frame.columns]
+        if missing:
+            print("Skip RVTools_tabvHost.csv of export '%s' (missing columns %s)" % (export, ', '.join(missing)))
+            continue
+        # numpy column arrays keep the value types of the dataframe columns
+        values = [frame[col].values for col in rvHostInCols]
+        for pos, host in enumerate(frame[rvHostCol].tolist()):
+            if (export, host) not in index['hosts']:
+                index['hosts'][(export, host)] = {out: values[i][pos] for i, out in enumerate(rvOutCols)}
+                index['hosts'].setdefault(host, index['hosts'][(export, host)])
+
+    vms = []
+    for export, frame in vInfo.items():
+        if rvDnsCol not in frame.columns or rvHostCol not in frame.columns:
+            print("Skip RVTools_tabvInfo.csv of export '%s' (missing columns %s, %s)" % (export, rvDnsCol, rvHostCol))
+            continue
+        frame = frame[frame[rvDnsCol].notna()]
+        dns = frame[rvDnsCol].astype(str).str.strip().str.casefold()
+        vms.append(pandas.DataFrame({'dns': dns, 'name': dns.str.replace(r'\..*', '', regex=True), 'export': export, 'host': frame[rvHostCol]}))
+    if vms:
+        vms = pandas.concat(vms, ignore_index=True)
+        vms = vms[vms['dns'] != '']
+        for key, column in [['dns', 'dns'], ['names', 'name']]:
+            first = vms.drop_duplicates(column)
+            index[key] = dict(zip(first[column].tolist(), zip(first['export'].tolist(), first['host'].tolist())))
+
+    if not index['dns'] or not index['hosts']:
+        return None
+    return index
+
+def run_RVT(dict, dnsname, rvIndex):
+    '''Run RV Tools report mapping (lookups in the RV tools index, see build_rvtools_index)'''
+    print("Map RV tools records using dns name: ", dnsname)
 
     # Lookup hostname from VMware virtual hosts and get ESX hostname
-    # mpils: dnsname match should maybe done in lowercase and without domain?
-    matched_line_Info = vInfo_csv[vInfo_csv['DNS Name'] == dnsname]
-    if matched_line_Info.loc[:, 'Host'].empty:
+    # DNS names are matched case insensitive and without domain, a VM with the same full DNS name is preferred
+    vm = None
+    if isinstance(dnsname, str):
+        vm = rvIndex['dns'].get(dnsname.strip().casefold()) or rvIndex['names'].get(rv_dns_key(dnsname))
+    if vm is None:
       print("DNS name not found in RVTools_tabvInfo.csv.")
+      return
+
+    # Lookup ESX hostname from VMware physical hosts (same RV tools export first)
+    data = rvIndex['hosts'].get(vm)
+    if data is None:
+      data = rvIndex['hosts'].get(vm[1])
+    if data is None:
+      print("Host not found in RVTools_tabvHost.csv.")
     else:
-      host_name = matched_line_Info.loc[:, 'Host'].values[0]
-
-      # Lookup ESX hostname from VMware physical hosts
-      matched_line_Host = vHost_csv[vHost_csv['Host'] == host_name]
-      if matched_line_Host.loc[:, rvInCols].empty:
-        print("Host not found in RVTools_tabvHost.csv.")
-      else:
-        data = matched_line_Host.loc[:, rvInCols]
-
-        print(data)
-        if data is not None:
-            for i, col in enumerate(rvOutCols):
-                value = data.iloc[:, i].values[0]
-                # print(value)
-                dict[col] = value
+      print(data)
+      dict.update(data)
 """
 End of RunRVT.py script
 """
@@ -1642,29 +3316,232 @@ import pandas
 
 ############### Database size csv mapping ###############
 
-def run_DBS(dict, df, SelCols, OutCols):
-    '''Run database size csv mapping'''
+def build_dbsize_index(frames):
+    '''
+    Build the lookup index of all database size records (built once per batch, see load_input_files)
+    <frames> are the dataframes of all *-dbSize.csv files (columns dbInCols), concatenated once in file order.
+    The index keeps the mapped values {<dbSizeCols output column>: value} of the first record of each key:
+    - 'keys':  (lower case DB_NAME, lower case DB_UNAME) -> values
+    - 'names': lower case DB_NAME -> values
+    '''
+    df = pandas.concat(frames, ignore_index=True)
+    records = df[dbSelCols].set_axis(dbOutCols, axis='columns').to_dict('records')
+    index = {'keys': {}, 'names': {}}
+    for name, uname, record in zip(df['DB_NAME'].tolist(), df['DB_UNAME'].tolist(), records):
+        if isinstance(name, str):
+            index['names'].setdefault(name.lower(), record)
+            if isinstance(uname, str):
+                index['keys'].setdefault((name.lower(), uname.lower()), record)
+    return index
+
+def run_DBS(dict, dbSizeIndex):
+    '''Run database size csv mapping (lookups in the database size index, see build_dbsize_index)'''
 
     # databases are mapped using DB name and DB unique name
     # DB unique name not filled in all AWRs!
     # DB name and db unique name not filled in Statspack reports!
-    matched_line_db = pandas.DataFrame()
+    record = None
     if 'db_name' in dict:
         if 'db_uname' in dict:
-            matched_line_db = df.loc[(df['DB_NAME'].str.lower() == dict['db_name'].lower()) & (df['DB_UNAME'].str.lower() == dict['db_uname'].lower()),SelCols]
+            record = dbSizeIndex['keys'].get((dict['db_name'].lower(), dict['db_uname'].lower()))
         else:
-            matched_line_db = df.loc[(df['DB_NAME'].str.lower() == dict['db_name'].lower()), SelCols]
-    if matched_line_db.empty:
+            record = dbSizeIndex['names'].get(dict['db_name'].lower())
+    if record is None:
         print("Database not found in *-dbSize.csv files.")
     else:
-      data_rec = matched_line_db.set_axis(OutCols, axis='columns').to_dict('records')  # -> [{}]
-      dict.update(data_rec[0])     # only first matched database record used!
+      dict.update(record)     # only first matched database record used!
 """
 End of RunDBS.py script
 """
 """
+Begin of RunHIST.py script for functions regarding DBA_HIST extract analysis
+"""
+import os
+import re
+import traceback
+import pandas
+
+############ DBA_HIST extract analysis ############
+
+def hist_view(fileName):
+    ''' DBA_HIST view of extract file <fileName> (*.csv or *.parquet file name containing the view name, see histViews) or None '''
+    if not fileName.lower().endswith(('.csv', '.parquet')):
+        return None
+    name = os.path.basename(fileName).upper()
+    for view in histViews:
+        if re.search(view + '(?![A-Z])', name):
+            return view
+    return None
+
+def read_hist_file(path, view):
+    '''
+    Read the columns of DBA_HIST extract file <path> used for view <view> (see histViews) into a dataframe
+    Only rows of the statistics used (see histStatCols) are kept (parquet files: filtered while reading).
+    Column names are upper case, csv files are separated by ',' or ';'.
+    '''
+    keys, nameCol, valueCol = histViews[view]
+    columns = keys + [col for col in (nameCol, valueCol) if col]
+    names = [col[1] for col in histStatCols if col[0] == view] or None
+    if path.lower().endswith('.parquet'):
+        if pyarrow is None:
+            raise ImportError('pyarrow is needed to read parquet DBA_HIST extracts')
+        fileCols = {col.strip().upper(): col for col in pyarrow.parquet.read_schema(path).names}
+        filters = [(fileCols[nameCol], 'in', names)] if names and nameCol in fileCols else None
+        df = pyarrow.parquet.read_table(path, columns=[fileCols[col] for col in columns if col in fileCols], filters=filters).to_pandas()
+    else:
+        with open(path, 'r', encoding='utf8', errors='ignore') as f:
+            head = f.readline()
+        sep = ';' if head.count(';') > head.count(',') else ','
+        df = pandas.read_csv(path, sep=sep, usecols=lambda col: col.strip().upper() in columns)
+    df.columns = [col.strip().upper() for col in df.columns]
+    if names and nameCol in df.columns:
+        df = df[df[nameCol].isin(names)]
+    df['FILE'] = os.path.basename(path)
+    return df
+
+def hist_stat_values(df, view, snaps):
+    '''
+    Instance snapshot values {<internal column>: series} of the statistics of view <view> (see histStatCols)
+    <df> extract rows of the view, <snaps> instance snapshot intervals (seconds, index DBID, INSTANCE_NUMBER, SNAP_ID)
+    '''
+    keys, nameCol, valueCol = histViews[view]
+    index = ['DBID', 'INSTANCE_NUMBER', 'SNAP_ID']
+    wide = df.pivot_table(index=index, columns=nameCol, values=valueCol, aggfunc='first')
+    # previous snapshot of the same instance (cumulative statistics are only valid for consecutive snapshots)
+    snapIds = pandas.Series(wide.index.get_level_values('SNAP_ID'), index=wide.index)
+    consecutive = snapIds.groupby(level=['DBID', 'INSTANCE_NUMBER']).shift() == snapIds - 1
+    seconds = snaps['seconds'].reindex(wide.index)
+
+    values = {}
+    for col in histStatCols:
+        if col[0] != view or col[1] not in wide.columns:
+            continue
+        value = pandas.to_numeric(wide[col[1]], errors='coerce') / col[3]
+        if col[4] in ('delta', 'delta_ps'):
+            # statistic value of the snapshot interval, instance restarts (negative values) are skipped
+            value = value.groupby(level=['DBID', 'INSTANCE_NUMBER']).diff().where(consecutive)
+            value = value.where(value >= 0)
+            if col[4] == 'delta_ps':
+                value = value / seconds
+        elif col[4] == 'time':
+            value = value * seconds
+        values[col[2]] = value.combine_first(values[col[2]]) if col[2] in values else value
+    return values
+
+def run_HIST(paths, inputData=None):
+    '''
+    Run the analysis of DBA_HIST extract files <paths> (csv or parquet exports of the views in histViews)
+    The extracts are reduced by vectorized group-bys to one record for each database (DBID) snapshot with the same
+    output columns as an AWR report of the snapshot interval (RAC: summarized over the instances of the snapshot).
+    DBA_HIST_SYSMETRIC_SUMMARY is needed for the snapshot intervals. Derived values are calculated like for reports
+    (see run_globalCalculations), RV tools and database size data is mapped like for reports (see analyze_report).
+    Paths which are no DBA_HIST extract files (see hist_view) are skipped.
+    Returns the list of snapshot records (report records without instances)
+    '''
+    if inputData is None:
+        inputData = {'rvIndex': None, 'dbSize': None}
+    frames = {}
+    for path in paths:
+        view = hist_view(path)
+        if view is None:
+            print('Skip', os.path.basename(path) + ': no DBA_HIST extract file (see histViews)')
+            continue
+        print('Read DBA_HIST extract', os.path.basename(path), '(' + view + ')')
+        try:
+            frames.setdefault(view, []).append(read_hist_file(path, view))
+        except Exception:
+            print(traceback.format_exc())
+    views = {view: pandas.concat(dfs, ignore_index=True) for view, dfs in frames.items()}
+    if 'DBA_HIST_SYSMETRIC_SUMMARY' not in views:
+        print('Skip DBA_HIST extracts: DBA_HIST_SYSMETRIC_SUMMARY extract (snapshot intervals) not found.')
+        return []
+
+    # Instance snapshot intervals (INTSIZE in centiseconds)
+    index = ['DBID', 'INSTANCE_NUMBER', 'SNAP_ID']
+    metrics = views['DBA_HIST_SYSMETRIC_SUMMARY']
+    snaps = metrics.groupby(index).agg(begin=('BEGIN_TIME', 'first'), end=('END_TIME', 'first'), seconds=('INTSIZE', 'max'), file=('FILE', 'first'))
+    snaps['seconds'] = pandas.to_numeric(snaps['seconds'], errors='coerce') / 100
+    snaps['begin'] = pandas.to_datetime(snaps['begin'], errors='coerce')
+    snaps['end'] = pandas.to_datetime(snaps['end'], errors='coerce')
+
+    # Instance snapshot values of all statistics (first view of histStatCols with a value wins)
+    values = {}
+    for view in dict.fromkeys(col[0] for col in histStatCols):
+        if view in views:
+            for col, value in hist_stat_values(views[view], view, snaps).items():
+                values[col] = values[col].combine_first(value) if col in values else value
+    if 'DBA_HIST_SGA' in views:
+        sga = views['DBA_HIST_SGA']
+        values['db_sga_usage_mb'] = pandas.to_numeric(sga['VALUE'], errors='coerce').groupby([sga[col] for col in index]).sum(min_count=1) / 1048576
+    inst = pandas.DataFrame({col: value.reindex(snaps.index) for col, value in values.items()}, index=snaps.index)
+
+    # Database snapshot values: sum of the instance values
+    grouped = inst.groupby(level=['DBID', 'SNAP_ID'])
+    snapshot = grouped.sum(min_count=1)
+    snapGroups = snaps.groupby(level=['DBID', 'SNAP_ID'])
+    snapshot['elapsed_time_min'] = snapGroups['seconds'].max() / 60
+    snapshot['db_inst_num'] = snapGroups.size()
+    if 'db_user_rollbacks_ps' in snapshot.columns:
+        transactions = snapshot['db_user_commits_ps'] + snapshot.pop('db_user_rollbacks_ps')
+        transactions = transactions.where(transactions > 0)
+        snapshot['db_user_calls_pt'] = snapshot['db_user_calls_ps'] / transactions
+        snapshot['db_user_commits_pt'] = snapshot['db_user_commits_ps'] / transactions
+    snapshot = snapshot.round(2)
+    if 'db_redo_mbps' in inst.columns:
+        snapshot['db_redo_mbps'] = grouped['db_redo_mbps'].sum(min_count=1).round(6)
+    begins = snapGroups['begin'].min().dt.strftime('%d-%b-%y %H:%M:%S').tolist()
+    ends = snapGroups['end'].max().dt.strftime('%d-%b-%y %H:%M:%S').tolist()
+    files = snapGroups['file'].first().tolist()
+    instNumbers = snaps.reset_index('INSTANCE_NUMBER')['INSTANCE_NUMBER'].groupby(level=['DBID', 'SNAP_ID']).first().tolist()
+
+    # Database names of the newest instance startup (host and instance names only for single instance databases)
+    names = {}
+    if 'DBA_HIST_DATABASE_INSTANCE' in views:
+        dbInst = views['DBA_HIST_DATABASE_INSTANCE']
+        if 'STARTUP_TIME' in dbInst.columns:
+            dbInst = dbInst.assign(STARTUP_TIME=pandas.to_datetime(dbInst['STARTUP_TIME'], errors='coerce')).sort_values('STARTUP_TIME')
+        dbInst = dbInst.drop_duplicates(['DBID', 'INSTANCE_NUMBER'], keep='last')
+        for dbid, group in dbInst.groupby('DBID'):
+            row = group.iloc[-1]
+            names[dbid] = {key: row[col] for col, key in [('DB_NAME', 'db_name'), ('VERSION', 'db_release'), ('PLATFORM_NAME', 'platform')] if col in group.columns}
+            if len(group) == 1:
+                names[dbid].update({key: row[col] for col, key in [('INSTANCE_NAME', 'db_inst_name'), ('HOST_NAME', 'host_name')] if col in group.columns})
+
+    records = []
+    for (dbid, snapId), values, begin, end, file, instNumber in zip(snapshot.index.tolist(), snapshot.to_dict('records'), begins, ends, files, instNumbers):
+        record = {'filename': '%s (snap %s)' % (file, snapId), 'parent': 'none', 'status': 'PASSED'}
+        record.update({key: value for key, value in names.get(dbid, {}).items() if isinstance(value, str)})
+        record['db_id'] = str(dbid)
+        record['db_rac'] = 'YES' if values['db_inst_num'] > 1 else 'NO'
+        record['db_type'] = 'RAC' if values['db_inst_num'] > 1 else 'SI'
+        if values['db_inst_num'] == 1:
+            record['db_inst_id'] = int(instNumber)
+        if isinstance(begin, str):
+            record['db_snap_begin_time'] = begin
+            record['db_snap_end_time'] = end
+        record.update({key: value for key, value in values.items() if not isNaN(value)})
+        for key in ('host_cpu_num', 'db_inst_num'):
+            if key in record:
+                record[key] = int(record[key])
+        try:
+            if inputData.get('rvIndex') is not None and 'host_name' in record:
+                run_RVT(record, record['host_name'], inputData['rvIndex'])
+            if inputData.get('dbSize') is not None and 'db_name' in record:
+                run_DBS(record, inputData['dbSize'])
+            run_globalCalculations(record, [])
+        except Exception:
+            print(traceback.format_exc())
+        record['instances'] = []
+        records.append(record)
+    print('DBA_HIST extracts:', len(records), 'database snapshots of', len(set(snapshot.index.get_level_values('DBID'))), 'databases')
+    return records
+"""
+End of RunHIST.py script
+"""
+"""
 Begin of AddCalculations.py script for functions regarding report analysis post calculations
 """
+import numpy
 #from HelperFunctions import *
 #from ConfigQueryArrays import *
 
@@ -1788,41 +3665,37 @@ def run_globalCalculations(global_res_dict, racinst_res_dict):
     '''
     # Calculate RAC global values based on instance values
     if len(racinst_res_dict) > 0:
+        # columns found in any instance dict with numeric values in all instances having the column
+        # (a string fallback of a failed numeric conversion skips the column): [col, instance count, integer values]
+        columns = []
         for col in instance_column_calculations:
             # if col[0] == 'db_id':  # for debugging
             #     print(col[0])
-            cnt = 0; sum = 0; avg = 0; colFound = False; valValid = True
-
-            # summarize instance values
-            for instance in racinst_res_dict:
-                # print('instance='+ str(instance)) # for debugging
-                # message = 'instance: ' + str(instance['db_inst_id']) + ' column: ' + str(col) # for debugging
-                if col[0] in instance and valValid:  # check if column exist in dict
-                    # message = 'instance: ' + str(instance['db_inst_id']) + ' column: ' + str(col) + ' value: ' + str(instance[col[0]]) # for debugging
-                    # print(message)  # for debugging
-                    colFound = True
-                    cnt += 1
-                    if col[0] == 'n.a.' or isNaN(string_to_float(instance[col[0]])):
-                        valValid = False
-                        sum = 0
-                        break
-                    sum += instance[col[0]]
-                # print(message)  # for debugging
-
+            values = [instance[col[0]] for instance in racinst_res_dict if col[0] in instance]
+            if values and all(value == value if isinstance(value, (int, float)) else not isNaN(string_to_float(value)) for value in values):
+                columns.append([col, len(values), all(isinstance(value, int) for value in values)])
+
+        # instance x metric matrix (0 for values not available in an instance) reduced over the instances:
+        # a reduction over the first axis adds the rows in instance order (same rounding as summarizing instance by instance)
+        matrix = numpy.array([[instance.get(col[0], 0) for col, cnt, ints in columns] for instance in racinst_res_dict], dtype=float)
+        totals = matrix.sum(axis=0).tolist()
+
+        for (col, cnt, ints), total in zip(columns, totals):
+            if ints:
+                total = int(total)
             # global value aggregation (sum or avg)
-            if colFound and valValid:
-                if col[1] == 'sum':
-                    sum = round_up(sum,col[2])
-                    if col[2] == 0: sum = int(sum)
-                    # global_res_dict[col[0]] = str(sum)
-                    global_res_dict[col[0]] = sum
-                else:
-                    # avg = sum / len(racinst_res_dict)
-                    avg = sum / cnt
-                    avg = round_up(avg,col[2])
-                    if col[2] == 0: avg = int(avg)
-                    # global_res_dict[col[0]] = str(avg)
-                    global_res_dict[col[0]] = avg
+            if col[1] == 'sum':
+                total = round_up(total,col[2])
+                if col[2] == 0: total = int(total)
+                # global_res_dict[col[0]] = str(total)
+                global_res_dict[col[0]] = total
+            else:
+                # avg = total / len(racinst_res_dict)
+                avg = total / cnt
+                avg = round_up(avg,col[2])
+                if col[2] == 0: avg = int(avg)
+                # global_res_dict[col[0]] = str(avg)
+                global_res_dict[col[0]] = avg
 
     # Calcualte NonRAC and RAC global values based on other global values
     calc_dbCpuUsage(global_res_dict, 'n.a.')
@@ -1835,6 +3708,267 @@ def run_globalCalculations(global_res_dict, racinst_res_dict):
 End of AddCalculations.py script
 """
 """
+Begin of ParseCache.py script for functions regarding the persistent report analysis cache
+"""
+import hashlib
+import pickle
+import sqlite3
+import time
+
+#from ConfigQueryArrays import *
+#from ConfigSqlArrays import *
+
+############ Report analysis cache ##############
+
+'''
+Content addressed cache for report analysis results (see analyze_report)
+- key:   SHA-256 of the report file bytes + version hash of the analysis settings, configuration and code
+- value: global report record, RAC instance records and AWR RAC report flag (pickled)
+Entries are stored in a SQLite database file and evicted least recently used if the
+size of all entries exceeds parseCacheSize. Report re-runs (e.g. for another cloud) skip parsing.
+'''
+parseCacheVersion = None    # version hash (see parse_cache_version)
+
+def parse_cache_version():
+    '''
+    Version hash of the query and SQL pattern arrays and the analysis code (changes invalidate all entries)
+    and of the analysis settings sqlSource and sqlCountMode (may change at runtime, so not part of parseCacheVersion)
+    '''
+    global parseCacheVersion
+    if parseCacheVersion is None:
+        version = hashlib.sha256()
+        for config in [queries_STD, queries_RAC, queries_RAC_Instance, instance_column_calculations,
+                       sql_pattern_search_text, sql_pattern_search_dbms, sql_pattern_search_modules, sql_pattern_search_features]:
+            version.update(repr(config).encode('utf8'))
+        try:
+            with open(__file__, 'rb') as f:
+                version.update(f.read())
+        except (NameError, OSError):
+            pass
+        parseCacheVersion = version.hexdigest()
+    return hashlib.sha256(repr([parseCacheVersion, sqlSource, sqlCountMode]).encode('utf8')).hexdigest()
+
+def parse_cache_key(fileBytes, fileName):
+    '''
+    Cache key of a report file (report type depends on the file name extension)
+    <fileBytes> is the report file content or the report file path (hashed in chunks of streamChunkSize)
+    '''
+    if isinstance(fileBytes, (bytes, bytearray)):
+        key = hashlib.sha256(fileBytes)
+    else:
+        key = hashlib.sha256()
+        with open(fileBytes, 'rb') as f:
+            for chunk in iter(lambda: f.read(streamChunkSize), b''):
+                key.update(chunk)
+    key.update(os.path.splitext(fileName)[1].lower().encode('utf8'))
+    return key.hexdigest() + '-' + parse_cache_version()[:16]
+
+def parse_cache_connect(cacheFile):
+    ''' Open (and create) the cache database '''
+    if os.path.dirname(cacheFile):
+        os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+    con = sqlite3.connect(cacheFile, timeout=30)
+    con.execute('CREATE TABLE IF NOT EXISTS parse_cache (key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)')
+    return con
+
+def parse_cache_get(cacheKey, cacheFile=None):
+    ''' Get the cached report analysis result for <cacheKey> (None if not cached) '''
+    cacheFile = cacheFile or parseCacheFile
+    if cacheKey is None or not cacheFile:
+        return None
+    try:
+        con = parse_cache_connect(cacheFile)
+        with con:
+            row = con.execute('SELECT value FROM parse_cache WHERE key = ?', (cacheKey,)).fetchone()
+            if row is not None:
+                con.execute('UPDATE parse_cache SET accessed = ? WHERE key = ?', (time.time(), cacheKey))
+        con.close()
+        return pickle.loads(row[0]) if row is not None else None
+    except Exception as e:
+        print('Parse cache not available:', e)
+        return None
+
+def parse_cache_put(cacheKey, value, cacheFile=None, cacheSize=None):
+    ''' Store a report analysis result and evict least recently used entries above <cacheSize> bytes '''
+    cacheFile = cacheFile or parseCacheFile
+    cacheSize = cacheSize or parseCacheSize
+    if cacheKey is None or not cacheFile:
+        return
+    try:
+        data = pickle.dumps(value)
+        con = parse_cache_connect(cacheFile)
+        with con:
+            con.execute('INSERT OR REPLACE INTO parse_cache VALUES (?, ?, ?, ?)', (cacheKey, data, len(data), time.time()))
+            total = con.execute('SELECT SUM(size) FROM parse_cache').fetchone()[0] or 0
+            for key, size in con.execute('SELECT key, size FROM parse_cache ORDER BY accessed').fetchall():
+                if total <= cacheSize:
+                    break
+                con.execute('DELETE FROM parse_cache WHERE key = ?', (key,))
+                total -= size
+        con.close()
+    except Exception as e:
+        print('Parse cache not available:', e)
+"""
+End of ParseCache.py script
+"""
+"""
+Begin of SizingFastPath.py script for the regex only analysis of the AWR sizing metrics
+"""
+from html import unescape
+import re
+
+############ Sizing metrics fast path ############
+
+# Output columns of the sizing only analysis (see parse_sizing): report values used for the VM sizing
+sizingColumns = [
+    'db_name', 'db_id', 'elapsed_time_min', 'db_time_min', 'host_cpu_num', 'host_memory_mb', 'db_sga_usage_mb', 'db_pga_usage_mb',
+    'db_physical_read_total_io_ps', 'db_physical_write_total_io_ps', 'db_physical_read_total_mbps', 'db_physical_write_total_mbps',
+]
+
+# AWR single instance report queries of the sizing columns (see queries_STD)
+sizingQueries = [query for query in compile_queries(queries_STD) if query[2] in sizingColumns]
+
+# Compiled regexes for the raw html report content
+sizingH1Regex = re.compile(r'<h1\b[^>]*>([^<]*)</h1', re.IGNORECASE)
+sizingTableRegex = re.compile(r'<table\b([^>]*)>(.*?)</table\s*>', re.IGNORECASE | re.DOTALL)
+sizingTrRegex = re.compile(r'<tr\b[^>]*>', re.IGNORECASE)
+sizingThRegex = re.compile(r'<th\b([^>]*)>(.*?)</th\s*>', re.IGNORECASE | re.DOTALL)
+sizingTdRegex = re.compile(r'<td\b[^>]*>(.*?)</td\s*>', re.IGNORECASE | re.DOTALL)
+sizingCellRegex = re.compile(r'<t[dh]\b', re.IGNORECASE)
+sizingTagRegex = re.compile(r'<[^>]*>')
+sizingNumberRegex = re.compile(numberFormat)
+
+def regex_table(attrs, content):
+    '''
+    Table record of the raw html content of a table like soup_table_record ('summary', 'header', 'rows', 'strings')
+    Returns None for tables not plain enough for a regex read (nested tables, unclosed cells or cells with nested tags)
+    '''
+    if re.search(r'<table\b', content, re.IGNORECASE):
+        return None
+    header = []; rows = []; cellNum = 0
+    for attr, cell in sizingThRegex.findall(content):
+        if '<' in cell:
+            return None
+        header.append([unescape(cell), 'colspan' in attr.lower()])
+    for row in sizingTrRegex.split(content)[1:]:
+        cells = sizingTdRegex.findall(row)
+        if any('<' in cell for cell in cells):
+            return None
+        rows.append([unescape(cell) for cell in cells])
+        cellNum += len(cells) + len(sizingThRegex.findall(row))
+    if cellNum != len(sizingCellRegex.findall(content)):
+        return None
+    summary = re.search(r'summary\s*=\s*"([^"]*)"', attrs, re.IGNORECASE)
+    return {
+        'summary': unescape(summary.group(1)) if summary else None,
+        'header': header,
+        'rows': rows,
+        'strings': [unescape(string) for string in sizingTagRegex.split(content) if string],
+    }
+
+def regex_lookup(tables, row_name, col_name, table_pos=None):
+    '''
+    Raw value of an AWR query [row_name, col_name] from the raw html tables <tables> ([attributes, content, record])
+    with the lookup rules of get_info_position: first table with a th cell starting with <col_name> which contains
+    both names as text, first row with a label in the first 3 columns starting with <row_name> (first data row for '')
+    Returns None if the value can't be read confidently (not found or table not plain enough, see regex_table)
+    '''
+    colRegex = get_regex(col_name)
+    rowRegex = get_regex(row_name)
+    for pos, table in enumerate(tables):
+        if table_pos is not None and pos != table_pos:
+            continue
+        if not colRegex.search(table[1]):
+            continue
+        if table[2] is False:
+            table[2] = regex_table(table[0], table[1])
+        record = table[2]
+        if record is None:
+            return None
+        if not any(header[0] and colRegex.match(header[0]) for header in record['header']):
+            continue
+        if row_name != '' and not any(rowRegex.search(string) for string in record['strings']):
+            continue
+        if not any(colRegex.search(string) for string in record['strings']):
+            continue
+        if record['summary'] is not None and record['summary'].startswith('SQL ordered by Offload Eligible Bytes'):
+            continue
+        position = regex_row_position(record, row_name, col_name)
+        if position is None or position[1] >= len(record['rows'][position[0]]):
+            return None
+        return record['rows'][position[0]][position[1]]
+    return None
+
+def regex_row_position(record, row_name, col_name):
+    ''' Cell position [row, column] of a table record like get_value_position (None if not found) '''
+    col_idx = get_column_index(record, col_name)
+    if col_idx == -1:
+        return None
+    rowMatch = get_regex(row_name).match
+    for r, cells in enumerate(record['rows']):
+        if cells and (row_name == '' or any(label and rowMatch(label) for label in cells[:3])):
+            return [r, col_idx]
+    return None
+
+def regex_sizing_values(fileText):
+    '''
+    Sizing column values (see sizingColumns) of an AWR single instance report read from the raw html by compiled regexes
+    Each value is the value of the same query run (see run): a column query has to hit with its first lookup,
+    numeric values have to be plain numbers. Returns {<column>: <value>} of the values read confidently.
+    '''
+    h1Regex = re.compile("WORKLOAD REPOSITORY .*REPORT", re.IGNORECASE)
+    h1 = next((h1 for h1 in sizingH1Regex.finditer(fileText) if h1Regex.search(h1.group(1))), None)
+    if h1 is None:
+        return {}
+    tables = [[attrs, content, False] for attrs, content in sizingTableRegex.findall(fileText, h1.end())]
+
+    # RAC databases are analyzed with the full parser (RAC status checks, see run_AWR)
+    RAC = regex_lookup(tables, '', 'RAC', table_pos=0)
+    if RAC is None or RAC.strip().upper() == 'YES':
+        return {}
+
+    values = {}
+    for query in sizingQueries:
+        if query[2] in values:
+            continue
+        raw = regex_lookup(tables, query[0], query[1])
+        info = fix_awr_values(query[0], query[1], raw, query[2]) if raw is not None else None
+        if not info:
+            # first query of the column missed: the values of further queries are left to the full parser
+            values[query[2]] = None
+        elif query[3] == 'n':
+            values[query[2]] = round_up(string_to_float(info) / query[5], query[4]) if sizingNumberRegex.match(info.strip()) else None
+        else:
+            values[query[2]] = str(info).strip()
+    return {column: value for column, value in values.items() if value is not None}
+
+def parse_sizing(path, parser=None, cacheFile=None):
+    '''
+    Sizing only analysis of one AWR report (see sizingColumns)
+    Values are read from the raw html by compiled regexes (AWR single instance reports, see regex_sizing_values).
+    The full report analysis (see parse_report) runs only for values not read confidently.
+    Returns the global report record with the sizing columns and key 'sources': {<column>: 'regex' | 'parser'}
+    '''
+    start = time.perf_counter()
+    fileName = os.path.basename(path)
+    fileText = read_file(path)
+    kind, headDoc = sniff_report_kind(fileText[:reportSniffSize], fileName)
+    values = regex_sizing_values(fileText) if kind == 'awr' else {}
+    del fileText
+
+    if len(values) == len(sizingColumns):
+        record = {'filename': fileName.replace('\\', '/'), 'status': 'PASSED', 'instances': []}
+    else:
+        record = parse_report(path, parser=parser, cacheFile=cacheFile)
+    record['sources'] = {column: 'regex' if column in values else 'parser' for column in sizingColumns}
+    record.update(values)
+    print('Sizing analysis of %s: %d regex values, %d parser values (%.3fs)'
+          % (fileName, len(values), len(sizingColumns) - len(values), time.perf_counter() - start))
+    return record
+"""
+End of SizingFastPath.py script
+"""
+"""
 Begin of Main.py script used to parse data from AWR or Statspack Oracle db reports.
 Can run locally or on JS --> change in "params" section
 
@@ -1842,20 +3976,42 @@ Input: (supported report types and other input files):
     - AWR Basic (.html)
     - AWR RAC (.html)
     - Statspack Level 7 (.lst)
+    - DBA_HIST_SYSMETRIC_SUMMARY, DBA_HIST_OSSTAT, DBA_HIST_SYSSTAT (, DBA_HIST_SGA, DBA_HIST_DATABASE_INSTANCE) extracts (.csv, .parquet)
     - DB Size (.csv)
     - RV Tools (.csv)
 
 Ouput: Excel, CSV and JS pass with data from "sorted_output_columns" list
+       Parquet and Arrow IPC files, partitioned parquet dataset (see write_output)
 
-Requirements: pandas, beautifulsoup4, os, re, io, traceback
+Requirements: pandas, beautifulsoup4, os, re, io, traceback (pyarrow for columnar output)
 """
 ################### Main Code ####################
 
+import argparse
+from datetime import datetime
+import json
+import math
 import os, traceback
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import multiprocessing
+import multiprocessing.connection
 from io import StringIO
 import re
 import pandas # see https://pandas.pydata.org/docs/
 from functools import reduce
+# pyarrow is optional: only needed for columnar output files (see get_arrow_table)
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+# psutil is optional: only needed for the report RSS limit on systems without /proc (see process_rss_mb)
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 #from LocalExecParams import *
 #from ConfigCsvArrays import *
@@ -1865,29 +4021,7 @@ from functools import reduce
 #from RunLST import *
 #from AddCalculations import *
 
-########## Some basic checks and initializations ##########
-
-# Variables fileNames and fileTexts are passed by the calling module
-# Check if files exists
-if len(fileTexts) == 0:
-    print("Could not find any files!")
-    raise ValueError ("Could not find any files!")
-
-if debug:
-    print('Files: ',fileNames)  # array of names of all provided files
-    # print(fileTexts)          # array of content of all provided files
-
-# Some initializations
-vHost = -1    # RVTools_tabvHost.csv content
-vInfo = -1    # RVTools_tabvInfo.csv content
-dbSize = -1   # *-dbSize.csv content
-repCount = 0  # amount of uploaded and supported report files
-if not 'sqlSource' in vars(): sqlSource = 'sqlOrdered'
-# if not 'sqlSource' in vars(): sqlSource = 'sqlList'
-
-all_dfs = []
-dbSize_df = pandas.DataFrame()
-dbInCols = []; dbOutCols = []; dbSelCols = []
+########## Some basic initializations ##########
 
 # Get CSV column to XLS column mapping
 csv2xsl = reduce(
@@ -1915,187 +4049,340 @@ xlsSortedXlsCols = reduce(
     []
 )
 # Get selection and output columns for dbsize.csv file processing
+dbInCols = []; dbOutCols = []; dbSelCols = []
 for i in dbSizeCols:
     dbInCols.append(i[0])
     if i[1]:
         dbSelCols.append(i[0])
         dbOutCols.append(i[1])
 
-############# Get special file data if exists #############
+def read_file(path):
+    ''' Read the content of an input file (AWR, Statspack or csv file) '''
+    with open(path, 'r', encoding="utf8", errors='ignore') as f:
+        return f.read()
 
-for count, fileText in enumerate(fileTexts):
-    # Using pandas: https://pandas.pydata.org/docs/reference/api/pandas.read_csv.html?highlight=read_csv#pandas.read_csv
+def decode_file(fileBytes):
+    ''' Decode input file bytes like read_file does (utf8, universal newlines) '''
+    return fileBytes.decode('utf8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
 
-    ###### Get RV tools csv data if exists ######
+def write_debug_file(outFolder, name, content):
+    ''' Write debugging output file <name> into <outFolder> (local debugging only) '''
+    if outFolder is not None:
+        with open(os.path.join(outFolder, name), 'w') as f:
+            f.write(str(content).replace("'", '"'))
 
-    # only one RVTools_tabvHost.csv file supported
-    if fileNames[count] == "RVTools_tabvHost.csv" :
-        vHost = fileTexts[count] # read RVTools_tabvHost.csv content from fileTexts array
-        print("Found vHost file", fileNames[count])
-        vHost_csv = pandas.read_csv(StringIO(vHost), lineterminator='\n', sep=';', skip_blank_lines=True)  # removed dtype='str'
-        continue
+############# Get special file data if exists #############
 
-    # only one RVTools_tabvInfo.csv file supported
-    if fileNames[count] == "RVTools_tabvInfo.csv":
-        vInfo = fileTexts[count] # read RVTools_tabvInfo.csv content from fileTexts array
-        print("Found vInfo file", fileNames[count])
-        vInfo_csv = pandas.read_csv(StringIO(vInfo), lineterminator='\n', sep=';', skip_blank_lines=True)  # removed dtype='str'
-        continue
+def load_input_files(fileNames, fileTexts):
+    '''
+    Load special input files (RV tools and database size csv files) used for data mapping
+    Returns the input data dict passed to parse_report:
+    - 'rvIndex':    lookup index of all RV tools exports (see build_rvtools_index, None if not available)
+    - 'dbSize':     lookup index of all *-dbSize.csv files (see build_dbsize_index, None if not available)
+    - 'repCount':   amount of supported report files (including DBA_HIST extract files)
+    '''
+    inputData = {'rvIndex': None, 'dbSize': None, 'repCount': 0}
+    vHost = {}; vInfo = {}  # RV tools dataframes by export name (see rvtools_export)
+    dbSizeFrames = []       # database size dataframes of all *-dbSize.csv files
 
-    #### Get database size csv data if exists ###
+    for count, fileText in enumerate(fileTexts):
+        # Using pandas: https://pandas.pydata.org/docs/reference/api/pandas.read_csv.html?highlight=read_csv#pandas.read_csv
 
-    # multiple *-dbSize.csv files supported
-    if re.match(".*-dbSize.csv$", fileNames[count]):
-        print("Found dbSize file", fileNames[count])
-        dbSize = fileTexts[count]
-        try:
-            dbSize_csv = pandas.read_csv(StringIO(dbSize), lineterminator='\n', sep=';', skip_blank_lines=True, usecols=dbInCols)[dbInCols]  # used [dbInCols] to preserve column order
-        except:
-            print(traceback.format_exc())
-        # Concat data from all *-dbsize.csv files into one dbSize dataframe object
-        dbSize_df = pandas.concat([dbSize_df, dbSize_csv], ignore_index=True)
-        continue
+        ###### Get RV tools csv data if exists ######
 
-    #### Print message for unsupported files ###
+        # multiple RV tools exports supported: [<export>]RVTools_tabvHost.csv (only ESX host and rvHostCols columns used)
+        export = rvtools_export(fileNames[count], 'tabvHost')
+        if export is not None:
+            print("Found vHost file", fileNames[count])
+            vHost[export] = pandas.read_csv(StringIO(fileText), lineterminator='\n', sep=';', skip_blank_lines=True,  # removed dtype='str'
+                                            usecols=lambda col: col == rvHostCol or col in rvHostInCols)
+            continue
 
-    # Only AWR html files and Statspack lst files are suppoted, except for the other files processed above
-    if not fileNames[count].lower().endswith(('.lst', '.html')):
-        print('Skip unsupported file', fileNames[count])
-        continue
+        # multiple RV tools exports supported: [<export>]RVTools_tabvInfo.csv (only DNS name and ESX host columns used)
+        export = rvtools_export(fileNames[count], 'tabvInfo')
+        if export is not None:
+            print("Found vInfo file", fileNames[count])
+            vInfo[export] = pandas.read_csv(StringIO(fileText), lineterminator='\n', sep=';', skip_blank_lines=True,
+                                            usecols=lambda col: col in (rvDnsCol, rvHostCol))
+            continue
 
-    # increment the supported report files count
-    repCount += 1
+        #### Count DBA_HIST extract files (read by run_HIST) ###
 
-if repCount < 1:
-    raise ValueError ("Could not find any supported report files!")
+        if hist_view(fileNames[count]):
+            print("Found DBA_HIST extract file", fileNames[count])
+            inputData['repCount'] += 1
+            continue
 
-###### Run AWR/Statspack report analysis and data mapping from special files #####
+        #### Get database size csv data if exists ###
 
-# loop over every uploaded file content
-# except for spezial files and unsupported files
-for count, fileText in enumerate(fileTexts):
-    try:
-        # print('fileNames[count]', fileNames[count])
+        # multiple *-dbSize.csv files supported
+        if re.match(".*-dbSize.csv$", fileNames[count]):
+            print("Found dbSize file", fileNames[count])
+            try:
+                dbSize_csv = pandas.read_csv(StringIO(fileText), lineterminator='\n', sep=';', skip_blank_lines=True, usecols=dbInCols)[dbInCols]  # used [dbInCols] to preserve column order
+                dbSizeFrames.append(dbSize_csv)
+            except:
+                print(traceback.format_exc())
+            continue
 
-        # Only parse AWR '*.html' files and Statspack '*.lst' files
+        #### Print message for unsupported files ###
+
+        # Only AWR html files and Statspack lst files are suppoted, except for the other files processed above
         if not fileNames[count].lower().endswith(('.lst', '.html')):
+            print('Skip unsupported file', fileNames[count])
             continue
 
-        # Some initializations
-        print('--------------------------------------------------------------------------------')
-        print('Parse file', fileNames[count])
-        is_lst = fileNames[count][-4:] == ".lst" # current file is a Statspack output file
-        global_res_dict = {}
-        global_res_dict['filename'] = fileNames[count].replace('\\', '/')
-        global_res_dict['parent'] = 'none'
-        global_res_dict['status'] = ''
+        # increment the supported report files count
+        inputData['repCount'] += 1
 
-        # Run report analysis
-        if is_lst:
-            # Analyze NonRAC STATSPACK report
-            # RAC reports are currently not supported
-            lst_res, is_rac_db, is_rac_report, inst_total_num, inst_list = run_LST(fileText, fileNames[count])
-
-            # convert lst_res into common used res_dict for post analysis process steps
-            # actually only NonRAC supported for statspack reports
-            res_dict = []
-            keys = lst_res.keys()
-            for key in keys:
-              res_dict.append([0, '', '', lst_res[key], key])
-        else:
-            # Analyze RAC or NonRAC AWR report
-            # Parse html tables into a json formated text
-            awr_soup = get_soup(fileText)
-            # if debug:
-            #     print('- awr_soup.original_encoding -')
-            #     print('Detected encoding for file "' + str(fileNames[count]) + '": ',awr_soup.original_encoding)
+    # RV tools data of all exports is indexed once for the mapping of all reports
+    if vInfo and vHost:
+        inputData['rvIndex'] = build_rvtools_index(vInfo, vHost)
+    # Data of all *-dbsize.csv files is concatenated and indexed once
+    if dbSizeFrames:
+        inputData['dbSize'] = build_dbsize_index(dbSizeFrames)
+    return inputData
 
-            # Run awr report analysis
-            res_dict, is_rac_db, is_rac_report, inst_total_num, inst_list = run_AWR(awr_soup, global_res_dict, sqlSource)
+###### Run AWR/Statspack report analysis and data mapping from special files #####
 
-        # Skip further processing for unsupported Statspack or AWR report formats
-        if re.search('UNSUPPORTED', global_res_dict['status']):
-            all_dfs.append(global_res_dict)
-            continue
+# Analysis settings (module globals) which may be changed at runtime, e.g. by main. They are passed explicitly
+# to worker processes, which don't share changed module globals with the spawn and forkserver start methods.
+analysisSettingNames = ['sqlSource', 'sqlCountMode', 'sectionWorkers', 'sectionMinSize']
 
-        ##### Report analysis result post processing #####
+def get_analysis_settings():
+    ''' Current values of the analysis settings (see analysisSettingNames) '''
+    return {name: globals()[name] for name in analysisSettingNames}
 
-        if not is_rac_db:
-            global_res_dict['db_inst_id'] = 1
+def parse_report(path_or_bytes, fileName=None, inputData=None, parser=None, outFolder=None, cacheFile=None, profile=None, settings=None):
+    '''
+    Run the analysis of one AWR (*.html) or Statspack (*.lst) report
+    - path_or_bytes: report file path or report file content (bytes)
+    - fileName:      report file name (default: file name of the path or 'report.html' for report content)
+    - inputData:     RV tools and database size data used for data mapping (see load_input_files)
+    - parser:        AWR html parser backend (default: htmlParser)
+    - outFolder:     folder for debugging output files (local_dev and debug only)
+    - cacheFile:     report analysis cache file (default: parseCacheFile, False = no cache)
+    - profile:       record stage and query times in key 'profile' of the result (default: profileStages)
+    - settings:      analysis settings set in this process before the analysis (worker processes, see get_analysis_settings)
+    Returns the global report record (SI or RAC global level) as dict.
+    RAC instance records are returned as list of dicts in key 'instances' of the global report record.
+    The query plan lookup counts of the report analysis are returned in key 'query_stats' (see query_plan_counts).
+    A report failing the analysis returns {'filename': <fileName>, 'status': 'FAILED', 'instances': []}
+    '''
+    start = time.perf_counter()
+    if settings:
+        globals().update(settings)
+    if isinstance(path_or_bytes, (bytes, bytearray)):
+        fileBytes = bytes(path_or_bytes)
+        fileName = fileName or 'report.html'
+        head = fileBytes[:reportSniffSize]
+    else:
+        fileName = fileName or os.path.basename(path_or_bytes)
+        with open(path_or_bytes, 'rb') as f:
+            head = f.read(reportSniffSize)
+            fileBytes = None
+
+    # Skip unsupported report kinds (pdb/root level, diff and unknown reports) before reading/parsing the whole report
+    kind, headDoc = sniff_report_kind(decode_file(head), fileName)
+    if kind in unsupportedReportKinds:
+        print('--------------------------------------------------------------------------------')
+        print('Skip unsupported report', fileName, '(' + kind + ')')
+        return get_unsupported_record(kind, headDoc, fileName)
+    # The stream parser reads AWR report files in chunks (see get_stream_document): the report is not kept in memory
+    stream = fileBytes is None and (parser or htmlParser) == 'stream' and kind in ('awr', 'awr_rac')
+    if fileBytes is None and not stream:
+        with open(path_or_bytes, 'rb') as f:
+            fileBytes = f.read()
+
+    cacheKey = None
+    if cacheFile is not False and (cacheFile or parseCacheFile):
+        cacheKey = (cacheFile or parseCacheFile, parse_cache_key(path_or_bytes if stream else fileBytes, fileName))
+    if stream:
+        # same text as decode_file: utf8 ignoring errors with universal newlines
+        fileText = open(path_or_bytes, 'r', encoding='utf8', errors='ignore')
+    else:
+        # keep only the decoded report text during the analysis
+        fileText = decode_file(fileBytes)
+        del fileBytes
+    readTime = time.perf_counter() - start
+    planCounts = query_plan_counts()
+    try:
+        record = analyze_report(fileText, fileName, inputData, parser, outFolder, cacheKey, profile)
+    finally:
+        if stream:
+            fileText.close()
+    # lookup counts of this report only: query plans count the lookups of all reports analyzed in this process
+    queryStats = query_plan_counts_merge(query_plan_counts(), planCounts, -1)
+    queryStats = {key: plan for key, plan in queryStats.items() if plan['reports']}
+    if queryStats:
+        record['query_stats'] = queryStats
+    if 'profile' in record:
+        record['profile']['stages']['read'] = [1, readTime]
+    return record
+
+def run_report(fileText, fileName, parser, outFolder=None):
+    '''
+    Run the report analysis of one AWR or Statspack report content <fileText> (cached part of analyze_report)
+    Returns the global report record, the RAC instance records and the AWR RAC report flag
+    '''
+    # Some initializations
+    print('--------------------------------------------------------------------------------')
+    print('Parse file', fileName)
+    is_lst = fileName[-4:] == ".lst" # current file is a Statspack output file
+    global_res_dict = {}
+    global_res_dict['filename'] = fileName.replace('\\', '/')
+    global_res_dict['parent'] = 'none'
+    global_res_dict['status'] = ''
+
+    # Run report analysis
+    if is_lst:
+        # Analyze NonRAC STATSPACK report
+        # RAC reports are currently not supported
+        start = time.perf_counter()
+        lst_res, is_rac_db, is_rac_report, inst_total_num, inst_list = run_LST(fileText, fileName)
+        profile_add('stages', 'statspack', start)
+
+        # convert lst_res into common used res_dict for post analysis process steps
+        # actually only NonRAC supported for statspack reports
+        res_dict = []
+        keys = lst_res.keys()
+        for key in keys:
+          res_dict.append([0, '', '', lst_res[key], key])
+    else:
+        # Analyze RAC or NonRAC AWR report
+        # Parse html tables into a json formated text
+        start = time.perf_counter()
+        awr_doc = get_awr_document(fileText, parser, sqlSource)
+        profile_add('stages', 'document', start)
+        if debug:
+            print('Parsed file "' + str(fileName) + '" with parser', awr_doc['parser'])
 
-        # for local debugging
-        if local_dev and debug:
-            print('---------- res_dict ----------')
-            print(res_dict)
-            f = open(os.path.join(outFolder, 'res_dict.json'), 'w')
-            f.write(str(res_dict).replace("'", '"'))
+        # Run awr report analysis
+        res_dict, is_rac_db, is_rac_report, inst_total_num, inst_list = run_AWR(awr_doc, global_res_dict)
 
-            print('------ global_res_dict -------')
-            print(global_res_dict)
-            f = open(os.path.join(outFolder, 'global_res_dict.json'), 'w')
-            f.write(str(global_res_dict).replace("'", '"'))
+    # Skip further processing for unsupported Statspack or AWR report formats
+    if re.search('UNSUPPORTED', global_res_dict['status']):
+        return global_res_dict, [], False
 
-        # Prepare RAC instance records
-        # Create dict for all RAC instance results
-        # New CSV line for each RAC instance
-        inst_res_dict = []
-        inst_range = range(1, inst_total_num + 1)
-        inst_range_list = [x for x in list(inst_range)]
+    ##### Report analysis result post processing #####
 
-        # Push basic values for RAC instances into RAC instance dictionaries
-        if is_rac_report:
-            for instance in inst_range:
-                inst_res_dict.append({})
-                inst_res_dict[instance - 1]['status']     = ''
-                inst_res_dict[instance - 1]['db_inst_id'] = instance
-                inst_res_dict[instance - 1]['db_type']    = 'RACI'
-                inst_res_dict[instance - 1]['filename']   = fileNames[count].replace('\\', '/')
-                inst_res_dict[instance - 1]['parent']     = fileNames[count].replace('\\', '/')
-                inst_res_dict[instance - 1]['db_rac']     =  global_res_dict['db_rac']  # copy from RAC global dict
-
-        # Add global values (SI|RAC) to global record and instance values (RAC) to instance records
-        for entry in res_dict:
-            # each entry contains [lookup-row, lookup-column, lookup-result-value, result-key-name]
-            inst = entry[0]
-            row = entry[1]
-            col = entry[2]
-            res = entry[3]
-            key = entry[4]
-
-            if is_rac_report and inst in inst_range_list:
-                '''Push key/value to instance record (RAC) specific dict'''
-                inst_res_dict[inst - 1][key] = res
-            else:
-                # NonRAC or RAC with only one instance
-                '''Push key/value to the global record (SI|RAC)'''
-                global_res_dict[key] = res
-
-            # Duplicate some values from global RAC level record to instance RAC level records
-            matches = ['db_name', 'db_uname', 'db_edition', 'db_cdb','db_id']
-            if key in matches and inst_total_num > 1:
-                for instance in inst_range:
-                    inst_res_dict[instance - 1][key] =  res
-
-        # Set status to PASSED if not set already (not UNSUPPORTED or FAILED)
-        if len(global_res_dict['status']) == 0:
-            global_res_dict['status'] = 'PASSED'
-        # global_res_dict['status'] = ('PASSED ' + global_res_dict['status'].strip())
-        if is_rac_report:
+    if not is_rac_db:
+        global_res_dict['db_inst_id'] = 1
+
+    # for local debugging
+    if local_dev and debug:
+        print('---------- res_dict ----------')
+        print(res_dict)
+        write_debug_file(outFolder, 'res_dict.json', res_dict)
+
+        print('------ global_res_dict -------')
+        print(global_res_dict)
+        write_debug_file(outFolder, 'global_res_dict.json', global_res_dict)
+
+    # Prepare RAC instance records
+    # Create dict for all RAC instance results
+    # New CSV line for each RAC instance
+    inst_res_dict = []
+    inst_range = range(1, inst_total_num + 1)
+    inst_range_list = [x for x in list(inst_range)]
+
+    # Push basic values for RAC instances into RAC instance dictionaries
+    if is_rac_report:
+        for instance in inst_range:
+            inst_res_dict.append({})
+            inst_res_dict[instance - 1]['status']     = ''
+            inst_res_dict[instance - 1]['db_inst_id'] = instance
+            inst_res_dict[instance - 1]['db_type']    = 'RACI'
+            inst_res_dict[instance - 1]['filename']   = fileName.replace('\\', '/')
+            inst_res_dict[instance - 1]['parent']     = fileName.replace('\\', '/')
+            inst_res_dict[instance - 1]['db_rac']     =  global_res_dict['db_rac']  # copy from RAC global dict
+
+    # Add global values (SI|RAC) to global record and instance values (RAC) to instance records
+    for entry in res_dict:
+        # each entry contains [lookup-row, lookup-column, lookup-result-value, result-key-name]
+        inst = entry[0]
+        row = entry[1]
+        col = entry[2]
+        res = entry[3]
+        key = entry[4]
+
+        if is_rac_report and inst in inst_range_list:
+            '''Push key/value to instance record (RAC) specific dict'''
+            inst_res_dict[inst - 1][key] = res
+        else:
+            # NonRAC or RAC with only one instance
+            '''Push key/value to the global record (SI|RAC)'''
+            global_res_dict[key] = res
+
+        # Duplicate some values from global RAC level record to instance RAC level records
+        matches = ['db_name', 'db_uname', 'db_edition', 'db_cdb','db_id']
+        if key in matches and inst_total_num > 1:
             for instance in inst_range:
-                if len(inst_res_dict[instance - 1]['status']) == 0:
-                    if instance in inst_list:
-                        inst_res_dict[instance - 1]['status'] = 'PASSED'
-                    else:
-                        inst_res_dict[instance - 1]['status'] = 'FAILED (not in report)'
-                # if instance in inst_list:
-                #     inst_res_dict[instance - 1]['status'] = ('PASSED ' + inst_res_dict[instance - 1]['status'].strip())
-                # else:
-                #     inst_res_dict[instance - 1]['status'] = 'FAILED (not in report)'
+                inst_res_dict[instance - 1][key] =  res
+
+    # Set status to PASSED if not set already (not UNSUPPORTED or FAILED)
+    if len(global_res_dict['status']) == 0:
+        global_res_dict['status'] = 'PASSED'
+    # global_res_dict['status'] = ('PASSED ' + global_res_dict['status'].strip())
+    if is_rac_report:
+        for instance in inst_range:
+            if len(inst_res_dict[instance - 1]['status']) == 0:
+                if instance in inst_list:
+                    inst_res_dict[instance - 1]['status'] = 'PASSED'
+                else:
+                    inst_res_dict[instance - 1]['status'] = 'FAILED (not in report)'
+            # if instance in inst_list:
+            #     inst_res_dict[instance - 1]['status'] = ('PASSED ' + inst_res_dict[instance - 1]['status'].strip())
+            # else:
+            #     inst_res_dict[instance - 1]['status'] = 'FAILED (not in report)'
+
+    return global_res_dict, inst_res_dict, is_rac_report
+
+def analyze_report(fileText, fileName, inputData=None, parser=None, outFolder=None, cacheKey=None, profile=None):
+    '''
+    Run the analysis of one AWR or Statspack report content <fileText> (see parse_report)
+    (report text or, for the 'stream' parser, an AWR report text file object: see get_awr_document)
+    <cacheKey> is (cache file, key) of the report analysis cache or None (see parse_cache_key)
+    <profile> records the stage and query times in key 'profile' of the result (default: profileStages)
+    '''
+    profile_start(profileStages if profile is None else profile)
+    start = time.perf_counter()
+    if inputData is None:
+        inputData = {'rvIndex': None, 'dbSize': None}
+    if parser is None:
+        parser = htmlParser
+
+    try:
+        # Report analysis results are cached (see parse_cache_get), data mappings and calculations are not
+        stageStart = time.perf_counter()
+        cached = parse_cache_get(cacheKey[1], cacheKey[0]) if cacheKey else None
+        profile_add('stages', 'cache', stageStart)
+        if cached is not None:
+            print('--------------------------------------------------------------------------------')
+            print('Parse file', fileName, '(parse cache hit)')
+            global_res_dict, inst_res_dict, is_rac_report = cached
+            global_res_dict['filename'] = fileName.replace('\\', '/')
+            for inst in inst_res_dict:
+                inst['filename'] = fileName.replace('\\', '/')
+                inst['parent'] = fileName.replace('\\', '/')
+        else:
+            global_res_dict, inst_res_dict, is_rac_report = run_report(fileText, fileName, parser, outFolder)
+            if cacheKey:
+                stageStart = time.perf_counter()
+                parse_cache_put(cacheKey[1], (global_res_dict, inst_res_dict, is_rac_report), cacheKey[0])
+                profile_add('stages', 'cache', stageStart)
+
+        # Skip further processing for unsupported Statspack or AWR report formats
+        if re.search('UNSUPPORTED', global_res_dict['status']):
+            global_res_dict['instances'] = []
+            return profile_record(global_res_dict, start)
 
         ############### Map RV Tools data ################
 
-        if vInfo != -1 and vHost != -1:
-            # RVTools data mapping based on hostname
+        rvIndex = inputData.get('rvIndex')
+        stageStart = time.perf_counter()
+        if rvIndex is not None:
+            # RVTools data mapping based on hostname (see build_rvtools_index)
             try:
                 # for AWR RAC reports only
                 if is_rac_report:
@@ -2105,26 +4392,29 @@ for count, fileText in enumerate(fileTexts):
                     RVTools content have to be mapped to each instance record
                     '''
                     for inst in inst_res_dict:
-                        run_RVT(instance, inst['host_name'], vInfo_csv, vHost_csv)
+                        run_RVT(inst, inst.get('host_name'), rvIndex)
 
                 # for AWR NonRAC reports
                 else:
                     '''Check global level using global_res_dict'''
-                    run_RVT(global_res_dict, global_res_dict['host_name'], vInfo_csv, vHost_csv)
+                    run_RVT(global_res_dict, global_res_dict.get('host_name'), rvIndex)
             except:
                 print(traceback.format_exc())
+            profile_add('stages', 'rvtools', stageStart)
 
         ############# Map database size data #############
 
         # DB size data mapping based on dbname and dbuname
         # only for global_res_dict not for instances !
-        if dbSize != -1:
+        if inputData.get('dbSize') is not None:
             # Some or all? statspack reports doesn't support database name 'db_name'
             # So we can not map db size information for this reports.
+            stageStart = time.perf_counter()
             try:
-                run_DBS(global_res_dict, dbSize_df, dbSelCols, dbOutCols)
+                run_DBS(global_res_dict, inputData['dbSize'])
             except:
                 print(traceback.format_exc())
+            profile_add('stages', 'dbsize', stageStart)
 
         ######### Reduce single instance RAC dict ########
 
@@ -2142,57 +4432,606 @@ for count, fileText in enumerate(fileTexts):
 
         ########### Calculate additional values ##########
 
+        stageStart = time.perf_counter()
         run_instanceCalculations(inst_res_dict)
         run_globalCalculations(global_res_dict,inst_res_dict)
-
-        ############ Get the final result dict ###########
-
-        # Append "global_res_dict" and "inst_res_dict" to "all_dfs" dict
-        all_dfs.append(global_res_dict)
-        for i in inst_res_dict:
-            all_dfs.append(i)
+        profile_add('stages', 'calculations', stageStart)
 
     except Exception as e:
-        print("Error while processing this file: " + fileNames[count] + '\n' + '\nMoving on to next...\n')
+        print("Error while processing this file: " + fileName + '\n' + '\nMoving on to next...\n')
         print(traceback.format_exc())
-        all_dfs.append({'filename': fileNames[count].replace('\\', '/'), 'status': 'FAILED'})
-        continue
+        return profile_record({'filename': fileName.replace('\\', '/'), 'status': 'FAILED', 'instances': []}, start)
 
     # for debugging
     if local_dev and debug:
         print('------ global_res_dict -------')
         print(global_res_dict)
-        f = open(os.path.join(outFolder, 'global_res_dict.json'), 'w')
-        f.write(str(global_res_dict).replace("'", '"'))
+        write_debug_file(outFolder, 'global_res_dict.json', global_res_dict)
 
         print('----- inst_res_dict ------')
         print(inst_res_dict)
-        f = open(os.path.join(outFolder, 'inst_res_dict.json'), 'w')
-        f.write(str(inst_res_dict).replace("'", '"'))
+        write_debug_file(outFolder, 'inst_res_dict.json', inst_res_dict)
+
+    ############ Get the final result dict ###########
+
+    global_res_dict['instances'] = inst_res_dict
+    return profile_record(global_res_dict, start)
+
+def profile_record(record, start):
+    ''' Add the profile of the report analysis started at <start> to report record <record> (key 'profile', see profile_end) '''
+    profile_add('stages', 'total', start)
+    profile = profile_end()
+    if profile is not None:
+        record['profile'] = profile
+    return record
 
 ################# Prepare output #################
 
-# Add an unique id to each dict in all_dfs list
-# Fill none fields with empty string for excel
-id = 0
-for file in all_dfs:
-    # Add an unique id column
-    id += 1
-    file['id'] = id
-    # Fill none fields with empty string for excel
-    for parameter in csvSortedCsvCols:
-        if parameter not in file:
-            file[parameter] = ''    # mp: should empty values set to 'n.a.|null|not-found' ?
+def get_result_frame(all_dfs):
+    '''
+    Create the result dataframe from a list of report records (global and instance records)
+    Adds an unique id to each record and fills missing fields with empty strings for excel
+    Returns the dataframe in csv column order (see output_columns)
+    '''
+    id = 0
+    for file in all_dfs:
+        # Add an unique id column
+        id += 1
+        file['id'] = id
+        # Fill none fields with empty string for excel
+        for parameter in csvSortedCsvCols:
+            if parameter not in file:
+                file[parameter] = ''    # mp: should empty values set to 'n.a.|null|not-found' ?
+
+    df = pandas.DataFrame(all_dfs)      # read data into pandas framework
+    return df[csvSortedCsvCols]         # fetch data in sorted order using internal used field names
+
+# Estimated peak memory of a report analysis per byte of report file (measured with a 13 MB AWR report)
+# Statspack reports are read line by line (see run_LST)
+parserMemoryFactors = {'html.parser': 50, 'lxml': 48, 'lxml.html': 24, 'stream': 3, 'lst': 3}
+
+def report_memory_estimate(path, parser):
+    ''' Estimated peak memory in MB for the analysis of report file <path> using AWR html parser backend <parser> '''
+    kind = 'lst' if path.lower().endswith('.lst') else parser
+    return os.path.getsize(path) * parserMemoryFactors.get(kind, parserMemoryFactors['html.parser']) / 1048576
+
+def report_parser(path, parser, memoryLimit):
+    '''
+    Return the AWR html parser backend for report file <path> within the memory ceiling <memoryLimit> (MB)
+    Reports too big for a html tree parser are analyzed with the 'stream' parser (same results, see compare_parsers)
+    '''
+    if memoryLimit and parser != 'stream' and report_memory_estimate(path, parser) > memoryLimit:
+        print('Report', os.path.basename(path), 'exceeds the memory limit of', memoryLimit, 'MB with parser', parser, '-> using parser stream')
+        return 'stream'
+    return parser
+
+watchdogPollInterval = 0.05    # seconds between the wall time and RSS checks of the running reports (see run_watchdog)
+
+def process_rss_mb(pid):
+    ''' Current RSS of process <pid> in MB (None if not available: no /proc file system and no psutil) '''
+    try:
+        with open('/proc/%d/statm' % pid) as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1048576
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss / 1048576
+        except psutil.Error:
+            pass
+    return None
+
+def watchdog_worker(conn, inputData, outFolder, cacheFile, profile, settings):
+    ''' Worker process of run_watchdog: analyze the reports [path, parser] received on <conn> until None is received '''
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        conn.send(parse_report(task[0], None, inputData, task[1], outFolder, cacheFile, profile, settings))
+
+def start_watchdog_worker(inputData, outFolder, cacheFile, profile, settings):
+    ''' Start a worker process of run_watchdog, returns the worker dict (position, start time and memory estimate of its report) '''
+    conn, workerConn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=watchdog_worker, args=(workerConn, inputData, outFolder, cacheFile, profile, settings), daemon=True)
+    process.start()
+    workerConn.close()
+    return {'process': process, 'conn': conn, 'pos': None, 'start': None, 'estimate': 0}
+
+def stop_watchdog_worker(worker):
+    ''' Stop a worker process of run_watchdog (idle workers end normally, busy workers are killed) '''
+    if worker['pos'] is None and worker['process'].is_alive():
+        try:
+            worker['conn'].send(None)
+            worker['process'].join(1)
+        except OSError:
+            pass
+    if worker['process'].is_alive():
+        worker['process'].kill()
+    worker['process'].join()
+    worker['conn'].close()
+
+def run_watchdog(reports, inputData, parser, outFolder, workers, cacheFile, memoryLimit, profile, timeLimit, rssLimit, settings=None):
+    '''
+    Run the analysis of the report files <reports> in <workers> isolated worker processes (see parse_batch)
+    Each report is analyzed within the wall time limit <timeLimit> (seconds) and the RSS limit <rssLimit> (MB)
+    of its worker process (0 = no limit). A worker exceeding a limit is killed and replaced by a new worker,
+    its report gets the status 'FAILED (timeout)' or 'FAILED (memory)'; the other reports are not affected.
+    <settings> analysis settings of the worker processes (default: settings of this process, see get_analysis_settings)
+    Returns the report records in the order of <reports>
+    '''
+    if settings is None:
+        settings = get_analysis_settings()
+    results = [None] * len(reports)
+    pool = [start_watchdog_worker(inputData, outFolder, cacheFile, profile, settings) for _ in range(workers)]
+    nextReport = 0
+    try:
+        while nextReport < len(reports) or any(worker['pos'] is not None for worker in pool):
+            # start reports on idle workers while the memory estimates fit into the memory ceiling
+            for worker in pool:
+                if nextReport >= len(reports):
+                    break
+                if worker['pos'] is not None:
+                    continue
+                path = reports[nextReport]
+                reportParser = report_parser(path, parser, memoryLimit)
+                estimate = report_memory_estimate(path, reportParser) if memoryLimit else 0
+                running = [w['estimate'] for w in pool if w['pos'] is not None]
+                if running and sum(running) + estimate > memoryLimit:
+                    break
+                worker['conn'].send([path, reportParser])
+                worker.update({'pos': nextReport, 'start': time.perf_counter(), 'estimate': estimate})
+                nextReport += 1
+
+            ready = multiprocessing.connection.wait([w['conn'] for w in pool if w['pos'] is not None], timeout=watchdogPollInterval)
+            for count, worker in enumerate(pool):
+                if worker['pos'] is None:
+                    continue
+                fileName = os.path.basename(reports[worker['pos']])
+                if worker['conn'] in ready:
+                    try:
+                        results[worker['pos']] = worker['conn'].recv()
+                        worker.update({'pos': None, 'start': None, 'estimate': 0})
+                        continue
+                    except EOFError:
+                        # worker process ended during the analysis, e.g. killed by the operating system
+                        status = 'FAILED'
+                        print("Error while processing this file: " + fileName + ' (worker process ended)\n' + '\nMoving on to next...\n')
+                elif timeLimit and time.perf_counter() - worker['start'] > timeLimit:
+                    status = 'FAILED (timeout)'
+                    print("Error while processing this file: " + fileName + ' (time limit of ' + str(timeLimit) + ' s exceeded)\n' + '\nMoving on to next...\n')
+                elif rssLimit and (process_rss_mb(worker['process'].pid) or 0) > rssLimit:
+                    status = 'FAILED (memory)'
+                    print("Error while processing this file: " + fileName + ' (RSS limit of ' + str(rssLimit) + ' MB exceeded)\n' + '\nMoving on to next...\n')
+                else:
+                    continue
+                # replace the worker of the failed report
+                results[worker['pos']] = {'filename': fileName.replace('\\', '/'), 'status': status, 'instances': []}
+                stop_watchdog_worker(worker)
+                pool[count] = start_watchdog_worker(inputData, outFolder, cacheFile, profile, settings)
+    finally:
+        for worker in pool:
+            stop_watchdog_worker(worker)
+    return results
+
+def parse_batch(paths, parser=None, outFolder=None, workers=None, cacheFile=None, memoryLimit=None, profile=None,
+                timeLimit=None, rssLimit=None):
+    '''
+    Run the analysis of all AWR (*.html) and Statspack (*.lst) reports and DBA_HIST extract files (see run_HIST) in <paths>
+    RV tools ([<export>]RVTools_tabvHost.csv, [<export>]RVTools_tabvInfo.csv) and database size (*-dbSize.csv) files in <paths>
+    are used for data mapping (see load_input_files).
+    <workers> parallel report analysis processes (default: batchWorkers, 0 = number of cpus)
+    <cacheFile> report analysis cache file (default: parseCacheFile, False = no cache)
+    <memoryLimit> memory ceiling in MB for all reports analyzed at the same time (default: batchMemoryLimit, 0 = no limit)
+    <profile> record the stage and query times of all reports in batchProfile (default: profileStages, see write_profile_json)
+    <timeLimit> wall time limit in seconds, <rssLimit> RSS limit in MB of the analysis of one report
+    (default: reportTimeLimit, reportRssLimit, 0 = no limit). With a limit, reports are analyzed in isolated worker processes
+    and reports exceeding a limit get the status 'FAILED (timeout)' or 'FAILED (memory)' (see run_watchdog).
+    Reports are read one by one during the analysis. Within the memory ceiling, parallel workers only start a report
+    if the memory estimates of all running reports fit (see report_memory_estimate).
+    Returns a dataframe with one row for each report and each RAC instance in csv column order
+    (ordered like <paths> also for parallel analysis), followed by one row for each database snapshot of the DBA_HIST extracts
+    '''
+    fileNames = [os.path.basename(path) for path in paths]
+
+    # Check if files exists
+    if len(fileNames) == 0:
+        print("Could not find any files!")
+        raise ValueError ("Could not find any files!")
+
+    if debug:
+        print('Files: ',fileNames)  # array of names of all provided files
+
+    # Only csv files are read here (one by one), report and DBA_HIST extract files are read by the analysis
+    fileTexts = (read_file(path) if path.lower().endswith('.csv') and not hist_view(path) else None for path in paths)
+    inputData = load_input_files(fileNames, fileTexts)
+    if inputData['repCount'] < 1:
+        raise ValueError ("Could not find any supported report files!")
+
+    # Only parse AWR '*.html' files and Statspack '*.lst' files
+    reports = [path for count, path in enumerate(paths) if fileNames[count].lower().endswith(('.lst', '.html'))]
+    histPaths = [path for count, path in enumerate(paths) if hist_view(fileNames[count])]
+
+    if parser is None:
+        parser = htmlParser     # passed explicitly, worker processes may not share changed module globals
+    settings = get_analysis_settings()
+    if cacheFile is None:
+        cacheFile = parseCacheFile or False
+    if workers is None:
+        workers = batchWorkers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(reports)))
+    if memoryLimit is None:
+        memoryLimit = batchMemoryLimit
+    if profile is None:
+        profile = profileStages
+    if timeLimit is None:
+        timeLimit = reportTimeLimit
+    if rssLimit is None:
+        rssLimit = reportRssLimit
+
+    # loop over every uploaded report file
+    # except for spezial files and unsupported files
+    results = [None] * len(reports)
+    if reports and (timeLimit or rssLimit):
+        print('Parse', len(reports), 'report files using', workers, 'isolated worker processes (time limit', timeLimit or '-', 's, RSS limit', rssLimit or '-', 'MB)')
+        results = run_watchdog(reports, inputData, parser, outFolder, workers, cacheFile, memoryLimit, profile, timeLimit, rssLimit, settings)
+    elif workers > 1:
+        print('Parse', len(reports), 'report files using', workers, 'worker processes')
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            running = {}    # future -> [report position, memory estimate]
+            nextReport = 0
+            while nextReport < len(reports) or running:
+                # start reports while workers are free and the memory estimates fit into the memory ceiling
+                while nextReport < len(reports) and len(running) < workers:
+                    path = reports[nextReport]
+                    reportParser = report_parser(path, parser, memoryLimit)
+                    estimate = report_memory_estimate(path, reportParser) if memoryLimit else 0
+                    if running and sum(r[1] for r in running.values()) + estimate > memoryLimit:
+                        break
+                    future = executor.submit(parse_report, path, None, inputData, reportParser, outFolder, cacheFile, profile, settings)
+                    running[future] = [nextReport, estimate]
+                    nextReport += 1
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                # collect results in report order (deterministic ids)
+                for future in done:
+                    pos = running.pop(future)[0]
+                    try:
+                        results[pos] = future.result()
+                    except Exception:
+                        # e.g. worker process killed: record the failed report and keep the batch running
+                        print("Error while processing this file: " + os.path.basename(reports[pos]) + '\n' + '\nMoving on to next...\n')
+                        print(traceback.format_exc())
+                        results[pos] = {'filename': os.path.basename(reports[pos]).replace('\\', '/'), 'status': 'FAILED', 'instances': []}
+    else:
+        for pos, path in enumerate(reports):
+            results[pos] = parse_report(path, None, inputData, report_parser(path, parser, memoryLimit), outFolder, cacheFile, profile)
+
+    # DBA_HIST extracts: one record for each database snapshot (analyzed together, see run_HIST)
+    if histPaths:
+        results.extend(run_HIST(histPaths, inputData))
+
+    # Batch profile: sum of all report profiles (see profile_merge)
+    # Batch query plan lookup counts: sum of the lookup counts of all reports (see query_plan_counts_merge)
+    global batchProfile, batchQueryStats
+    batchProfile = {'reports': [], 'workers': workers, 'stages': {}, 'queries': {}} if profile else None
+    batchQueryStats = {}
+
+    all_dfs = []
+    for report in results:
+        profiled = report.pop('profile', None)
+        if batchProfile is not None and profiled is not None:
+            batchProfile['reports'].append({'filename': report['filename'], 'stages': profiled['stages']})
+            profile_merge(batchProfile, profiled)
+        query_plan_counts_merge(batchQueryStats, report.pop('query_stats', {}))
+        all_dfs.append(report)
+        all_dfs.extend(report.pop('instances'))
+
+    print("----------- all_dfs ----------")
+    # print(all_dfs)
+    if local_dev and debug:
+        # Create all_dfs.json file (for debugging purpose)
+        write_debug_file(outFolder, 'all_dfs.json', all_dfs)
+
+    return get_result_frame(all_dfs)
+
+# Profile of the last batch (see parse_batch)
+batchProfile = None
+
+def get_profile_queries(profile):
+    ''' AWR query times of <profile> as list of [kind, release, row, column, key, calls, seconds] (slowest first) '''
+    return sorted([list(query) + entry for query, entry in profile['queries'].items()], key=lambda q: -q[6])
+
+def write_profile_json(profile, outFolder):
+    '''
+    Write the batch profile (see parse_batch) as <outFileBase>.profile.json next to the output files
+    Times are wall times in seconds summed over all reports (and worker processes)
+    '''
+    stages = sorted(profile['stages'].items(), key=lambda stage: -stage[1][1])
+    content = {
+        'reports': len(profile['reports']),
+        'workers': profile['workers'],
+        'stages': [{'stage': stage, 'calls': calls, 'seconds': round(seconds, 6)} for stage, (calls, seconds) in stages],
+        'queries': [{'kind': q[0], 'release': q[1], 'row': q[2], 'column': q[3], 'key': q[4], 'calls': q[5], 'seconds': round(q[6], 6)}
+                    for q in get_profile_queries(profile)],
+        'files': [{'filename': report['filename'],
+                   'stages': {stage: {'calls': calls, 'seconds': round(seconds, 6)} for stage, (calls, seconds) in report['stages'].items()}}
+                  for report in profile['reports']],
+    }
+    outFile = os.path.join(outFolder, outFileBase + ".profile.json")
+    with open(outFile, 'w') as f:
+        json.dump(content, f, indent=2)
+    return outFile
+
+def print_profile(profile, top=20):
+    ''' Print the stage times and the <top> slowest AWR queries of the batch profile (see parse_batch) '''
+    print('Profile of %d reports (%s worker processes)' % (len(profile['reports']), profile['workers']))
+    print('%-14s %8s %10s' % ('stage', 'calls', 'seconds'))
+    for stage, (calls, seconds) in sorted(profile['stages'].items(), key=lambda stage: -stage[1][1]):
+        print('%-14s %8d %10.4f' % (stage, calls, seconds))
+    print('%-4s %-8s %-36s %-24s %-32s %8s %10s' % ('kind', 'release', 'row', 'column', 'key', 'calls', 'seconds'))
+    for query in get_profile_queries(profile)[:top]:
+        print('%-4s %-8s %-36.36s %-24.24s %-32.32s %8d %10.4f' % tuple(query))
+
+########### Parser comparison harness ############
+
+compareTolerance = 1e-9     # relative (and absolute) tolerance of numeric value comparisons (see compare_values)
+# Analysis checks compared like candidate parsers (see compare_parsers):
+# - 'parse_sizing': sizing only analysis (see parse_sizing), compared over the sizing columns
+# - 'find_table':   table index lookups against the pre-index table scans (see compare_lookups)
+compareChecks = ['parse_sizing', 'find_table']
+
+def compare_values(refValue, candValue, tolerance=compareTolerance):
+    '''
+    Compare a reference and a candidate output column value
+    Numeric values (numbers or numeric strings, see string_to_float) are equal within <tolerance>,
+    all other values are compared as strings
+    '''
+    if str(refValue) == str(candValue):
+        return True
+    try:
+        refNum = float(refValue) if isinstance(refValue, (int, float)) else string_to_float(refValue)
+        candNum = float(candValue) if isinstance(candValue, (int, float)) else string_to_float(candValue)
+    except (ValueError, TypeError):
+        return False
+    if isNaN(refNum) or isNaN(candNum):
+        return isNaN(refNum) and isNaN(candNum)
+    return math.isclose(refNum, candNum, rel_tol=tolerance, abs_tol=tolerance)
+
+def compare_records(refRecord, candRecord, tolerance=compareTolerance, columns=None):
+    '''
+    Compare the output column values <columns> (default: all) of a reference and a candidate report record (see parse_report)
+    RAC instance records are compared by instance number (db_inst_id), missing values are empty values.
+    Returns the mismatches as list of [record ('global' | 'instance <n>'), column, reference value, candidate value]
+    '''
+    refInst = {inst.get('db_inst_id'): inst for inst in refRecord.get('instances', [])}
+    candInst = {inst.get('db_inst_id'): inst for inst in candRecord.get('instances', [])}
+    records = [['global', refRecord, candRecord]]
+    for inst in list(refInst) + [inst for inst in candInst if inst not in refInst]:
+        records.append(['instance %s' % inst, refInst.get(inst, {}), candInst.get(inst, {})])
+
+    mismatches = []
+    for name, ref, cand in records:
+        for column in columns or csvSortedCsvCols:
+            if not compare_values(ref.get(column, ''), cand.get(column, ''), tolerance):
+                mismatches.append([name, column, ref.get(column, ''), cand.get(column, '')])
+    return mismatches
+
+def report_group(record):
+    '''
+    Comparison group of a report record: "<release key> <report type>" (e.g. "19 AWR RAC", see release_key)
+    The release of RAC reports is an instance level value (release of the first instance)
+    '''
+    release = record.get('db_release')
+    for inst in record.get('instances', []):
+        release = release or inst.get('db_release')
+    return '%s AWR %s' % (release_key(release), record.get('db_type') or 'unknown')
+
+def legacy_find_table(tables, row_name="", col_name=""):
+    """ Find the table that contains the row that we are looking for (pre-index BeautifulSoup table scan, see find_table) """
+
+    for table in tables:
+        if row_name == "" or table.find_all(string=re.compile(row_name)):
+            # AWR 10.2.0.3.0 reports doesn't have table attributes 'summary'!
+            if table.has_attr('summary') and table.attrs['summary'].startswith('SQL ordered by Offload Eligible Bytes'):
+                continue
+            # Gives all tables contain column name
+            if table.find_all(string=re.compile(col_name)) or col_name == "":
+                # check correct column is there
+                for row in table.find_all('tr'):
+                    if any(re.match(col_name, elem.text) for elem in row.find_all('th')):
+                        return table
+    return
+
+def legacy_get_value(table, row_name='', col_name='', instid=0):
+    """ Parse the table and get the value of column <col_name> and row <row_name> (pre-index, see get_value) """
+
+    header = table.find_all(['th'])
+    rows = table.find_all(['tr'])
+    col_idx = -1
+
+    # get the column index for lookup column
+    for c, col in enumerate(header):
+        if col.string and re.match(col_name, col.string) and 'colspan' not in col.attrs: # ignore top level column names - only nested
+            col_idx = c
+            break
+
+    # Fixing indexing for RAC files (substract top level columns)
+    for col in header:
+        if 'colspan' in col.attrs:
+            col_idx -= 1
+
+    # Exit if column lookup failed
+    if col_idx == -1:
+        return ""
+
+    # Special handling for initialization/init.ora parameter table for rac databases
+    if instid > 0 and table.has_attr('summary') and re.search('.*init.* parameters.*', table.attrs['summary']):
+        for row in rows:
+            cells = row.find_all('td')
+            if cells and re.match(row_name, cells[0].string) and ( cells[1].string == '*' or cells[1].string == str(instid)):
+                return cells[col_idx].string
+        return ""
 
-df = pandas.DataFrame(all_dfs)      # read data into pandas framework
-dfcsv = df[csvSortedCsvCols]        # fetch data in sorted order using internal used field names
+    # All other table lookups
+    # looking for row value in first 3 columns and return col_idx column value
+    for row in rows:
+        cells = row.find_all('td')
+        if cells and (row_name == '' or any(cell.string and re.match(row_name, cell.string) for cell in cells[:3])):
+            return cells[col_idx].string
+    return ""
 
-print("----------- all_dfs ----------")
-# print(all_dfs)
+def legacy_get_info(tables, row_name, col_name, instid=0):
+    """ get desired entry based on col/row name (pre-index, see get_info) """
+
+    table = legacy_find_table(tables, row_name, col_name)
+    if table is None:
+        return
+    resultval = legacy_get_value(table, row_name=row_name, col_name=col_name, instid=instid)
+    return "" if resultval is None else resultval
+
+def compare_lookups(fileText, fileName='report.html'):
+    '''
+    Check the table index lookups (see find_table and get_instance_column) of an AWR report <fileText>
+    against the pre-index table scans of the BeautifulSoup html tables (see legacy_find_table)
+    for all lookups of the query plan of the report (see run)
+    Returns the mismatches as list of [record ('global' | 'instance <n>'), '<row> | <column>', index value, pre-index value]
+    '''
+    kind = sniff_report_kind(fileText[:reportSniffSize], fileName)[0]
+    if kind not in ('awr', 'awr_rac'):
+        return []
+    soup = get_soup(fileText)
+    awrDoc = get_soup_document(soup, 'SQL ordered by')
+    tables = get_tables(soup, 'report')
+    table_index = awrDoc['tables']
+    isRacReport = awrDoc['title'].find('RAC', 0, 150) != -1
+    plan = get_query_plan(isRacReport, get_report_release(table_index, isRacReport))
+
+    # [instance, row, column, instance matrix lookup] like the lookups of run
+    lookups = [[0, query[0], query[1], False] for query in plan['queries']]
+    inst_list = get_inst_list(table_index['tables'][1]) if isRacReport else []
+    for instance in inst_list:
+        lookups += [[instance, query[0] or str(instance), query[1], not query[0]] for query in plan['instanceQueries']]
+
+    mismatches = []
+    done = set()
+    instMatrix = {}; tableRows = {}
+    for instance, row, col, matrix in lookups:
+        if (instance, row, col) in done:
+            continue
+        done.add((instance, row, col))
+        if matrix:
+            if col not in instMatrix:
+                instMatrix[col] = get_instance_column(table_index, col, inst_list, tableRows)
+            value = instMatrix[col][instance]
+        else:
+            value = located_value(get_info_position(table_index, row, col, instance))
+        try:
+            legacy = legacy_get_info(tables, row, col, instance)
+        except (IndexError, TypeError) as e:
+            legacy = 'ERROR (%s)' % e
+        if str(value or '') != str(legacy or ''):
+            mismatches.append(['instance %s' % instance if instance else 'global', '%s | %s' % (row, col), value, legacy])
+    soup.decompose()
+    return mismatches
+
+def compare_parsers(paths, candidates=None, reference='html.parser', tolerance=compareTolerance):
+    '''
+    Differential comparison of AWR parser backends (see htmlParsers) over the AWR reports (*.html) of <paths>
+    Each report is analyzed (see analyze_report, without cache) with the <reference> parser and each candidate parser
+    (default: all other parser backends and the checks of compareChecks). All output column values are compared
+    (see compare_records), the sizing columns for 'parse_sizing' and the query lookups for 'find_table'.
+    Returns the comparison result:
+    - 'reports':    number of compared reports
+    - 'seconds':    analysis time by parser
+    - 'speedup':    reference analysis time / candidate analysis time by candidate parser
+    - 'groups':     by candidate parser and report group (see report_group): reports, mismatched reports, mismatches,
+                    reference and candidate seconds, speedup and mismatches by column
+    - 'mismatches': all mismatches (parser, filename, group, record, column, reference and candidate value)
+    '''
+    candidates = [parser for parser in (candidates or htmlParsers + compareChecks) if parser != reference]
+    result = {'reference': reference, 'candidates': candidates, 'tolerance': tolerance, 'reports': 0,
+              'seconds': {parser: 0.0 for parser in [reference] + candidates}, 'speedup': {},
+              'groups': {parser: {} for parser in candidates}, 'mismatches': []}
+
+    for path in paths:
+        if not path.lower().endswith('.html'):
+            continue
+        fileName = os.path.basename(path)
+        fileText = read_file(path)
+        records = {}; seconds = {}
+        for parser in [reference] + candidates:
+            start = time.perf_counter()
+            if parser == 'parse_sizing':
+                records[parser] = parse_sizing(path, parser=reference, cacheFile=False)
+            elif parser == 'find_table':
+                lookupMismatches = compare_lookups(fileText, fileName)
+            else:
+                records[parser] = analyze_report(fileText, fileName, parser=parser, profile=False)
+            seconds[parser] = time.perf_counter() - start
+            result['seconds'][parser] += seconds[parser]
+        result['reports'] += 1
+
+        group = report_group(records[reference])
+        for parser in candidates:
+            if parser == 'find_table':
+                mismatches = lookupMismatches
+            else:
+                mismatches = compare_records(records[reference], records[parser], tolerance,
+                                             sizingColumns if parser == 'parse_sizing' else None)
+            stats = result['groups'][parser].setdefault(group, {'reports': 0, 'mismatched reports': 0, 'mismatches': 0,
+                                                                'reference seconds': 0.0, 'seconds': 0.0, 'columns': {}})
+            stats['reports'] += 1
+            stats['mismatched reports'] += 1 if mismatches else 0
+            stats['mismatches'] += len(mismatches)
+            stats['reference seconds'] += seconds[reference]
+            stats['seconds'] += seconds[parser]
+            for record, column, refValue, candValue in mismatches:
+                stats['columns'][column] = stats['columns'].get(column, 0) + 1
+                result['mismatches'].append({'parser': parser, 'filename': fileName, 'group': group, 'record': record,
+                                             'column': column, 'reference': refValue, 'candidate': candValue})
+                print("MISMATCH %s [%s] %s %s: %s=%r %s=%r" % (fileName, parser, record, column, reference, refValue, parser, candValue))
+
+    for parser in candidates:
+        result['speedup'][parser] = result['seconds'][reference] / result['seconds'][parser] if result['seconds'][parser] else None
+        for stats in result['groups'][parser].values():
+            stats['speedup'] = stats['reference seconds'] / stats['seconds'] if stats['seconds'] else None
+    return result
+
+def compare_candidates(value):
+    ''' Comma separated candidate parsers and checks of the command line (see compare_parsers) '''
+    candidates = [candidate.strip() for candidate in value.split(',') if candidate.strip()]
+    for candidate in candidates:
+        if candidate not in htmlParsers + compareChecks:
+            raise argparse.ArgumentTypeError("invalid candidate '%s' (choose from %s)" % (candidate, ', '.join(htmlParsers + compareChecks)))
+    return candidates
+
+def print_compare_result(result):
+    ''' Print the mismatches and speedups of a parser comparison by candidate parser and report group (see compare_parsers) '''
+    print('--------------------------------------------------------------------------------')
+    print('Parser comparison of %d reports against %s (tolerance %g)' % (result['reports'], result['reference'], result['tolerance']))
+    print('%-12s %-16s %8s %11s %11s %9s  %s' % ('parser', 'group', 'reports', 'mismatched', 'mismatches', 'speedup', 'mismatched columns'))
+    for parser in result['candidates']:
+        for group, stats in sorted(result['groups'][parser].items()):
+            columns = ', '.join('%s (%d)' % column for column in sorted(stats['columns'].items(), key=lambda column: -column[1]))
+            print('%-12s %-16s %8d %11d %11d %9s  %s' % (parser, group, stats['reports'], stats['mismatched reports'], stats['mismatches'],
+                                                       '%.2f' % stats['speedup'] if stats['speedup'] else '-', columns))
+    for parser, seconds in result['seconds'].items():
+        speedup = result['speedup'].get(parser)
+        print("Total analysis time %-12s %8.3fs%s" % (parser, seconds, ' (speedup %.2f)' % speedup if speedup else ''))
+    print("Parser comparison finished with %d mismatches" % len(result['mismatches']))
+
+def write_compare_json(result, outFolder):
+    ''' Write the parser comparison result (see compare_parsers) as <outFileBase>.compare.json next to the output files '''
+    outFile = os.path.join(outFolder, outFileBase + ".compare.json")
+    with open(outFile, 'w') as f:
+        json.dump(result, f, indent=2, default=str)
+    return outFile
 
 ######## Prepare CSV & Excel for local dev #######
 
-if local_dev:
+def write_output_xlsx(dfcsv, outFolder):
+    ''' Write the result dataframe (see parse_batch) as <outFileBase>.xlsx using xls output column names and order '''
     if debug:
         print("---------- df.to_csv ---------")
         # print(dfcsv.to_csv(index=False, sep ='='))
@@ -2200,10 +5039,6 @@ if local_dev:
         print("------------- df -------------")
         print(dfcsv)
 
-        # Create all_dfs.json file (for debugging purpose)
-        f = open(os.path.join(outFolder, 'all_dfs.json'), 'w')
-        f.write(str(all_dfs).replace("'", '"'))
-
     # Create csv file using defined csv output column names
     # dfcsv.to_csv(os.path.join(outFolder, outFileBase + ".csv"), index=False, sep =';')
 
@@ -2211,14 +5046,103 @@ if local_dev:
     # dfcsv.to_json(os.path.join(outFolder, outFileBase + ".json"), orient="records")
 
     # Create xlsx file using defined xls output column names
-    dfxls = df.copy()
+    dfxls = dfcsv.copy()
     dfxls = dfxls[xlsSortedCsvCols]
     # Rename column names from internal used (csv) field names to xlsx output column names
     # df.set_axis([csv_output_cols], axis='columns', inplace=True)
     # df.set_axis seams to be buggy. First column starts at second column position if using df.to_excel.
     # So we are using df.rename instead of df.set_axis
     dfxls.rename(columns=csv2xsl, inplace=True, errors="raise")
-    dfxls.to_excel(os.path.join(outFolder, outFileBase + ".xlsx"), sheet_name="output", index=False, header=True)
+    outFile = os.path.join(outFolder, outFileBase + ".xlsx")
+    dfxls.to_excel(outFile, sheet_name="output", index=False, header=True)
+    return outFile
+
+def output_number(value, column):
+    ''' Numeric output column value as float (None for empty values, see outputNumericCols) '''
+    if value is None or value == '' or isNaN(value):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        value = string_to_float(value)
+        return None if isNaN(value) else value
+    except:
+        print("Non numeric value '%s' of column %s written as null value to columnar output" % (value, column))
+        return None
+
+def get_arrow_table(dfcsv):
+    '''
+    Return the result dataframe (see parse_batch) as pyarrow Table in csv column order (see output_columns)
+    Numeric columns (see outputNumericCols) are float64 columns, all other columns are string columns.
+    Used for the columnar output files and for in-process hand-off of the results (table.to_pandas()).
+    '''
+    if pyarrow is None:
+        raise ImportError('pyarrow is required for columnar output files (pip install pyarrow)')
+    arrays = []
+    for column in csvSortedCsvCols:
+        values = dfcsv[column].tolist()
+        if column in outputNumericCols:
+            arrays.append(pyarrow.array([output_number(value, column) for value in values], type=pyarrow.float64()))
+        else:
+            arrays.append(pyarrow.array([None if value is None or value == '' or isNaN(value) else str(value) for value in values], type=pyarrow.string()))
+    return pyarrow.Table.from_arrays(arrays, names=csvSortedCsvCols)
+
+def write_output_parquet(dfcsv, outFolder):
+    ''' Write the result dataframe (see parse_batch) as <outFileBase>.parquet (see get_arrow_table) '''
+    outFile = os.path.join(outFolder, outFileBase + ".parquet")
+    pyarrow.parquet.write_table(get_arrow_table(dfcsv), outFile)
+    return outFile
+
+def write_output_arrow(dfcsv, outFolder):
+    ''' Write the result dataframe (see parse_batch) as Arrow IPC file <outFileBase>.arrow (see get_arrow_table) '''
+    table = get_arrow_table(dfcsv)
+    outFile = os.path.join(outFolder, outFileBase + ".arrow")
+    with pyarrow.ipc.new_file(outFile, table.schema) as writer:
+        writer.write_table(table)
+    return outFile
+
+# Output file writers by output format (see outputFormats)
+outputWriters = {'xlsx': write_output_xlsx, 'parquet': write_output_parquet, 'arrow': write_output_arrow}
+
+def dataset_partitioning():
+    ''' Hive partitioning of the result dataset by batch id: <dataset folder>/batch=<batch id>/part-0.parquet '''
+    return pyarrow.dataset.partitioning(pyarrow.schema([('batch', pyarrow.string())]), flavor='hive')
+
+def append_output_dataset(dfcsv, datasetFolder, batch=None):
+    '''
+    Append the result dataframe (see parse_batch) as new partition <batch> to the parquet dataset <datasetFolder>
+    <batch> defaults to the current time (YYYYmmddTHHMMSSffffff); appending a batch id again replaces this batch.
+    The dataset can be read by read_output_dataset or any parquet dataset reader (PowerBI, pandas, duckdb, spark).
+    '''
+    table = get_arrow_table(dfcsv)
+    batch = batch or datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    table = table.append_column('batch', pyarrow.array([batch] * table.num_rows, type=pyarrow.string()))
+    pyarrow.dataset.write_dataset(table, datasetFolder, format='parquet', partitioning=dataset_partitioning(),
+                                  basename_template='part-{i}.parquet', existing_data_behavior='overwrite_or_ignore')
+    return os.path.join(datasetFolder, 'batch=' + batch)
+
+def read_output_dataset(datasetFolder, columns=None, batches=None):
+    '''
+    Read the result records of all batches (or the batch ids in <batches>) of the parquet dataset <datasetFolder>
+    Returns a pandas dataframe in csv column order with an additional column 'batch' (see append_output_dataset)
+    '''
+    if pyarrow is None:
+        raise ImportError('pyarrow is required for columnar output files (pip install pyarrow)')
+    dataset = pyarrow.dataset.dataset(datasetFolder, format='parquet', partitioning=dataset_partitioning())
+    filter = pyarrow.dataset.field('batch').isin(batches) if batches else None
+    return dataset.to_table(columns=columns, filter=filter).to_pandas()
+
+def write_output(dfcsv, outFolder, formats=None, datasetFolder=None):
+    '''
+    Write the result dataframe (see parse_batch) into output files of <formats> (default: outputFormats)
+    and append it to the parquet dataset <datasetFolder> (default: outputDataset, '' = disabled)
+    Returns the list of written files
+    '''
+    files = [outputWriters[format](dfcsv, outFolder) for format in (formats or outputFormats)]
+    datasetFolder = outputDataset if datasetFolder is None else datasetFolder
+    if datasetFolder:
+        files.append(append_output_dataset(dfcsv, datasetFolder))
+    return files
 
 # Return for JS (data for csv; header for xls header column name mapping)
 # Have to convert csv2xsl and xlsSortedXlsCols into valid json formated strings
@@ -2226,7 +5150,78 @@ if local_dev:
 # xlsSortedXlsCols = re.sub("\s*:\s*", ":", str(xlsSortedXlsCols)).replace("'",'"')
 # data = str(dfcsv.to_csv(index=False, sep ='='))
 # jsReturn = csv2xsl + '|' + xlsSortedXlsCols + '|' + data
-# """
-# End of Main.py script
-# """
-# jsReturn
+
+def main(argv=None):
+    ''' Command line interface: analyze all files of an input folder and write <outFileBase>.xlsx into the output folder '''
+    global htmlParser, sqlCountMode, sectionWorkers
+
+    argParser = argparse.ArgumentParser(description='Analyze AWR/Statspack reports and write ' + outFileBase + '.xlsx')
+    argParser.add_argument('inFolder', help='folder with AWR (*.html), Statspack (*.lst), RVTools and dbSize (*.csv) files')
+    argParser.add_argument('outFolder', help='output folder')
+    argParser.add_argument('--parser', default=htmlParser, choices=htmlParsers,
+                           help='AWR html parser backend (default: %(default)s)')
+    argParser.add_argument('--sql-count', default=sqlCountMode, choices=['occurrence', 'distinct'],
+                           help='SQL pattern/hint counts for each sql row or each distinct SQL Id (default: %(default)s)')
+    argParser.add_argument('--workers', type=int, default=batchWorkers,
+                           help='parallel report analysis processes, 0 = number of cpus (default: %(default)s)')
+    argParser.add_argument('--parse-cache', default=parseCacheFile, metavar='FILE',
+                           help='report analysis cache file (default: %(default)s)')
+    argParser.add_argument('--no-parse-cache', action='store_true', help='do not use the report analysis cache')
+    argParser.add_argument('--memory-limit', type=int, default=batchMemoryLimit, metavar='MB',
+                           help='memory ceiling for the report analysis in MB, 0 = no limit (default: %(default)s)')
+    argParser.add_argument('--time-limit', type=float, default=reportTimeLimit, metavar='S',
+                           help='wall time limit of the analysis of one report in seconds, 0 = no limit (default: %(default)s)')
+    argParser.add_argument('--rss-limit', type=int, default=reportRssLimit, metavar='MB',
+                           help='RSS limit of the process analyzing one report in MB, 0 = no limit (default: %(default)s)')
+    argParser.add_argument('--section-workers', type=int, default=sectionWorkers, metavar='N',
+                           help='parallel section parsing processes of AWR reports >= %d MB, 0 = disabled (default: %%(default)s)' % (sectionMinSize // 1048576))
+    argParser.add_argument('--format', action='append', choices=list(outputWriters), metavar='FORMAT',
+                           help='output file format %s, can be repeated (default: %s)' % ('|'.join(outputWriters), ' '.join(outputFormats)))
+    argParser.add_argument('--dataset', default=outputDataset, metavar='DIR',
+                           help='parquet dataset folder the results are appended to as new batch (default: %(default)s)')
+    argParser.add_argument('--profile', type=int, nargs='?', const=20, default=None, metavar='N',
+                           help='profile the analysis stages and AWR queries: write %s.profile.json and print the N slowest queries (default N: %%(const)s)' % outFileBase)
+    argParser.add_argument('--query-stats', action='store_true',
+                           help='print the lookup statistics of the AWR query plans by release (all reports of the batch)')
+    argParser.add_argument('--compare', action='store_true',
+                           help='compare the AWR report results of the candidate parser backends and checks against the reference parser, '
+                                'write %s.compare.json and exit' % outFileBase)
+    argParser.add_argument('--compare-parsers', type=compare_candidates, metavar='PARSER[,PARSER..]',
+                           help='comma separated candidates of --compare (implies --compare): %s (default: all)' % ', '.join(htmlParsers + compareChecks))
+    argParser.add_argument('--compare-reference', default='html.parser', choices=htmlParsers, metavar='PARSER',
+                           help='reference parser backend of --compare (default: %(default)s)')
+    argParser.add_argument('--compare-tolerance', type=float, default=compareTolerance, metavar='TOLERANCE',
+                           help='relative tolerance of numeric values of --compare (default: %(default)s)')
+    args = argParser.parse_args(argv)
+    htmlParser = args.parser
+    sqlCountMode = args.sql_count
+    sectionWorkers = args.section_workers
+
+    fileNames = os.listdir(args.inFolder)
+    paths = [os.path.join(args.inFolder, f) for f in fileNames]
+
+    # Parser comparison mode: no output file is written
+    if args.compare or args.compare_parsers is not None:
+        result = compare_parsers(sorted(paths), args.compare_parsers, args.compare_reference, args.compare_tolerance)
+        print_compare_result(result)
+        write_compare_json(result, args.outFolder)
+        return 1 if result['mismatches'] else 0
+
+    cacheFile = False if args.no_parse_cache else (args.parse_cache or False)
+    profile = profileStages or args.profile is not None
+    dfcsv = parse_batch(paths, outFolder=args.outFolder, workers=args.workers, cacheFile=cacheFile, memoryLimit=args.memory_limit, profile=profile,
+                        timeLimit=args.time_limit, rssLimit=args.rss_limit)
+    if local_dev:
+        write_output(dfcsv, args.outFolder, args.format, args.dataset)
+    if profile:
+        write_profile_json(batchProfile, args.outFolder)
+        print_profile(batchProfile, args.profile if args.profile is not None else 20)
+    if args.query_stats:
+        print_query_plan_stats()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+"""
+End of Main.py script
+"""
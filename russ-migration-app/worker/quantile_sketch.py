@@ -0,0 +1,76 @@
+"""
+Mergeable quantile sketch for streams of metric values (e.g. the sizing metrics of AWR snapshot series)
+
+Values are counted in logarithmic buckets (see DDSketch: https://arxiv.org/abs/1908.10693), so each quantile
+is returned within the relative accuracy of the sketch. The number of buckets is bounded (max_buckets),
+so the memory of a sketch stays constant whatever the number of values. Sketches with the same accuracy
+can be merged, e.g. the sketches of different report batches or worker processes.
+"""
+import math
+
+
+class QuantileSketch:
+    """Quantile sketch with relative accuracy <accuracy> and at most <max_buckets> buckets"""
+
+    def __init__(self, accuracy=0.01, max_buckets=2048):
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}       # bucket index -> count of values in (gamma^(index-1), gamma^index]
+        self.zeros = 0          # count of values <= 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Add <value> to the sketch"""
+        if value > 0:
+            index = math.ceil(math.log(value) / self.log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        else:
+            self.zeros += 1
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Add all values of sketch <other> (same accuracy) to this sketch"""
+        if other.gamma != self.gamma:
+            raise ValueError("Only sketches with the same accuracy can be merged")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zeros += other.zeros
+        self.count += other.count
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+        return self
+
+    def _collapse(self):
+        """Merge the lowest buckets into one (keeps the accuracy of the high quantiles used for sizing)"""
+        indexes = sorted(self.buckets)
+        excess = indexes[:len(indexes) - self.max_buckets + 1]
+        self.buckets[excess[-1]] = sum(self.buckets.pop(index) for index in excess[:-1]) + self.buckets[excess[-1]]
+
+    def quantile(self, q):
+        """Value of quantile <q> (0..1, 1 = exact maximum) by nearest rank, None for an empty sketch"""
+        if self.count == 0:
+            return None
+        if q >= 1:
+            return self.max
+        rank = max(math.ceil(q * self.count - 1e-9), 1)    # 1-based rank of the quantile value (numpy method 'inverted_cdf')
+        seen = self.zeros
+        if rank <= seen:
+            return 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank <= seen:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
@@ -3,15 +3,17 @@ import pandas as pd
 import re
 from pathlib import Path
 import shutil
-import subprocess
-import openpyxl
 from openpyxl import load_workbook
+import process_awr_reports
 
 # ---------------------------------------------------------------------
 BASE = Path(__file__).resolve().parent
 UPLOADS = BASE.parent / "uploads"
 OUTPUTS = BASE.parent / "outputs"
 TEMPLATE_XLSX = BASE.parent / "analysis_templates" / "analysis_template.xlsx"
+RESULTS_DATASET = OUTPUTS / "awr_results"  # parquet dataset with the results of all processed reports
+REPORT_TIME_LIMIT = 900     # wall time limit of the analysis of one report in seconds (see process_awr_reports.run_watchdog)
+REPORT_RSS_LIMIT = 4096     # RSS limit of the process analyzing one report in MB
 
 OUTPUTS.mkdir(exist_ok=True)
 
@@ -28,56 +30,53 @@ def extract_db_name(html_text):
 
 # ---------------------------------------------------------------------
 def regex_fallback_parser(html_file: Path):
-    """Improved fallback parser for single AWR HTML reports."""
-    text = html_file.read_text(errors="ignore")
-
-    def find(pat, multiplier=1):
-        m = re.search(pat, text, re.IGNORECASE)
-        return float(m.group(1).replace(",", "")) * multiplier if m else 0.0
-
-    sga_mb = find(r"SGA use\s*\(MB\)\s*[:=]?\s*([\d,\.]+)")
-    if not sga_mb:
-        sga_mb = find(r"SGA Target\s*\(GB\)\s*[:=]?\s*([\d,\.]+)", 1024)
-
-    pga_mb = find(r"PGA use\s*\(MB\)\s*[:=]?\s*([\d,\.]+)")
-    if not pga_mb:
-        pga_mb = find(r"PGA Aggregate Target\s*\(GB\)\s*[:=]?\s*([\d,\.]+)", 1024)
-
-    return {
-        "SGA_MB": sga_mb,
-        "PGA_MB": pga_mb,
-        "PHYS_READ_REQ": find(r"Physical read total IO requests\s*[:=]?\s*([\d,\.]+)"),
-        "PHYS_WRITE_REQ": find(r"Physical write total IO requests\s*[:=]?\s*([\d,\.]+)"),
-        "PHYS_READ_MB": find(r"Physical read total bytes\s*[:=]?\s*([\d,\.]+)", 1 / (1024 * 1024)),
-        "PHYS_WRITE_MB": find(r"Physical write total bytes\s*[:=]?\s*([\d,\.]+)", 1 / (1024 * 1024)),
-        "CPU": find(r"CPU Count\s*[:=]?\s*([\d,\.]+)"),
-        "MEMORY_GB": find(r"Memory\s*\(GB\)\s*[:=]?\s*([\d,\.]+)"),
-        "ELAPSED": find(r"Elapsed\s*\(min\)\s*[:=]?\s*([\d,\.]+)"),
-        "DBTIME": find(r"DB Time\s*\(min\)\s*[:=]?\s*([\d,\.]+)"),
-    }
+    """Sizing metrics of a single AWR HTML report read by compiled regexes over the raw HTML.
+
+    Metrics not found confidently are taken from the full report analysis (see process_awr_reports.parse_sizing),
+    key "SOURCES" tells which path ('regex' or 'parser') produced each metric.
+    """
+    record = process_awr_reports.parse_sizing(str(html_file))
+    for column in process_awr_reports.sizingColumns:
+        record.setdefault(column, "")
+    metrics = extract_metrics_from_result(record)
+    metrics["SOURCES"] = {metric: record["sources"][column] for metric, column in METRIC_COLUMNS.items()}
+    return metrics
 
 # ---------------------------------------------------------------------
-def extract_metrics_from_output_xlsx(output_xlsx: Path):
-    """Read metrics directly from the generated output Excel."""
-    wb = openpyxl.load_workbook(output_xlsx, data_only=True)
-    ws = wb.active
-
-    def val(cell):
-        return ws[cell].value if ws[cell].value is not None else 0
+# Result record columns of the metrics (CORES is derived from CPU)
+METRIC_COLUMNS = {
+    "DB_NAME": "db_name",
+    "ELAPSED": "elapsed_time_min",
+    "DBTIME": "db_time_min",
+    "CPU": "host_cpu_num",
+    "CORES": "host_cpu_num",
+    "MEMORY_GB": "host_memory_mb",
+    "SGA_MB": "db_sga_usage_mb",
+    "PGA_MB": "db_pga_usage_mb",
+    "PHYS_READ_MB": "db_physical_read_total_mbps",
+    "PHYS_WRITE_MB": "db_physical_write_total_mbps",
+    "PHYS_READ_REQ": "db_physical_read_total_io_ps",
+    "PHYS_WRITE_REQ": "db_physical_write_total_io_ps",
+}
+
+def extract_metrics_from_result(record):
+    """Read metrics from the first result record of process_awr_reports.parse_batch (same cells as output Excel row 2)."""
+    def val(column):
+        return record[column] if record[column] is not None and record[column] != "" else 0
 
     return {
-        "DB_NAME": val("N2"),
-        "ELAPSED": val("AS2"),
-        "DBTIME": val("AT2"),
-        "CPU": val("S2"),
-        "CORES": val("S2") / 2 if val("S2") else 0,
-        "MEMORY_GB": val("W2"),
-        "SGA_MB": val("X2"),
-        "PGA_MB": val("Y2"),
-        "PHYS_READ_MB": val("AE2"),
-        "PHYS_WRITE_MB": val("AF2"),
-        "PHYS_READ_REQ": val("AB2"),
-        "PHYS_WRITE_REQ": val("AC2"),
+        "DB_NAME": val("db_name"),
+        "ELAPSED": val("elapsed_time_min"),
+        "DBTIME": val("db_time_min"),
+        "CPU": val("host_cpu_num"),
+        "CORES": val("host_cpu_num") / 2 if val("host_cpu_num") else 0,
+        "MEMORY_GB": val("host_memory_mb"),
+        "SGA_MB": val("db_sga_usage_mb"),
+        "PGA_MB": val("db_pga_usage_mb"),
+        "PHYS_READ_MB": val("db_physical_read_total_mbps"),
+        "PHYS_WRITE_MB": val("db_physical_write_total_mbps"),
+        "PHYS_READ_REQ": val("db_physical_read_total_io_ps"),
+        "PHYS_WRITE_REQ": val("db_physical_write_total_io_ps"),
     }
 
 # ---------------------------------------------------------------------
@@ -112,35 +111,41 @@ def write_to_template_from_output(metrics):
     return out_file
 
 # ---------------------------------------------------------------------
-def run(awr_file):
+def run(awr_file, sizing_only=False):
     awr_path = Path(awr_file)
     print(f"⚙️ Processing {awr_path.name} ...")
 
-    # 1️⃣ Create temp input/output folders for process_awr_reports.py
-    temp_input_dir = OUTPUTS / f"tmp_{awr_path.stem}"
-    temp_input_dir.mkdir(exist_ok=True)
+    # Sizing only mode: regex read of the sizing metrics, no process_awr_reports output Excel
+    if sizing_only:
+        metrics = regex_fallback_parser(awr_path)
+        print("🧾 Extracted Metrics (sizing only):")
+        for k, v in metrics.items():
+            if k != "SOURCES":
+                print(f"   {k}: {v} [{metrics['SOURCES'][k]}]")
+        return write_to_template_from_output(metrics)
+
+    # 1️⃣ Create output folder for process_awr_reports output
     temp_output_dir = OUTPUTS / f"{awr_path.stem}"
     temp_output_dir.mkdir(exist_ok=True)
 
-    # Copy HTML file into the input directory
-    shutil.copy(awr_path, temp_input_dir / awr_path.name)
+    # Run the AWR analysis in a worker process within the time and RSS limits (a stalled report fails instead of the task)
+    print(f"🧩 Running process_awr_reports on {awr_path.name} ...")
+    result = process_awr_reports.parse_batch([str(awr_path)], timeLimit=REPORT_TIME_LIMIT, rssLimit=REPORT_RSS_LIMIT)
 
-    print(f"🧩 Launching process_awr_reports.py on {awr_path.name} ...")
-    subprocess.run(
-        ["python3", str(BASE / "process_awr_reports.py"), str(temp_input_dir), str(temp_output_dir)],
-        check=True
-    )
+    # 2️⃣ Write the output Excel
+    output_xlsx = Path(process_awr_reports.write_output_xlsx(result, str(temp_output_dir)))
+    print(f"✅ Written AWR output: {output_xlsx.name}")
 
-    # 2️⃣ Detect the output Excel
-    xlsx_files = list(temp_output_dir.glob("*.xlsx"))
-    if not xlsx_files:
-        raise FileNotFoundError(f"No Excel output found in {temp_output_dir}")
+    # Append the result to the parquet dataset of all reports (see process_awr_reports.read_output_dataset)
+    if process_awr_reports.pyarrow is not None:
+        process_awr_reports.append_output_dataset(result, str(RESULTS_DATASET))
 
-    output_xlsx = xlsx_files[0]
-    print(f"✅ Found AWR output: {output_xlsx.name}")
+    status = result.iloc[0]["status"]
+    if status in ("FAILED (timeout)", "FAILED (memory)"):
+        raise RuntimeError(f"AWR analysis of {awr_path.name} stopped: {status}")
 
     # 3️⃣ Extract and write to template
-    metrics = extract_metrics_from_output_xlsx(output_xlsx)
+    metrics = extract_metrics_from_result(result.iloc[0])
 
     print("🧾 Extracted Metrics:")
     for k, v in metrics.items():
@@ -152,5 +157,6 @@ def run(awr_file):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--awr-file", required=True)
+    parser.add_argument("--sizing-only", action="store_true", help="read only the sizing metrics (regex fast path)")
     args = parser.parse_args()
-    run(args.awr_file)
+    run(args.awr_file, args.sizing_only)
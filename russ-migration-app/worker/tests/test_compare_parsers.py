@@ -0,0 +1,19 @@
+"""Parser backends, the sizing fast path and the table index lookups against html.parser on a generated report corpus"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import generate_reports  # noqa: E402
+import process_awr_reports  # noqa: E402
+
+
+def test_compare_parsers_generated_corpus(tmp_path):
+    paths = generate_reports.generate_corpus(str(tmp_path), si=2, rac=2, instances=3, statspack=1,
+                                             releases=['10.2', '19'], sqlRows=5, sections=2, sectionRows=5)
+    result = process_awr_reports.compare_parsers(sorted(paths))
+
+    assert result['reports'] == 4   # Statspack reports are not parsed by the html parser backends
+    assert set(result['candidates']) >= {'stream', 'parse_sizing', 'find_table'}
+    assert result['mismatches'] == []
+    for parser in result['candidates']:
+        assert sum(stats['reports'] for stats in result['groups'][parser].values()) == 4
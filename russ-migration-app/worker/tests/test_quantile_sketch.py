@@ -0,0 +1,59 @@
+"""Quantile sketch values against numpy.quantile (nearest rank) within the relative accuracy of the sketch"""
+import random
+import sys
+from pathlib import Path
+
+import numpy
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from quantile_sketch import QuantileSketch  # noqa: E402
+
+QUANTILES = [0.01, 0.25, 0.5, 0.9, 0.95, 0.99]
+
+
+def sketch_of(values):
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def assert_quantiles(sketch, values):
+    for q in QUANTILES:
+        expected = numpy.quantile(values, q, method='inverted_cdf')
+        assert sketch.quantile(q) == pytest.approx(expected, rel=sketch.accuracy), q
+    assert sketch.quantile(1.0) == max(values)
+
+
+@pytest.mark.parametrize('values', [
+    [3.2],
+    [0.59, 7.06],
+    [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    [0, 0, 0.5, 12.5, 3],
+    [random.Random(n).lognormvariate(1, 1) for n in range(37)],
+])
+def test_small_series(values):
+    assert_quantiles(sketch_of(values), values)
+
+
+def test_high_quantiles_of_two_values():
+    sketch = sketch_of([0.59, 7.06])
+    assert sketch.quantile(0.95) == pytest.approx(7.06, rel=0.01)
+    assert sketch.quantile(0.99) == pytest.approx(7.06, rel=0.01)
+
+
+def test_merge():
+    rnd = random.Random(7)
+    parts = [[rnd.uniform(0, 64) for _ in range(n)] for n in (1, 4, 25, 300)]
+    merged = QuantileSketch()
+    for part in parts:
+        merged.merge(sketch_of(part))
+    values = [value for part in parts for value in part]
+    assert merged.count == len(values)
+    assert merged.min == min(values)
+    assert_quantiles(merged, values)
+
+
+def test_empty():
+    assert QuantileSketch().quantile(0.95) is None